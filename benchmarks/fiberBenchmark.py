@@ -0,0 +1,237 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Fiber generation scaling benchmark, each stage timed separately (see stageProfiler.py)
+#  case axes: "circleRatio" circle diameter/coreSize ratio, "polygonVertices" vertex count of a polygon section,
+#             "holeCount" cells of a box girder, "barLines" user bar lines, "plot" plot off/on
+#  the stage times are the best of --repeat runs without memory tracing, the peak memory comes from one more
+#  run with tracemalloc
+#  run:     python benchmarks/fiberBenchmark.py run -o results.json [--quick] [--axis holeCount ...]
+#  compare: python benchmarks/fiberBenchmark.py compare base.json results.json [--threshold 0.1] [--minTime 0.01]
+#           exits with status 1 when a case or stage is slower than base by more than threshold
+######################################################################################
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import traceback
+import subprocess
+packageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, packageDir)
+import numpy as np
+from sectionFiberMain import circleSection, polygonSection
+from stageProfiler import StageProfiler
+######################################################################################
+def _loop(points):
+    """
+    node and element dicts of a closed vertex loop
+    """
+    nodeDict = {i1 + 1: (float(x), float(y)) for i1, (x, y) in enumerate(points)}
+    eleDict = {i1 + 1: (i1 + 1, (i1 + 1) % len(points) + 1) for i1 in range(len(points))}
+    return nodeDict, eleDict
+######################################################################################
+def circleCase(ratio, coreMesher):
+    outD = 2.0
+    return circleSection, {"sectionName": "circleRatio%d" % ratio, "outD": outD, "coverThick": 0.06,
+                           "outbarD": 0.03, "outbarDist": 0.15, "coreSize": outD / ratio,
+                           "coverSize": outD / ratio, "coreMesher": coreMesher}
+######################################################################################
+def polygonVertexCase(nVertex, coreMesher):
+    """
+    regular polygon of nVertex vertices inscribed in a 2m circle
+    """
+    theta = np.linspace(0.0, 2.0 * np.pi, nVertex, endpoint=False)
+    outSideNode, outSideEle = _loop(np.column_stack((np.cos(theta), np.sin(theta))))
+    return polygonSection, {"sectionName": "polygonVertices%d" % nVertex, "outSideNode": outSideNode,
+                            "outSideEle": outSideEle, "coverThick": 0.06, "coreSize": 0.1, "coverSize": 0.1,
+                            "outBarD": 0.03, "outBarDist": 0.15, "coreMesher": coreMesher}
+######################################################################################
+def holeCountCase(nHole, coreMesher, cellWidth=1.0, wallThick=0.3, height=2.0):
+    """
+    box girder with nHole cells in a row
+    """
+    width = nHole * cellWidth + (nHole + 1) * wallThick
+    outSideNode, outSideEle = _loop([(0.0, 0.0), (width, 0.0), (width, height), (0.0, height)])
+    spec = {"sectionName": "holeCount%d" % nHole, "outSideNode": outSideNode, "outSideEle": outSideEle,
+            "coverThick": 0.05, "coreSize": 0.1, "coverSize": 0.1, "outBarD": 0.025, "outBarDist": 0.15,
+            "coreMesher": coreMesher}
+    if nHole > 0:
+        holeLoops = []
+        for i1 in range(nHole):
+            x0 = wallThick + i1 * (cellWidth + wallThick)
+            holeLoops.append(_loop([(x0, wallThick), (x0 + cellWidth, wallThick), (x0 + cellWidth, height - wallThick),
+                                    (x0, height - wallThick)]))
+        spec.update(inSideNode=[each[0] for each in holeLoops], inSideEle=[each[1] for each in holeLoops],
+                    inBarD=0.025, inBarDist=0.15)
+    return polygonSection, spec
+######################################################################################
+def barLineCase(nLine, coreMesher, width=4.0, height=2.0):
+    """
+    rectangle with nLine vertical user bar lines
+    """
+    outSideNode, outSideEle = _loop([(0.0, 0.0), (width, 0.0), (width, height), (0.0, height)])
+    x = np.linspace(0.1, width - 0.1, nLine)
+    barNodeDict, barEleDict = {}, {}
+    for i1, eachX in enumerate(x):
+        barNodeDict[2 * i1 + 1] = (float(eachX), 0.1)
+        barNodeDict[2 * i1 + 2] = (float(eachX), height - 0.1)
+        barEleDict[i1 + 1] = (2 * i1 + 1, 2 * i1 + 2, 0.02, 0.1)
+    return polygonSection, {"sectionName": "barLines%d" % nLine, "outSideNode": outSideNode,
+                            "outSideEle": outSideEle, "coverThick": 0.05, "coreSize": 0.1, "coverSize": 0.1,
+                            "outBarD": 0.02, "outBarDist": 0.1, "autoBarMesh": False,
+                            "userBarNodeDict": barNodeDict, "userBarEleDict": barEleDict, "coreMesher": coreMesher}
+######################################################################################
+def plotCase(plot, coreMesher):
+    sectionFunction, spec = holeCountCase(2, coreMesher)
+    spec.update(sectionName="plot%s" % ("On" if plot else "Off"), plot=plot, plotMode="agg", plotFormats=("png",))
+    return sectionFunction, spec
+######################################################################################
+def benchmarkCases(quick=False, circleMesher="gmsh", polygonMesher="gmsh"):
+    """
+    Output: [(caseName, axis, parameter, sectionFunction, keyword arguments),...]
+    """
+    axes = {"circleRatio": ([10, 20, 40], [10, 20, 40, 80, 160]),
+            "polygonVertices": ([100, 500], [100, 250, 500, 1000, 2000, 5000]),
+            "holeCount": ([0, 5], [0, 1, 2, 5, 10, 15, 20]),
+            "barLines": ([10, 100], [10, 50, 100, 500, 1000, 5000]),
+            "plot": ([False, True], [False, True])}
+    builders = {"circleRatio": lambda each: circleCase(each, circleMesher),
+                "polygonVertices": lambda each: polygonVertexCase(each, polygonMesher),
+                "holeCount": lambda each: holeCountCase(each, polygonMesher),
+                "barLines": lambda each: barLineCase(each, polygonMesher),
+                "plot": lambda each: plotCase(each, polygonMesher)}
+    caseList = []
+    for axis, (quickValues, fullValues) in axes.items():
+        for eachValue in (quickValues if quick else fullValues):
+            sectionFunction, spec = builders[axis](eachValue)
+            caseList.append((spec["sectionName"], axis, eachValue, sectionFunction, spec))
+    return caseList
+######################################################################################
+def runCase(sectionFunction, spec, repeat=3):
+    """
+    Run one case, return {"stages":{stage:{"wallTime","peakMemory","fiberCount","vertexCount","elementCount"}},
+                          "wallTime","peakMemory","fiberCount","error"}
+    """
+    stages = {}
+    try:
+        for i1 in range(repeat + 1):
+            #the last run traces the memory, its times are not used
+            traceMemory = i1 == repeat
+            profiler = StageProfiler(traceMemory=traceMemory)
+            sectionFunction(profiler=profiler, **spec)
+            for eachRecord in profiler.records:
+                stageResult = stages.setdefault(eachRecord["stage"], {"wallTime": float("inf")})
+                if traceMemory:
+                    stageResult["peakMemory"] = eachRecord["peakMemory"]
+                else:
+                    stageResult["wallTime"] = min(stageResult["wallTime"], eachRecord["wallTime"])
+                for eachCount in ("fiberCount", "vertexCount", "elementCount"):
+                    stageResult[eachCount] = eachRecord[eachCount]
+        error = None
+    except Exception:
+        error = traceback.format_exc().strip().splitlines()[-1]
+    return {"stages": stages, "wallTime": sum(each["wallTime"] for each in stages.values()),
+            "peakMemory": max([each.get("peakMemory") or 0 for each in stages.values()] or [0]),
+            "fiberCount": sum(each["fiberCount"] or 0 for each in stages.values()), "error": error}
+######################################################################################
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=packageDir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+######################################################################################
+def runBenchmark(outputPath, quick=False, axisList=None, repeat=3, circleMesher="gmsh", polygonMesher="gmsh"):
+    """
+    Run the cases and write the JSON results
+    """
+    results = {"meta": {"revision": _revision(), "python": platform.python_version(), "numpy": np.__version__,
+                        "platform": platform.platform(), "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "repeat": repeat, "circleMesher": circleMesher, "polygonMesher": polygonMesher},
+               "cases": []}
+    workDir = os.getcwd()
+    #the plot files are written to a temporary directory
+    with tempfile.TemporaryDirectory() as plotDir:
+        os.chdir(plotDir)
+        try:
+            print("%22s %10s %10s %12s  %s" % ("case", "time(s)", "fibers", "peak(MB)", "slowest stage"))
+            for caseName, axis, parameter, sectionFunction, spec in benchmarkCases(quick, circleMesher, polygonMesher):
+                if axisList and axis not in axisList:
+                    continue
+                caseResult = runCase(sectionFunction, spec, repeat)
+                caseResult.update(name=caseName, axis=axis, parameter=parameter)
+                results["cases"].append(caseResult)
+                if caseResult["error"] is not None:
+                    print("%22s %s" % (caseName, caseResult["error"]))
+                    continue
+                stages = caseResult["stages"]
+                print("%22s %10.4f %10d %12.2f  %s" % (caseName, caseResult["wallTime"], caseResult["fiberCount"],
+                                                       caseResult["peakMemory"] / 2.0 ** 20,
+                                                       max(stages, key=lambda each: stages[each]["wallTime"])))
+        finally:
+            os.chdir(workDir)
+    with open(outputPath, "w") as outputFile:
+        json.dump(results, outputFile, indent=1)
+    return results
+######################################################################################
+def compareResults(basePath, newPath, threshold=0.1, minTime=0.01):
+    """
+    Print the time ratio new/base of each case and stage
+    Output: regressions-[(caseName,stage,baseTime,newTime),...] slower by more than threshold,
+            stages faster than minTime seconds in both runs are not compared
+    """
+    with open(basePath) as baseFile:
+        base = json.load(baseFile)
+    with open(newPath) as newFile:
+        new = json.load(newFile)
+    baseCases = {each["name"]: each for each in base["cases"]}
+    regressions = []
+    print("base %s, new %s" % (base["meta"].get("revision"), new["meta"].get("revision")))
+    print("%22s %16s %10s %10s %8s" % ("case", "stage", "base(s)", "new(s)", "ratio"))
+    for newCase in new["cases"]:
+        baseCase = baseCases.get(newCase["name"])
+        if baseCase is None or baseCase["error"] or newCase["error"]:
+            print("%22s %16s" % (newCase["name"], "not compared"))
+            continue
+        rows = [("total", baseCase["wallTime"], newCase["wallTime"])]
+        rows += [(eachStage, baseCase["stages"][eachStage]["wallTime"], newValues["wallTime"])
+                 for eachStage, newValues in newCase["stages"].items() if eachStage in baseCase["stages"]]
+        for eachStage, baseTime, newTime in rows:
+            ratio = newTime / baseTime if baseTime > 0.0 else float("inf")
+            flag = ""
+            if max(baseTime, newTime) >= minTime and ratio > 1.0 + threshold:
+                regressions.append((newCase["name"], eachStage, baseTime, newTime))
+                flag = "  slower"
+            print("%22s %16s %10.4f %10.4f %8.2f%s" % (newCase["name"], eachStage, baseTime, newTime, ratio, flag))
+    return regressions
+######################################################################################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="fiber generation scaling benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    runParser = subparsers.add_parser("run", help="run the cases and write the JSON results")
+    runParser.add_argument("-o", "--output", default="fiberBenchmark.json")
+    runParser.add_argument("--quick", action="store_true", help="fewer and smaller cases")
+    runParser.add_argument("--axis", nargs="*", help="circleRatio polygonVertices holeCount barLines plot")
+    runParser.add_argument("--repeat", type=int, default=3)
+    runParser.add_argument("--circleMesher", default="gmsh", choices=["gmsh", "analytic"])
+    runParser.add_argument("--polygonMesher", default="gmsh", choices=["gmsh", "structured"])
+    compareParser = subparsers.add_parser("compare", help="compare two JSON results")
+    compareParser.add_argument("base")
+    compareParser.add_argument("new")
+    compareParser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown")
+    compareParser.add_argument("--minTime", type=float, default=0.01, help="shorter stages (s) are not compared")
+    arguments = parser.parse_args()
+    if arguments.command == "run":
+        runBenchmark(arguments.output, arguments.quick, arguments.axis, arguments.repeat, arguments.circleMesher,
+                     arguments.polygonMesher)
+    else:
+        regressions = compareResults(arguments.base, arguments.new, arguments.threshold, arguments.minTime)
+        print("%d slower stage(s)" % len(regressions))
+        sys.exit(1 if regressions else 0)
+######################################################################################
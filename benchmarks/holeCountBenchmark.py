@@ -0,0 +1,86 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Core mesh time of a multi-cell box section against the number of cells (holes)
+#  "chained": one boolean difference per hole, each applied to the previous result
+#  "single": one boolean difference of all the holes (PolygonSection.coreMesh)
+#  "curveLoops": the holes are curve loops of a single plane surface
+#  the times include the gmsh run of pygmsh.generate_mesh (process start, geometry, 2D mesh)
+#  run: python benchmarks/holeCountBenchmark.py [eleSize]
+#  recorded results: benchmarks/results/holeCount.txt
+######################################################################################
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygmsh
+from fiberGenerate import PolygonSection, _generateTriangles
+######################################################################################
+def boxRings(nHole, cellWidth=1.0, wallThick=0.3, height=2.0):
+    """
+    outside ring and hole rings of a box girder with nHole cells in a row
+    """
+    width = nHole * cellWidth + (nHole + 1) * wallThick
+    outRing = [(0.0, 0.0), (width, 0.0), (width, height), (0.0, height)]
+    holeRings = []
+    for i1 in range(nHole):
+        x0 = wallThick + i1 * (cellWidth + wallThick)
+        holeRings.append([(x0, wallThick), (x0 + cellWidth, wallThick), (x0 + cellWidth, height - wallThick),
+                          (x0, height - wallThick)])
+    return outRing, holeRings
+######################################################################################
+def chainedMesh(outRing, holeRings, eleSize):
+    """
+    legacy core mesh, one boolean difference for each hole
+    """
+    geom = pygmsh.opencascade.Geometry()
+    outPolygon = geom.add_polygon([[x, y, 0] for x, y in outRing], lcar=eleSize)
+    for eachHole in holeRings:
+        inPolygon = geom.add_polygon([[x, y, 0] for x, y in eachHole], lcar=eleSize)
+        outPolygon = geom.boolean_difference([outPolygon], [inPolygon])
+    return _generateTriangles(geom)
+######################################################################################
+def singleMesh(outRing, holeRings, eleSize):
+    """
+    current core mesh, one boolean difference of all the holes
+    """
+    return PolygonSection({}, {})._gmshCoreMesh(outRing, holeRings or None, eleSize)
+######################################################################################
+def curveLoopMesh(outRing, holeRings, eleSize):
+    """
+    holes as curve loops of the core surface
+    """
+    geom = pygmsh.opencascade.Geometry()
+    holeLoops = [geom.add_polygon([[x, y, 0] for x, y in eachHole], lcar=eleSize, make_surface=False).line_loop
+                 for eachHole in holeRings]
+    geom.add_polygon([[x, y, 0] for x, y in outRing], lcar=eleSize, holes=holeLoops)
+    return _generateTriangles(geom)
+######################################################################################
+def timeIt(meshFunction, *args, repeat=5):
+    """
+    best wall time of repeat calls and the triangle count
+    """
+    bestTime = float("inf")
+    for i1 in range(repeat):
+        startTime = time.perf_counter()
+        points, triangles = meshFunction(*args)
+        bestTime = min(bestTime, time.perf_counter() - startTime)
+    return bestTime, len(triangles)
+######################################################################################
+if __name__ == "__main__":
+    eleSize = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    print("eleSize=%g" % eleSize)
+    print("%6s %12s %12s %12s %10s %10s" % ("holes", "chained(s)", "single(s)", "loops(s)", "speedup",
+                                            "triangles"))
+    for nHole in [0, 1, 2, 4, 6, 8, 10, 15, 20]:
+        outRing, holeRings = boxRings(nHole)
+        chainedTime, nChained = timeIt(chainedMesh, outRing, holeRings, eleSize)
+        singleTime, nSingle = timeIt(singleMesh, outRing, holeRings, eleSize)
+        loopTime, nLoop = timeIt(curveLoopMesh, outRing, holeRings, eleSize)
+        #speedup of the current single boolean difference over the chained differences
+        print("%6d %12.3f %12.3f %12.3f %10.2f %10d" % (nHole, chainedTime, singleTime, loopTime,
+                                                         chainedTime / singleTime, nSingle))
+######################################################################################
@@ -0,0 +1,52 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Start-up time of a fresh interpreter (a batch worker process) importing the package
+#  "lazy": import sectionFiberMain as it is, only NumPy is loaded
+#  "eager": the same import plus the plotting and meshing modules that used to be loaded with it
+#  "analytic section": import and generate an analytic circle section, no gmsh and no plot
+#  run: python benchmarks/importTimeBenchmark.py
+######################################################################################
+import os
+import sys
+import time
+import subprocess
+######################################################################################
+packageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+heavyModules = ["matplotlib.pyplot", "matplotlib.tri", "pygmsh", "meshio", "scipy"]
+lazyCode = "import sectionFiberMain"
+eagerCode = "import sectionFiberMain\n" + "\n".join("import %s" % each for each in heavyModules)
+analyticCode = ("from sectionFiberMain import circleSection\n"
+                "circleSection('c', 2.0, 0.06, 0.03, 0.15, 0.1, 0.1, coreMesher='analytic')")
+checkCode = ("import sys\nimport sectionFiberMain\n"
+             "print(','.join(each for each in %r if each in sys.modules))" % (heavyModules,))
+######################################################################################
+def spawnTime(code, repeat=5):
+    """
+    best wall time of repeat fresh interpreters running code
+    """
+    bestTime = float("inf")
+    for i1 in range(repeat):
+        startTime = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=packageDir, check=True,
+                       stdout=subprocess.DEVNULL, env=dict(os.environ, MPLBACKEND="Agg"))
+        bestTime = min(bestTime, time.perf_counter() - startTime)
+    return bestTime
+######################################################################################
+if __name__ == "__main__":
+    loadedModules = subprocess.run([sys.executable, "-c", checkCode], cwd=packageDir, check=True,
+                                   capture_output=True, text=True).stdout.strip()
+    print("heavy modules loaded by 'import sectionFiberMain': %s" % (loadedModules or "none"))
+    print("%20s %10s" % ("case", "time(s)"))
+    lazyTime = spawnTime(lazyCode)
+    print("%20s %10.3f" % ("lazy", lazyTime))
+    try:
+        eagerTime = spawnTime(eagerCode)
+        print("%20s %10.3f %8.2fx" % ("eager", eagerTime, eagerTime / lazyTime))
+    except subprocess.CalledProcessError:
+        print("%20s %10s" % ("eager", "n/a (a plotting or meshing module is not installed)"))
+    print("%20s %10.3f" % ("analytic section", spawnTime(analyticCode)))
+######################################################################################
@@ -0,0 +1,113 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Mesh convergence study of the fiber element sizes
+#  the levels of the size ladder are generated in parallel (sectionBatch), the section properties and the
+#  optional moment-curvature curves (also in parallel) of every level are compared with the finest level,
+#  the coarsest level that (with all the finer levels) meets the tolerance is selected, the finest level is
+#  selected when no coarser level meets it (extend the ladder to finer sizes to check its own convergence)
+#  property error: largest error of fiberCoarsen.propertyError over the regions (area, centroid, Iy, Iz, Iyz)
+#  moment error: largest |M-Mref| over the curvature steps relative to the largest |Mref|
+######################################################################################
+import numpy as np
+from fiberSet import FiberSet
+from sectionProperty import sectionProperties
+from fiberCoarsen import propertyError
+from momentCurvature import momentCurvatureBatch
+from sectionFiberMain import sectionBatch
+######################################################################################
+def _levelSizes(sizeLadder):
+    """
+    (coreSize,coverSize) of each level, a scalar level size is used for both
+    """
+    levelList = []
+    for eachLevel in sizeLadder:
+        if np.ndim(eachLevel) == 0:
+            levelList.append((float(eachLevel), float(eachLevel)))
+        else:
+            levelList.append((float(eachLevel[0]), float(eachLevel[1])))
+    return levelList
+######################################################################################
+def convergenceStudy(sectionSpec, sizeLadder, tolerance=0.01, materials=None, axialLoad=0.0, angle=0.0,
+                     maxCurvature=None, nStep=50, maxWorkers=None):
+    """
+    Generate the section with each fiber size of the ladder and select the coarsest size that meets the tolerance
+    Input: sectionSpec-section specification dict, see sectionFiberMain.sectionBatch, its coreSize and coverSize
+                       are replaced by the sizes of each level
+           sizeLadder-level sizes [size1,size2,...] used for coreSize and coverSize, or [(coreSize1,coverSize1),...]
+           tolerance-largest property (and moment) error of the selected level
+           materials-uniaxial material of each fiber tag (see momentCurvature.py), None for no moment-curvature check
+           axialLoad,angle-axial load and bending direction of the moment-curvature check
+           maxCurvature,nStep-nStep equal curvature steps from 0 to maxCurvature, the same for all the levels
+           maxWorkers-number of worker processes, None for the number of processors
+    Output: study-{"levels":[{"coreSize","coverSize","fiberCount","propertyError","momentError","error"},...]
+                   from coarse to fine, "selected":index of the selected level or None, "coreSize","coverSize":sizes of
+                   the selected level or None, "fibers":FiberSet of the selected level or None,
+                   "properties":[section properties of each level], "curves":[moment-curvature result of each level]}
+    #######################---example---#########################
+    from convergenceStudy import convergenceStudy
+    sectionSpec = {"section": "circle", "sectionName": "pier", "outD": 2.0, "coverThick": 0.06, "outbarD": 0.03,
+                   "outbarDist": 0.15}
+    if __name__ == "__main__":
+        study = convergenceStudy(sectionSpec, [0.4, 0.3, 0.2, 0.15, 0.1, 0.05], tolerance=0.01, materials=materials,
+                                 axialLoad=-5000.0, maxCurvature=0.01, maxWorkers=6)
+        print(study["coreSize"], study["coverSize"], [each["fiberCount"] for each in study["levels"]])
+    """
+    if materials is not None and maxCurvature is None:
+        raise ValueError("Please provide maxCurvature for the moment-curvature check!")
+    levelList = sorted(_levelSizes(sizeLadder), key=lambda each: -max(each))
+    baseName = sectionSpec.get("sectionName", "section")
+    specList = [dict(sectionSpec, sectionName="%s_level%d" % (baseName, i1), coreSize=coreSize, coverSize=coverSize,
+                     plot=False) for i1, (coreSize, coverSize) in enumerate(levelList)]
+    results, errors = sectionBatch(specList, maxWorkers)
+    levels = [{"coreSize": coreSize, "coverSize": coverSize, "fiberCount": None, "propertyError": None,
+               "momentError": None, "error": errors.get(i1)} for i1, (coreSize, coverSize) in enumerate(levelList)]
+    fiberList = [None if each is None else FiberSet.concatenate(list(each)) for each in results]
+    properties = [None if each is None else sectionProperties(each) for each in fiberList]
+    curves = [None] * len(levelList)
+    if materials is not None:
+        curvatures = np.linspace(0.0, maxCurvature, nStep + 1)
+        taskIndex = [i1 for i1, eachFibers in enumerate(fiberList) if eachFibers is not None]
+        #each level is a case with its own fibers, a level whose worker fails or dies is reported alone
+        curveList, curveErrors = momentCurvatureBatch(None, materials, [(axialLoad, angle, fiberList[i1])
+                                                      for i1 in taskIndex], maxWorkers, curvatures=curvatures)
+        for i2, i1 in enumerate(taskIndex):
+            curves[i1] = curveList[i2]
+            if i2 in curveErrors:
+                levels[i1]["error"] = curveErrors[i2]
+    #the finest level that was generated is the reference
+    valid = [i1 for i1 in range(len(levelList)) if fiberList[i1] is not None and levels[i1]["error"] is None]
+    if not valid:
+        return {"levels": levels, "selected": None, "coreSize": None, "coverSize": None, "fibers": None,
+                "properties": properties, "curves": curves}
+    reference = valid[-1]
+    for i1 in valid:
+        levels[i1]["fiberCount"] = len(fiberList[i1])
+        errorDict = propertyError(properties[reference], properties[i1])
+        levels[i1]["propertyError"] = max(max(each.values()) for each in errorDict.values())
+        if materials is not None:
+            referenceMoment = curves[reference]["moment"]
+            scale = max(np.nanmax(np.abs(referenceMoment)), 1.0e-300)
+            difference = np.abs(curves[i1]["moment"] - referenceMoment)
+            #a curvature step that one level cannot reach (NaN) counts as not converged
+            levels[i1]["momentError"] = float(np.inf) if np.any(np.isnan(difference)) else \
+                float(difference.max() / scale)
+    ########################
+    def meets(index):
+        level = levels[index]
+        return index in valid and level["propertyError"] <= tolerance and \
+               (level["momentError"] is None or level["momentError"] <= tolerance)
+    ########################
+    #the coarsest level from which all the finer levels meet the tolerance
+    selected = reference
+    for i1 in range(reference - 1, -1, -1):
+        if not meets(i1):
+            break
+        selected = i1
+    return {"levels": levels, "selected": selected, "coreSize": levels[selected]["coreSize"],
+            "coverSize": levels[selected]["coverSize"], "fibers": fiberList[selected], "properties": properties,
+            "curves": curves}
+######################################################################################
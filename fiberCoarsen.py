@@ -0,0 +1,161 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Moment-preserving fiber coarsening
+#  the fibers of each coarsened region are clustered (grid binning or k-means in y-z) and each cluster is
+#  merged into one fiber at its area centroid, so the area and the first moments are kept exactly,
+#  then the merged fibers of the region are moved by a 2x2 linear map about the region centroid
+#  so that the second moments (Iy,Iz,Iyz) of the region are kept exactly as well
+######################################################################################
+import numpy as np
+from fiberSet import FiberSet, CORE, COVER, regionNames
+from sectionProperty import sectionProperties
+######################################################################################
+def _mergeLabels(y, z, area, labels):
+    """
+    merge the fibers with the same label, return the y,z,area arrays of the merged fibers
+    """
+    labels = np.unique(labels, return_inverse=True)[1].reshape(-1)
+    mergedArea = np.bincount(labels, weights=area)
+    mergedY = np.bincount(labels, weights=area * y) / mergedArea
+    mergedZ = np.bincount(labels, weights=area * z) / mergedArea
+    return mergedY, mergedZ, mergedArea
+######################################################################################
+def _gridLabels(y, z, area, nTarget, maxIter=30):
+    """
+    grid binning labels with at most nTarget (and as close as possible) occupied cells
+    """
+    yMin, zMin = y.min(), z.min()
+    cellSize = np.sqrt(area.sum() / nTarget)
+    bestLabels, bestCount = np.zeros(len(y), dtype=np.int64), 1
+    for iteration in range(maxIter):
+        iy = np.floor((y - yMin) / cellSize).astype(np.int64)
+        iz = np.floor((z - zMin) / cellSize).astype(np.int64)
+        labels = iy * (iz.max() + 1) + iz
+        count = len(np.unique(labels))
+        if bestCount < count <= nTarget:
+            bestLabels, bestCount = labels, count
+        if 0.95 * nTarget <= count <= nTarget:
+            break
+        #the occupied cell count scales about as 1/cellSize^2
+        cellSize *= np.clip(np.sqrt(count / nTarget), 0.7, 1.4) if count > nTarget else \
+            np.clip(np.sqrt(count / nTarget), 0.7, 0.99)
+    return bestLabels
+######################################################################################
+def _kMeansLabels(y, z, area, nTarget, maxIter=20, chunkSize=4096):
+    """
+    area weighted k-means labels, started from the grid binning clusters
+    """
+    point = np.column_stack((y, z))
+    centerY, centerZ, centerArea = _mergeLabels(y, z, area, _gridLabels(y, z, area, nTarget))
+    center = np.column_stack((centerY, centerZ))
+    scale = max(np.ptp(y), np.ptp(z), 1.0e-300)
+    labels = np.zeros(len(y), dtype=np.int64)
+    for iteration in range(maxIter):
+        for i1 in range(0, len(point), chunkSize):
+            pointChunk = point[i1:i1 + chunkSize]
+            distSquare = (pointChunk[:, None, 0] - center[None, :, 0]) ** 2 + \
+                         (pointChunk[:, None, 1] - center[None, :, 1]) ** 2
+            labels[i1:i1 + chunkSize] = np.argmin(distSquare, axis=1)
+        newY, newZ, newArea = _mergeLabels(y, z, area, labels)
+        newCenter = np.column_stack((newY, newZ))
+        #empty clusters are dropped by _mergeLabels
+        if len(newCenter) == len(center) and np.abs(newCenter - center).max() <= 1.0e-9 * scale:
+            break
+        center = newCenter
+    return labels
+######################################################################################
+def _secondMomentCorrection(y, z, area, fineY, fineZ, fineArea):
+    """
+    move the merged fibers about the region centroid so that their second moment tensor equals the fine one
+    """
+    if len(y) < 3:
+        return y, z
+    center = np.array([np.dot(fineArea, fineY), np.dot(fineArea, fineZ)]) / fineArea.sum()
+    fineOffset = np.column_stack((fineY, fineZ)) - center
+    offset = np.column_stack((y, z)) - center
+    fineTensor = (fineOffset * fineArea[:, None]).T @ fineOffset
+    tensor = (offset * area[:, None]).T @ offset
+    tensorValue, tensorVector = np.linalg.eigh(tensor)
+    fineValue, fineVector = np.linalg.eigh(fineTensor)
+    if tensorValue[0] <= 1.0e-12 * tensorValue[1] or fineValue[0] < 0.0:
+        return y, z
+    #T=fine^(1/2)@tensor^(-1/2), T@tensor@T^T=fine
+    transform = (fineVector * np.sqrt(fineValue)) @ fineVector.T @ \
+                (tensorVector / np.sqrt(tensorValue)) @ tensorVector.T
+    newOffset = offset @ transform.T
+    return center[0] + newOffset[:, 0], center[1] + newOffset[:, 1]
+######################################################################################
+def propertyError(fineProperty, coarseProperty):
+    """
+    Error of the coarse section properties, see sectionProperty.sectionProperties for the property dicts
+    Output: errorDict-{region:{"area","centroid","Iy","Iz","Iyz"}}, area relative error, centroid shift relative to
+            sqrt(area), Iy,Iz,Iyz errors relative to max(Iy,Iz) of the fine section
+    """
+    errorDict = {}
+    for eachRegion, fineValues in fineProperty.items():
+        coarseValues = coarseProperty[eachRegion]
+        inertia = max(fineValues["Iy"], fineValues["Iz"], 1.0e-300)
+        errorDict[eachRegion] = {
+            "area": abs(coarseValues["area"] - fineValues["area"]) / fineValues["area"],
+            "centroid": np.hypot(coarseValues["yc"] - fineValues["yc"], coarseValues["zc"] - fineValues["zc"]) /
+                        np.sqrt(fineValues["area"]),
+            "Iy": abs(coarseValues["Iy"] - fineValues["Iy"]) / inertia,
+            "Iz": abs(coarseValues["Iz"] - fineValues["Iz"]) / inertia,
+            "Iyz": abs(coarseValues["Iyz"] - fineValues["Iyz"]) / inertia}
+    return errorDict
+######################################################################################
+def coarsenFibers(fibers, fiberBudget, method="grid", tags=(CORE, COVER), correction=True, maxIter=20):
+    """
+    Merge the fibers of the given regions into a fiber budget
+    Input: fibers-FiberSet, for example FiberSet.concatenate([coreFiber,coverFiber,barFiber])
+           fiberBudget-total number of fibers of the coarsened regions, shared in proportion to their fiber counts
+           method-"grid" grid binning, "kmeans" area weighted k-means (started from the grid bins)
+           tags-coarsened region tags, the other fibers (bars) are kept as they are
+           correction-keep the second moments of each region exactly with a 2x2 linear map of the merged fibers
+           maxIter-maximum number of k-means iterations
+    Output: coarseFibers-FiberSet, the regions keep their order
+            report-{"fiberCount":(fine,coarse),"error":{region:{...}} (see propertyError),
+                    "maxError":largest error,"maxShift":largest correction move of a merged fiber}
+    #######################---example---#########################
+    from fiberCoarsen import coarsenFibers
+    coarseFibers, report = coarsenFibers(fibers, 500, method="kmeans")
+    print(report["fiberCount"], report["maxError"])
+    """
+    if method not in ("grid", "kmeans"):
+        raise ValueError("Error!Please select grid or kmeans method!")
+    coarseTags = [int(each) for each in np.unique(fibers.tag) if int(each) in tags]
+    counts = {eachTag: int(np.count_nonzero(fibers.tag == eachTag)) for eachTag in coarseTags}
+    totalCount = max(sum(counts.values()), 1)
+    fiberSetList = []
+    maxShift = 0.0
+    #regions in their order of appearance
+    tagOrder = fibers.tag[np.sort(np.unique(fibers.tag, return_index=True)[1])]
+    for eachTag in tagOrder:
+        region = fibers.region(eachTag)
+        if int(eachTag) not in coarseTags:
+            fiberSetList.append(region)
+            continue
+        nTarget = max(3, int(round(fiberBudget * counts[int(eachTag)] / totalCount)))
+        if nTarget >= len(region):
+            fiberSetList.append(region)
+            continue
+        if method == "grid":
+            labels = _gridLabels(region.y, region.z, region.area, nTarget)
+        else:
+            labels = _kMeansLabels(region.y, region.z, region.area, nTarget, maxIter)
+        y, z, area = _mergeLabels(region.y, region.z, region.area, labels)
+        if correction:
+            newY, newZ = _secondMomentCorrection(y, z, area, region.y, region.z, region.area)
+            maxShift = max(maxShift, float(np.hypot(newY - y, newZ - z).max()))
+            y, z = newY, newZ
+        fiberSetList.append(FiberSet(y, z, area, eachTag))
+    coarseFibers = FiberSet.concatenate(fiberSetList)
+    errorDict = propertyError(sectionProperties(fibers), sectionProperties(coarseFibers))
+    report = {"fiberCount": (len(fibers), len(coarseFibers)), "error": errorDict,
+              "maxError": max(max(each.values()) for each in errorDict.values()), "maxShift": maxShift}
+    return coarseFibers, report
+######################################################################################
@@ -5,16 +5,18 @@
 #  Date: 05/02/2020
 ######################################################################################
 # import necessary modules
-import matplotlib.pyplot as plt
+#only NumPy is loaded on import, pygmsh (gmsh) is imported on the first gmsh core mesh
+import threading
 import numpy as np
-from scipy.linalg import solve
-import math
-import time
-import pygmsh
-import meshio
-import matplotlib.tri as tri
-from pointInPolygon import is_in_2d_polygon
+from polygonOffset import offsetPolygon
+from fiberKernel import triEleInfo, annularSectorFibers, coverQuadFibers, barLineFibers
+from fiberSet import FiberSet, CORE, COVER, BAR
+from structuredMesh import polarMesh, rectilinearMesh
+from sectionProperty import sectionProperties, discretizationError
 ########################################################################################################################
+#pygmsh numbers the geometry entities with class counters, the geometries of the threads sharing a GmshPool
+#(sectionBatch with meshBackend) are built one at a time
+_geometryLock = threading.Lock()
 ########################################################################################################################
 class CircleSection():
     """
@@ -89,137 +91,154 @@ class CircleSection():
             yListPlot.append(inyList)
         return xListPlot,yListPlot
     ####################################################
-    def _triEleInfo(self,points, triangles):
-        """
-        Calculate the area and the centroid coordinates of triangle element
-        Input：points-vertex of triangel element[[x1,y1,Z1],[x2,y2,Z2]]
-             triangles-triangle element list[[I1,J1,K1],[I2,J2,K2]]
-        Output：
-			inFoList:fiber element information [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        inFoList = []
-        for each in triangles:
-            I, J, K = each[0], each[1], each[2]
-            x1 = points[I][0]
-            y1 = points[I][1]
-            x2 = points[J][0]
-            y2 = points[J][1]
-            x3 = points[K][0]
-            y3 = points[K][1]
-            area = 0.5 * (x1 * y2 - x2 * y1 + x2 * y3 - x3 * y2 + x3 * y1 - x1 * y3)
-            xc = (x1 + x2 + x3) / 3.0
-            yc = (y1 + y2 + y3) / 3.0
-            inFoList.append((xc, yc, area))
-        return inFoList
+    def analyticProperties(self):
+        """
+        Analytic properties of the core and cover concrete annuli and of the whole concrete section
+        Output: {"core":{...},"cover":{...},"concrete":{...}}, each {"area","yc","zc","Iy","Iz","Iyz","I1","I2","theta"}
+        """
+        outRadius = self.outDiameter / 2.0
+        coreOutRadius = outRadius - self.coverThick
+        inRadius = 0.0 if self.innerDiameter == None else self.innerDiameter / 2.0
+        coreInRadius = 0.0 if self.innerDiameter == None else inRadius + self.coverThick
+        regionRings = {"core": [(coreOutRadius, coreInRadius)],
+                       "cover": [(outRadius, coreOutRadius), (inRadius, coreInRadius)],
+                       "concrete": [(outRadius, inRadius)]}
+        propertyDict = {}
+        for regionName, ringList in regionRings.items():
+            area = sum(np.pi * abs(r2 ** 2 - r1 ** 2) for r2, r1 in ringList)
+            inertia = sum(np.pi / 4.0 * abs(r2 ** 4 - r1 ** 4) for r2, r1 in ringList)
+            propertyDict[regionName] = {"area": area, "yc": 0.0, "zc": 0.0, "Iy": inertia, "Iz": inertia, "Iyz": 0.0,
+                                        "I1": inertia, "I2": inertia, "theta": 0.0}
+        return propertyDict
     ####################################################
-    def coreMesh(self,eleSize):
+    def propertyError(self, fibers):
+        """
+        Mesh discretization error of the fibers against the analytic core, cover and concrete properties
+        Input: fibers-FiberSet of the section, for example FiberSet.concatenate([coreFiber,coverFiber,barFiber])
+        Output: errorDict-{"core":{"area":e,"Iy":e,"Iz":e},"cover":{...},"concrete":{...}}, relative errors
+        """
+        propertyDict = sectionProperties(fibers)
+        concreteFibers = fibers[fibers.tag != BAR]
+        if len(concreteFibers) > 0:
+            propertyDict["concrete"] = sectionProperties(concreteFibers)["transformed"]
+        return discretizationError(propertyDict, self.analyticProperties())
+    ####################################################
+    def _gmshCoreMesh(self, outRadius, innerRadius, eleSize, grading=None, meshBackend=None):
+        """
+        Mesh the core concrete disk (torus if innerRadius is not None) with gmsh
+        grading-MeshGrading instance (see meshGrading.py) for a graded mesh, None for the uniform eleSize
+        meshBackend-see _generateTriangles
+        Output: points,triangles-mesh node coordinates and triangle element arrays
+        """
+        import pygmsh
+        with _geometryLock:
+            geom = pygmsh.opencascade.Geometry()
+            core = geom.add_disk([0.0, 0.0, 0.0], outRadius, radius1=None, char_length=eleSize)
+            if innerRadius != None:
+                diskInner = geom.add_disk([0.0, 0.0, 0.0], innerRadius, radius1=None, char_length=eleSize)
+                core = geom.boolean_difference([core], [diskInner])
+            if grading is not None:
+                theta = np.linspace(0.0, 2.0 * np.pi, 360, endpoint=False)
+                rings = [np.column_stack((eachRadius * np.cos(theta), eachRadius * np.sin(theta)))
+                         for eachRadius in [outRadius] + ([] if innerRadius == None else [innerRadius])]
+                grading.addFields(geom, core.id, rings, curveLength=2.0 * np.pi * outRadius)
+        return _generateTriangles(geom, meshBackend)
+    ####################################################
+    def coreMesh(self,eleSize,meshCache=None,mesher="gmsh",grading=None,meshBackend=None):
         """
         Core concrete fiber generate
         Input: eleSize- fiber element size
-        Output: coreFiberInfo:core concrete fiber elment informaiton [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        outDiameterNew = self.outDiameter - self.coverThick * 2.0
+               meshCache-MeshCache instance (see meshCache.py) to reuse identical (similar with similarity=True) core meshes, None for no cache
+               mesher-"gmsh" triangular fibers, or "analytic" concentric ring and sector fibers with exact areas (no gmsh)
+               grading-MeshGrading instance (see meshGrading.py) for a graded gmsh mesh, None for the uniform eleSize
+               meshBackend-GmshPool instance (see gmshPool.py) to mesh on warm gmsh workers, None for pygmsh.generate_mesh
+        Output: coreFiberInfo:core concrete fiber elment informaiton, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
+                the fiber count and size range are recorded in self.coreMeshInfo
+        """
+        outRadius = (self.outDiameter - self.coverThick * 2.0) / 2.0
+        innerRadius = None
         if self.innerDiameter != None:
-            innerDiameterNew = self.innerDiameter + self.coverThick * 2.0
-            geom = pygmsh.opencascade.Geometry()
-            diskOut = geom.add_disk([0.0, 0.0, 0.0], outDiameterNew/2.0, radius1=None, char_length=eleSize)
-            diskInner = geom.add_disk([0.0,0.0, 0.0], innerDiameterNew/2.0, radius1=None, char_length=eleSize)
-            geom.boolean_difference([diskOut], [diskInner])
-            mesh = pygmsh.generate_mesh(geom)
-            points=mesh.points
-            triangles = [each[1] for each in mesh.cells if each.type=='triangle'][0]
-            coreFiberInfo = self._triEleInfo(points, triangles)
+            innerRadius = (self.innerDiameter + self.coverThick * 2.0) / 2.0
+        if mesher == "analytic":
+            if grading is not None:
+                raise ValueError("Error!The graded mesh needs mesher=gmsh!")
+            xc, yc, area, points, triangles = polarMesh(outRadius, innerRadius, eleSize)
+            coreFiberInfo = FiberSet(xc, yc, area, CORE)
+            self.coreMeshInfo = _meshInfo(mesher, area, grading)
+            return coreFiberInfo,points,triangles
+        elif mesher != "gmsh":
+            raise ValueError("Please select mesher=gmsh or mesher=analytic!")
+        gradingKey = () if grading is None else grading.key()
+        if meshCache is None:
+            points, triangles = self._gmshCoreMesh(outRadius, innerRadius, eleSize, grading, meshBackend)
+        elif meshCache.similarity:
+            #mesh the unit disk once for each eleSize/radius ratio and scale it
+            scale = outRadius
+            unitInnerRadius = None if innerRadius == None else innerRadius / scale
+            unitGrading = None if grading is None else grading.scaled(1.0 / scale)
+            key = meshCache.meshKey("disk-similar", [], eleSize / scale,
+                                    (1.0, unitInnerRadius) + (() if unitGrading is None else unitGrading.key()),
+                                    decimals=9)
+            unitPoints, triangles = meshCache.fetch(key, self._gmshCoreMesh, 1.0, unitInnerRadius, eleSize / scale,
+                                                    unitGrading, meshBackend)
+            points = unitPoints * scale
         else:
-            geom = pygmsh.opencascade.Geometry()
-            disk = geom.add_disk([0.0, 0.0, 0.0], outDiameterNew / 2.0, radius1=None, char_length=eleSize)
-            mesh = pygmsh.generate_mesh(geom)
-
-            points = mesh.points
-            triangles = [each[1] for each in mesh.cells if each.type=='triangle'][0]
-            coreFiberInfo = self._triEleInfo(points, triangles)
+            key = meshCache.meshKey("disk", [], eleSize, (outRadius, innerRadius) + gradingKey)
+            points, triangles = meshCache.fetch(key, self._gmshCoreMesh, outRadius, innerRadius, eleSize, grading,
+                                                meshBackend)
+        xc, yc, area = triEleInfo(points, triangles)
+        coreFiberInfo = FiberSet(xc, yc, area, CORE)
+        self.coreMeshInfo = _meshInfo(mesher, area, grading)
         return coreFiberInfo,points,triangles
     ####################################################
-    def _coverDivide(self, coverSize, pos="out"):
+    def _coverDivide(self, coverSize):
         """
-        Cover concrete fiber generate
+        Cover concrete fiber generate, the outside cover and the inner cover (if any) in one pass
         coverSize-fiber size
-        pos-outSize cover("out"),inner cover("in)"
+        Output: coverFiberInfo-cover fiber FiberSet, the outside cover fibers first
+                ringIndex-cover number of each fiber, 0 outside cover, 1 inner cover
+                nodeArray,newNodeArray-start node of each fiber on the section edge and on the core edge, shape (n,2)
         """
-        if pos == "out":
-            D = self.outDiameter
-            DNew = self.outDiameter - self.coverThick * 2.0
-            circumLength = np.pi * self.outDiameter
-            Area = (np.pi * self.outDiameter ** 2) / 4.0
-            NewArea = (np.pi * DNew ** 2) / 4.0
-            nCover = int(circumLength / coverSize)
-            coverArea = (Area - NewArea) / nCover
-            R = self.outDiameter / 2.0
-            NewR = DNew / 2.0
-        elif pos == "in":
-            D = self.innerDiameter
-            DNew = self.innerDiameter + self.coverThick * 2.0
-            circumLength = np.pi * D
-            Area = (np.pi * D ** 2) / 4.0
-            NewArea = (np.pi * DNew ** 2) / 4.0
-            nCover = int(circumLength / coverSize)
-            coverArea = (NewArea - Area) / nCover
-            R = self.innerDiameter / 2.0
-            NewR = DNew / 2.0
-        else:
-            print("Please select pos=out or pos=in!")
-        Angle = 2 * np.pi / nCover
-        NodeList = [(R * np.cos(Angle * i1), R * np.sin(Angle * i1)) for i1 in range(nCover)]
-        NewNodeList = [(NewR * np.cos(Angle * i2), NewR * np.sin(Angle * i2)) for i2 in range(nCover)]
-        fiberNCover = nCover
-        fiberAngle = (2 * np.pi) / fiberNCover
-        FiberRadius = (D + DNew) / 4.0
-        FiberXList = [FiberRadius * np.cos((2 * i3 - 1) * 0.5 * fiberAngle) for i3 in range(1, fiberNCover + 1)]
-        FiberYList = [FiberRadius * np.sin((2 * i4 - 1) * 0.5 * fiberAngle) for i4 in range(1, fiberNCover + 1)]
-        coverFiberInfo = [(xc, yc, coverArea) for xc, yc in zip(FiberXList, FiberYList)]
-        return coverFiberInfo, FiberXList, FiberYList, NodeList, NewNodeList
+        edgeDiameter = [self.outDiameter]
+        coreDiameter = [self.outDiameter - self.coverThick * 2.0]
+        if self.innerDiameter != None:
+            edgeDiameter.append(self.innerDiameter)
+            coreDiameter.append(self.innerDiameter + self.coverThick * 2.0)
+        edgeRadius = np.array(edgeDiameter) / 2.0
+        coreRadius = np.array(coreDiameter) / 2.0
+        nCover = (np.pi * np.array(edgeDiameter) / coverSize).astype(int)
+        ringIndex = np.repeat(np.arange(len(nCover)), nCover)
+        sectorIndex = np.arange(len(ringIndex)) - np.repeat(np.cumsum(nCover) - nCover, nCover)
+        Angle = 2 * np.pi / nCover[ringIndex]
+        theta1 = Angle * sectorIndex
+        xc, yc, area = annularSectorFibers(np.minimum(edgeRadius, coreRadius)[ringIndex],
+                                           np.maximum(edgeRadius, coreRadius)[ringIndex], theta1, theta1 + Angle)
+        coverFiberInfo = FiberSet(xc, yc, area, COVER)
+        direction = np.column_stack((np.cos(theta1), np.sin(theta1)))
+        nodeArray = edgeRadius[ringIndex][:, None] * direction
+        newNodeArray = coreRadius[ringIndex][:, None] * direction
+        return coverFiberInfo, ringIndex, nodeArray, newNodeArray
     ####################################################
-
     def coverMesh(self, coverSize):
         """
         Cover concrete mesh
         Input:
             coverSize: cover concrete fiber size
         Output:
-            coverFiberInfo: cover fiber information [(xc1,yc1,area1),(xc2,yc2,area2)]
+            coverFiberInfo: cover fiber information, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
-        coverFiberInfo = None
-        xListPLot = []
-        yListPlot = []
+        coverFiberInfo, ringIndex, nodeArray, newNodeArray = self._coverDivide(coverSize)
+        #radial border lines of the cover fibers [[xEdge,xCore],...]
+        xListPLot = np.column_stack((nodeArray[:, 0], newNodeArray[:, 0]))
+        yListPlot = np.column_stack((nodeArray[:, 1], newNodeArray[:, 1]))
+        #closed border lines between the cover and the core
         xBorderPlot = []
         yBorderPlot = []
-        outCoverFiberInfo, outFiberXList, outFiberYList, outNodeList, \
-            outNewNodeList = self._coverDivide(coverSize,pos="out")
-        coverFiberInfo = outCoverFiberInfo
-        borderOutNodeList = outNewNodeList
-        borderOutNodeList.append(outNewNodeList[0])
-        xBorderPlot.append([each1[0] for each1 in borderOutNodeList])
-        yBorderPlot.append([each2[1] for each2 in borderOutNodeList])
-        # self.ax.scatter(outFiberXList,outFiberYList,s=10,c="k",zorder = 2)
-        for i5 in range(len(outNodeList)):
-            xList = [outNodeList[i5][0], outNewNodeList[i5][0]]
-            yList = [outNodeList[i5][1], outNewNodeList[i5][1]]
-            xListPLot.append(xList)
-            yListPlot.append(yList)
-        if self.innerDiameter != None:
-            inDNew = self.innerDiameter + 2.0 * self.coverThick
-            inCoverFiberInfo, inFiberXList, inFiberYList, inNodeList, inNewNodeList \
-                = self._coverDivide(coverSize, pos="in")
-            coverFiberInfo = coverFiberInfo + inCoverFiberInfo
-            borderInNodeList = inNewNodeList
-            borderInNodeList.append(inNewNodeList[0])
-            xBorderPlot.append([each3[0] for each3 in borderInNodeList])
-            yBorderPlot.append([each4[1] for each4 in borderInNodeList])
-            # self.ax.scatter(inFiberXList,inFiberYList,s=10,c="k",zorder = 2)
-            for i5 in range(len(inNodeList)):
-                xList = [inNodeList[i5][0], inNewNodeList[i5][0]]
-                yList = [inNodeList[i5][1], inNewNodeList[i5][1]]
-                xListPLot.append(xList)
-                yListPlot.append(yList)
+        for eachRing in np.unique(ringIndex):
+            borderNode = newNodeArray[ringIndex == eachRing]
+            borderNode = np.vstack((borderNode, borderNode[:1]))
+            xBorderPlot.append(borderNode[:, 0])
+            yBorderPlot.append(borderNode[:, 1])
         return coverFiberInfo,xListPLot,yListPlot,xBorderPlot,yBorderPlot
     ####################################################
     def _barDivide(self, barD, barDist, pos="out"):
@@ -228,18 +247,20 @@ class CircleSection():
         Input：barD-bar diameter (m)
              barDist-bar space (m)
         """
-        newR=None
         area = (np.pi * barD ** 2) / 4.0
         if pos == "out":
             newR = (self.outDiameter - 2.0 * self.coverThick) / 2.0-barD/2.0
         elif pos == "in":
             newR = (self.innerDiameter + 2.0 * self.coverThick)/2.0 +barD/2.0
+        else:
+            raise ValueError("Error!Please select out or in mode!")
         circumLength = 2 * np.pi * newR
         nBar = int(circumLength / barDist)
         angle = (2 * np.pi) / nBar
-        fiberXList = [newR * np.cos(angle * i1) for i1 in range(1, nBar + 1)]
-        fiberYList = [newR * np.sin(angle * i2) for i2 in range(1, nBar + 1)]
-        barFiberInfo = [(xb, yb, area) for xb, yb in zip(fiberXList, fiberYList)]
+        theta = angle * np.arange(1, nBar + 1)
+        fiberXList = newR * np.cos(theta)
+        fiberYList = newR * np.sin(theta)
+        barFiberInfo = FiberSet(fiberXList, fiberYList, area, BAR)
         return barFiberInfo, fiberXList, fiberYList
     ####################################################
     def barMesh(self, outBarD, outBarDist, inBarD=None, inBarDist=None):
@@ -251,7 +272,7 @@ class CircleSection():
             inBarD: bar diameter in inner cover zone
             inBarDist: bar space in inner cover zone
         Output:
-            barFiberInfo:bar fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
+            barFiberInfo:bar fiber infomation, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
         barFiberInfo = None
         barXListPlot = []
@@ -262,7 +283,7 @@ class CircleSection():
         barYListPlot.append(outFiberYList)
         if self.innerDiameter != None:
             inFiberInfo, inFiberXList, inFiberYList = self._barDivide(inBarD, inBarDist, pos="in")
-            barFiberInfo = barFiberInfo + inFiberInfo
+            barFiberInfo = FiberSet.concatenate([barFiberInfo, inFiberInfo])
             barXListPlot.append(inFiberXList)
             barYListPlot.append(inFiberYList)
         return barFiberInfo,barXListPlot,barYListPlot
@@ -449,22 +470,6 @@ class PolygonSection():
             self.inNewNodeDict = innerListDict
             return innerList,inlineList
     ####################################################
-    def _pointToLineD(self,a,b,c,nodeIx,nodeIy,nodeJx,nodeJy):
-        """
-        return the coordinates of the node that in the perpendicular
-        line of a know line with d distance
-        input: a,b,c coefficients of the equation ax+by+c=0
-              nodeIx,nodeIy,nodeJx,nodeJy-the coordinates of node I,J
-        output：newNode-coordinates of a line [(xi,yi)]
-        """
-        a1,b1,c1=a,b,c
-        c22=(a*0.5*(nodeIy+nodeJy)-b*0.5*(nodeIx+nodeJx))
-        a2,b2,c2=b,-a,c22
-        A = np.array([[a1, b1], [a2, b2]])
-        B = np.array([-c1, -c2])
-        newNode = list(solve(A, B))
-        return newNode
-    ####################################################
     def _interNodeCoord(self,nodeDict,coverThick,pos):
         """
         calculate the interline nodes of the polygen section
@@ -473,53 +478,9 @@ class PolygonSection():
              pos-outside boundary line（"outLine"),inside boundary line("innerLine")
         output：NodeList-the node coordinates list [(x1,y1),(x2,y2),...,(xn,yn)]
         """
-        closedNodeValues = list(nodeDict.values())
-        #node coordinates of the closed polygon [(x0,y0),(x1,y1),...,(x0,y0)]
-        closedNodeValues.append(closedNodeValues[0])
-        NodeKeys = list(nodeDict.keys())
-        NodeKeys.append(NodeKeys[0])
-        NodeKeys.append(NodeKeys[1])
-        IterNode = []
-        for i1 in range(len(nodeDict)):
-            IterNode.append((NodeKeys[i1], NodeKeys[i1 + 1], NodeKeys[i1 + 2]))
-        NodeList = []
-        for each1 in IterNode:
-            nodeI = nodeDict[each1[0]]
-            nodeJ = nodeDict[each1[1]]
-            nodeK = nodeDict[each1[2]]
-            nodeIx, nodeIy = nodeI[0], nodeI[1]
-            nodeJx, nodeJy = nodeJ[0], nodeJ[1]
-            nodeKx, nodeKy = nodeK[0], nodeK[1]
-            # determine the line equation with two nodes （y2-y1）x+(x1-x2)y+(x2-x1)y1-x1(y2-y1)=0
-            a1 = (nodeJy - nodeIy)
-            b1 = -(nodeJx - nodeIx)
-            c1 = (nodeJx - nodeIx) * nodeIy - (nodeJy - nodeIy) * nodeIx
-            a2 = (nodeKy - nodeJy)
-            b2 = -(nodeKx - nodeJx)
-            c2 = (nodeKx - nodeJx) * nodeJy - (nodeKy - nodeJy) * nodeJx
-            c1_1 = c1 - math.sqrt(a1 ** 2 + b1 ** 2) * coverThick
-            c1_2 = c1 + math.sqrt(a1 ** 2 + b1 ** 2) * coverThick
-            c2_1 = c2 - math.sqrt(a2 ** 2 + b2 ** 2) * coverThick
-            c2_2 = c2 + math.sqrt(a2 ** 2 + b2 ** 2) * coverThick
-
-            nodeD1_1=self._pointToLineD(a1,b1,c1_1,nodeIx,nodeIy,nodeJx,nodeJy)
-            D1_1Index=is_in_2d_polygon(nodeD1_1,closedNodeValues)
-            nodeD2_1 = self._pointToLineD(a2,b2,c2_1,nodeJx,nodeJy,nodeKx,nodeKy)
-            D2_1Index = is_in_2d_polygon(nodeD2_1, closedNodeValues)
-            if pos == "outLine":
-                c11 = c1_1 if D1_1Index==True else c1_2
-                c22 = c2_1 if D2_1Index==True else c2_2
-            elif pos == "innerLine":
-                c11 = c1_1 if D1_1Index==False else c1_2
-                c22 = c2_1 if D2_1Index==False else c2_2
-            else:
-                print("Error!Please select outLine or innerLine mode!")
-            A = np.array([[a1, b1], [a2, b2]])
-            B = np.array([-c11, -c22])
-            newNode = list(solve(A, B))
-            NodeList.append((newNode[0], newNode[1]))
-        NodeList.insert(0, NodeList[-1])
-        del NodeList[-1]
+        #the offset side is given by the orientation of the ring, all the vertices are solved at once
+        newNodes = offsetPolygon(list(nodeDict.values()), coverThick, pos)
+        NodeList = [(eachNode[0], eachNode[1]) for eachNode in newNodes.tolist()]
         return NodeList
     ####################################################
     def _middleLineNode(self, nodeDict,coverThick,pos="outLine"):
@@ -536,31 +497,40 @@ class PolygonSection():
         newNodeList=self._interNodeCoord(nodeDict, coverThick, pos)
         return newNodeList
     ####################################################
-    def _triEleInfo(self, nodeNArray, eleNArray):
+    def _gmshCoreMesh(self, outLineList, inLineList, eleSize, grading=None, meshBackend=None):
         """
-        calculate the area and centroid node coordinates of triangular fiber elements
-        input：
-            nodeNArray:node coordinates list [[x1,y1],[x2,y2]]
-            eleNArray:element list [[I1,J1,K1],[I2,J2,K2]
-        output：
-            inFoList:fiber element info list [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        inFoList = []
-        for each in eleNArray:
-            I, J, K = each[0], each[1], each[2]
-            x1 = nodeNArray[I][0]
-            y1 = nodeNArray[I][1]
-            x2 = nodeNArray[J][0]
-            y2 = nodeNArray[J][1]
-            x3 = nodeNArray[K][0]
-            y3 = nodeNArray[K][1]
-            area = 0.5 * (x1 * y2 - x2 * y1 + x2 * y3 - x3 * y2 + x3 * y1 - x1 * y3)
-            xc = (x1 + x2 + x3) / 3.0
-            yc = (y1 + y2 + y3) / 3.0
-            inFoList.append((xc, yc, area))
-        return inFoList
+        Mesh the core concrete polygon (with holes if inLineList is not None) with gmsh
+        grading-MeshGrading instance (see meshGrading.py) for a graded mesh, None for the uniform eleSize
+        meshBackend-see _generateTriangles
+        Output: points,triangles-mesh node coordinates and triangle element arrays
+        """
+        outNOdeList=[[outLineList[i1][0],outLineList[i1][1],0] for i1 in range(len(outLineList))]
+        import pygmsh
+        with _geometryLock:
+            geom=pygmsh.opencascade.Geometry()
+            core = geom.add_polygon(outNOdeList, lcar=eleSize)
+            coreId = core.surface.id
+            if inLineList != None:
+                #all the holes are subtracted in one boolean difference (see benchmarks/holeCountBenchmark.py)
+                holeList = []
+                for eachInnerList in inLineList:
+                    inNodeList = [[eachInnerList[i2][0], eachInnerList[i2][1], 0] for i2 in range(len(eachInnerList))]
+                    holeList.append(geom.add_polygon(inNodeList, lcar=eleSize))
+                core = geom.boolean_difference([core], holeList)
+                coreId = core.id
+            if grading is not None:
+                rings = [outLineList] + (list(inLineList) if inLineList != None else [])
+                grading.addFields(geom, coreId, rings)
+        return _generateTriangles(geom, meshBackend)
     ####################################################
-    def coreMesh(self, eleSize, outLineList, inLineList=None):
+    def _gmshRingsMesh(self, rings, eleSize, grading=None, meshBackend=None):
+        """
+        Mesh the core concrete bounded by rings [outRing,holeRing1,...] with gmsh
+        """
+        return self._gmshCoreMesh(rings[0], rings[1:] if len(rings) > 1 else None, eleSize, grading, meshBackend)
+    ####################################################
+    def coreMesh(self, eleSize, outLineList, inLineList=None, meshCache=None, mesher="gmsh", grading=None,
+                 meshBackend=None):
         """
         Core concrete mesh
         Input:
@@ -568,139 +538,102 @@ class PolygonSection():
             outLineList: border line intersect points between outside cover and core [(x1,y1),(x2,y2),...,(xn,yn)]
             inLineList:border line intersect points between inner cover and core[[(x1,y1),(x2,y2),...,(xn,yn)],
                        [(x1,y1),(x2,y2),...,(xn,yn)]]
+            meshCache:MeshCache instance (see meshCache.py) to reuse identical (similar with similarity=True) core meshes, None for no cache
+            mesher:"gmsh" triangular fibers, or "structured" rectangular fibers with exact areas on a grid through the
+                   vertices (no gmsh), the polygons with an edge that is not axis-aligned fall back to "gmsh"
+            grading:MeshGrading instance (see meshGrading.py) for a graded gmsh mesh, None for the uniform eleSize
+            meshBackend:GmshPool instance (see gmshPool.py) to mesh on warm gmsh workers, None for pygmsh.generate_mesh
         Output:
-            triEleInfoList: core fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        triEleInfoList = None
-        outNOdeList=[[outLineList[i1][0],outLineList[i1][1],0] for i1 in range(len(outLineList))]
-
-        if inLineList == None:
-            geom = pygmsh.opencascade.Geometry()
-            geom.add_polygon(outNOdeList,lcar=eleSize)
-            mesh = pygmsh.generate_mesh(geom)
-            points = mesh.points
-            triangles = [each[1] for each in mesh.cells if each.type=='triangle'][0]
-            triEleInfoList = self._triEleInfo(points, triangles)
+            triEleInfoList: core fiber infomation, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
+            the fiber count and size range are recorded in self.coreMeshInfo
+        """
+        rings = [outLineList] + (list(inLineList) if inLineList != None else [])
+        if mesher == "structured":
+            if grading is not None:
+                raise ValueError("Error!The graded mesh needs mesher=gmsh!")
+            gridMesh = rectilinearMesh(rings, eleSize)
+            if gridMesh is not None:
+                xc, yc, area, points, triangles = gridMesh
+                triEleInfoList = FiberSet(xc, yc, area, CORE)
+                self.coreMeshInfo = _meshInfo(mesher, area, grading)
+                return triEleInfoList,points,triangles
+        elif mesher != "gmsh":
+            raise ValueError("Please select mesher=gmsh or mesher=structured!")
+        if meshCache is None:
+            points, triangles = self._gmshCoreMesh(outLineList, inLineList, eleSize, grading, meshBackend)
+        elif meshCache.similarity:
+            #the grading sizes scale with eleSize to the canonical geometry
+            relativeKey = () if grading is None else grading.scaled(1.0 / eleSize).key()
+            meshFunction = lambda canonicalRings, canonicalEleSize: self._gmshRingsMesh(
+                canonicalRings, canonicalEleSize, None if grading is None else grading.scaled(canonicalEleSize / eleSize),
+                meshBackend)
+            points, triangles = meshCache.fetchSimilar("polygon", rings, eleSize, meshFunction, relativeKey)
         else:
-            geom=pygmsh.opencascade.Geometry()
-            outPolygon=geom.add_polygon(outNOdeList, lcar=eleSize)
-            for eachInnerList in inLineList:
-                inNodeList = [[eachInnerList[i2][0], eachInnerList[i2][1], 0] for i2 in range(len(eachInnerList))]
-                inPolygon=geom.add_polygon(inNodeList, lcar=eleSize)
-                differencePolygon=geom.boolean_difference([outPolygon],[inPolygon])
-                outPolygon=differencePolygon
-            mesh = pygmsh.generate_mesh(geom)
-            points = mesh.points
-            triangles = [each[1] for each in mesh.cells if each.type=='triangle'][0]
-            triEleInfoList = self._triEleInfo(points, triangles)
+            key = meshCache.meshKey("polygon", rings, eleSize, () if grading is None else grading.key())
+            points, triangles = meshCache.fetch(key, self._gmshCoreMesh, outLineList, inLineList, eleSize, grading,
+                                                meshBackend, ring=outLineList)
+        xc, yc, area = triEleInfo(points, triangles)
+        triEleInfoList = FiberSet(xc, yc, area, CORE)
+        self.coreMeshInfo = _meshInfo("gmsh", area, grading)
         return triEleInfoList,points,triangles
     ####################################################
-    def _coverDivide(self, outNodeDict, inNodeDict, eleDict, eleSize, coverThick):
+    def _coverDivide(self, ringList, eleSize):
         """
-        cover conrete fiber divide
+        cover conrete fiber divide, all the edges of all the rings in one pass
         input:
-            outNodeDict:outside line nodes dict--{1:(3.5,3),2:(1.5,5),3:(-1.5,5),4:(-3.5,3)}
-            inNodeDict:inside line nodes dict--{1:(2.5,2),2:(0.5,4),3:(-0.5,4),4:(-2.5,2)}
-            eleDict:outside line elements dict--{1:(1,2),2:(2,3),3:(3,4),4:(4,1)}
+            ringList:[(outNodeDict,inNodeDict,eleDict),...] for the outside cover and each inner cover
+                outNodeDict:outside line nodes dict--{1:(3.5,3),2:(1.5,5),3:(-1.5,5),4:(-3.5,3)}
+                inNodeDict:inside line nodes dict--{1:(2.5,2),2:(0.5,4),3:(-0.5,4),4:(-2.5,2)}
+                eleDict:outside line elements dict--{1:(1,2),2:(2,3),3:(3,4),4:(4,1)}
             eleSize:cover concrete elemnt size
-            coverThick:cover concrete thickness
         output：
-            centerCoordList:cover concrete fiber element controid coordinates and area--[(xc1,yc1,A1),(xc2,yc2,A2),...,)
-            outPlotNode:outside line node coordinates list--[(x1,y1),(x2,y2),...,(xn,yn)]
-            inPlotNode:inside line node coordinates list--[(xin1,yin1),...,(xinn,yinn)]
-        """
-        nLine = len(eleDict)
+            coverFiberInfo:cover concrete fiber element controid coordinates and area, FiberSet--[(xc1,yc1,A1),(xc2,yc2,A2),...,)
+            outPlotNode:outside line node coordinates of each ring, closed by its first node--array [(x1,y1),...,(x1,y1),...]
+            inPlotNode:inside line node coordinates of each ring, closed by its first node--array [(xin1,yin1),...]
+        """
+        outStart, outEnd, inStart, inEnd, edgeRing = [], [], [], [], []
+        for ringNumber, (outNodeDict, inNodeDict, eleDict) in enumerate(ringList):
+            nodeIList = [eleDict[i1][0] for i1 in range(1, len(eleDict) + 1)]
+            nodeJList = [eleDict[i1][1] for i1 in range(1, len(eleDict) + 1)]
+            outStart += [outNodeDict[each] for each in nodeIList]
+            outEnd += [outNodeDict[each] for each in nodeJList]
+            inStart += [inNodeDict[each] for each in nodeIList]
+            inEnd += [inNodeDict[each] for each in nodeJList]
+            edgeRing += [ringNumber] * len(nodeIList)
+        xc, yc, area, edgeIndex, outNode, inNode = coverQuadFibers(outStart, outEnd, inStart, inEnd, eleSize)
+        fiberRing = np.array(edgeRing)[edgeIndex]
         outPlotNode = []
         inPlotNode = []
-        centerCoordList = []
-        for i1 in range(1, nLine + 1):
-            nodeI = eleDict[i1][0]
-            nodeJ = eleDict[i1][1]
-            outNodeIx = outNodeDict[nodeI][0]
-            outNodeIy = outNodeDict[nodeI][1]
-            outNodeJx = outNodeDict[nodeJ][0]
-            outNodeJy = outNodeDict[nodeJ][1]
-            inNodeIx = inNodeDict[nodeI][0]
-            inNodeIy = inNodeDict[nodeI][1]
-            inNodeJx = inNodeDict[nodeJ][0]
-            inNodeJy = inNodeDict[nodeJ][1]
-            length = math.sqrt((outNodeJx - outNodeIx) ** 2 + (outNodeJy - outNodeIy) ** 2)
-            nEle = int(length /float(eleSize))
-            totalOutNodeList = []
-            totalInNodeList = []
-            totalOutNodeList.append((outNodeIx, outNodeIy))
-            totalInNodeList.append((inNodeIx, inNodeIy))
-            for i2 in range(1, nEle):
-                outxi = ((nEle - i2) * outNodeIx + i2 * outNodeJx) / nEle  # n equal points equation
-                outyi = ((nEle - i2) * outNodeIy + i2 * outNodeJy) / nEle
-                inxi = ((nEle - i2) * inNodeIx + i2 * inNodeJx) / nEle
-                inyi = ((nEle - i2) * inNodeIy + i2 * inNodeJy) / nEle
-                totalOutNodeList.append((outxi, outyi))
-                totalInNodeList.append((inxi, inyi))
-            totalOutNodeList.append((outNodeJx, outNodeJy))
-            totalInNodeList.append((inNodeJx, inNodeJy))
-            inLength = math.sqrt((totalInNodeList[1][0] - totalInNodeList[0][0]) ** 2 \
-                                 + (totalInNodeList[1][1] - totalInNodeList[0][1]) ** 2)
-            outLength = math.sqrt((totalOutNodeList[1][0] - totalOutNodeList[0][0]) ** 2 + \
-                                  (totalOutNodeList[1][1] - totalOutNodeList[0][1]) ** 2)
-            eleArea = (inLength + outLength) * coverThick / 2.0
-            for j2 in range(len(totalOutNodeList) - 1):
-                outPlotNode.append(totalOutNodeList[j2])
-                inPlotNode.append(totalInNodeList[j2])
-            for i3 in range(len(totalOutNodeList) - 1):
-                outI = totalOutNodeList[i3]
-                outJ = totalOutNodeList[i3 + 1]
-                inI = totalInNodeList[i3]
-                inJ = totalInNodeList[i3 + 1]
-                outCenter = ((outI[0] + outJ[0]) / 2.0, (outI[1] + outJ[1]) / 2.0)
-                inCenter = ((inI[0] + inJ[0]) / 2.0, (inI[1] + inJ[1]) / 2.0)
-                # centroid coordinates and area of fiber element
-                centerCoord = (
-                (outCenter[0] + inCenter[0]) / 2.0, (outCenter[1] + inCenter[1]) / 2.0, eleArea)
-                centerCoordList.append(centerCoord)
-        return centerCoordList, outPlotNode, inPlotNode
+        for ringNumber in range(len(ringList)):
+            ringOutNode = outNode[fiberRing == ringNumber]
+            ringInNode = inNode[fiberRing == ringNumber]
+            outPlotNode.append(np.vstack((ringOutNode, ringOutNode[:1])))
+            inPlotNode.append(np.vstack((ringInNode, ringInNode[:1])))
+        return FiberSet(xc, yc, area, COVER), np.concatenate(outPlotNode), np.concatenate(inPlotNode)
     ####################################################
-    def coverMesh(self, eleSize, coverThick):
+    def coverMesh(self, eleSize, coverThick, outLineList=None, inLineList=None):
         """
         cover fiber mesh
         Input:
             eleSize: fiber size
             coverThick: cover thick
+            outLineList: outside border line nodes of coverLinePlot [(x1,y1),...], None for the last coverLinePlot call
+            inLineList: inside border line nodes of innerLinePlot [[(x1,y1),...],...], None for the last innerLinePlot call
         Output:
-            coverFiberInfo:cover fiber information [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        outNodeReturn = []
-        inNodeReturn = []
-        coverFiberInfo = None
-        nodeOutDict = self.outNode
-        eleOutDict = self.outEle
-        nodeNewOutDict = self.outNewNodeDict  #outside line node dict
-        nodeNewInDict = self.inNewNodeDict  # inside line node dict
-        nodeInDict = self.inNode
-        eleInDict = self.inEle
-        # outside cover concrete fiber divide
-        fiberInfo, outNodeInfo, inNodeInfo = self._coverDivide(nodeOutDict, nodeNewOutDict,\
-                                            eleOutDict,eleSize,coverThick)
-        coverFiberInfo = fiberInfo
-        outNodeInfo.append(outNodeInfo[0])
-        inNodeInfo.append(inNodeInfo[0])
-        outNodeReturn = outNodeInfo
-        inNodeReturn = inNodeInfo
-        # inside cover concrete divide
+            coverFiberInfo:cover fiber information, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
+        """
+        if outLineList is None:
+            outNewNodeDict = self.outNewNodeDict
+        else:
+            outNewNodeDict = {(i1 + 1): outLineList[i1] for i1 in range(len(outLineList))}
+        ringList = [(self.outNode, outNewNodeDict, self.outEle)]
         if self.inNode != None:
-            nInhole = len(self.inNode)
-            inxList = []
-            inyList = []
-            inareaList = []
-            for i4 in range(nInhole):
-                Innerfiber, innerOut, innerIn = self._coverDivide(nodeInDict[i4],\
-                        nodeNewInDict[i4], eleInDict[i4],eleSize,coverThick)
-                coverFiberInfo = coverFiberInfo + Innerfiber
-                innerOut.append(innerOut[0])
-                innerIn.append(innerIn[0])
-                outNodeReturn = outNodeReturn + innerOut
-                inNodeReturn = inNodeReturn + innerIn
-                # self.ax.scatter(inxList,inyList,s=2,c="r")
+            if inLineList is None:
+                inNewNodeDict = self.inNewNodeDict
+            else:
+                inNewNodeDict = [{(j1 + 1): eachList[j1] for j1 in range(len(eachList))} for eachList in inLineList]
+            ringList += list(zip(self.inNode, inNewNodeDict, self.inEle))
+        coverFiberInfo, outNodeReturn, inNodeReturn = self._coverDivide(ringList, eleSize)
         return coverFiberInfo,outNodeReturn,inNodeReturn
     ####################################################
     def _outBarLineNode(self,barToEdgeDist):
@@ -730,46 +663,37 @@ class PolygonSection():
                 innerListDict.append({(j1 + 1): returnNodeList[j1] for j1 in range(len(returnNodeList))})
             return innerListDict
     ####################################################
-    def _barDivide(self, barD, barDist, nodeDict, lineEleDict):
+    def _barLines(self, nodeDict, lineEleDict):
         """
-        bar fiber divide
+        start and end nodes of the bar lines
         input：
-            barD-bar diameter
-            barDist-bar distance
             nodeDict-bar line node dict {1:(x1,y1),2:(x2,y2),...,(xn,yn)}
             lineEleDict-bar line elment dict {1:(1,2),2:(2,3),3:(3,1)}
         output：
-            barFiberList:bar fiber element list [(xb1,yb1,A1),(xb2,yb2,A2),...,(xbn,ybn,An)]
-            xRetrunList:bar fiber horizontal coordinates [xb1,xb2,...,xbn]
-            yReturnList:bar fiber vertical coordinates [yb1,yb2,...,ybn]
+            starts,ends:start and end node coordinates lists [(x1,y1),(x2,y2),...]
         """
-        area = np.pi * barD ** 2 / 4.0
         nLine = len(lineEleDict)
-        barFiberList = []
-        xReturnList = []
-        yReturnList = []
-        for i1 in range(1, nLine + 1):
-            nodeI = lineEleDict[i1][0]
-            nodeJ = lineEleDict[i1][1]
-            nodeIx = nodeDict[nodeI][0]
-            nodeIy = nodeDict[nodeI][1]
-            nodeJx = nodeDict[nodeJ][0]
-            nodeJy = nodeDict[nodeJ][1]
-            length = math.sqrt((nodeJx - nodeIx) ** 2 + (nodeJy - nodeIy) ** 2)
-            nEle = int(length / barDist)
-            lineBarCoorList = []
-            lineBarCoorList.append((nodeIx, nodeIy))
-            for i2 in range(1, nEle):
-                outxi = ((nEle - i2) * nodeIx + i2 * nodeJx) / nEle  # n equal nodes equation
-                outyi = ((nEle - i2) * nodeIy + i2 * nodeJy) / nEle
-                lineBarCoorList.append((outxi, outyi))
-            for i3 in range(len(lineBarCoorList)):
-                barFiberList.append((lineBarCoorList[i3][0], lineBarCoorList[i3][1], area))
-                xReturnList.append(lineBarCoorList[i3][0])
-                yReturnList.append(lineBarCoorList[i3][1])
-        return barFiberList, xReturnList, yReturnList
+        starts = [nodeDict[lineEleDict[i1][0]][:2] for i1 in range(1, nLine + 1)]
+        ends = [nodeDict[lineEleDict[i1][1]][:2] for i1 in range(1, nLine + 1)]
+        return starts, ends
+    ####################################################
+    def _barDivide(self, starts, ends, barD, barDist, tol=None):
+        """
+        bar fiber divide, all the bar lines in one pass
+        input：
+            starts,ends-start and end nodes of the bar lines [(x1,y1),(x2,y2),...]
+            barD-bar diameter, a list for each line or a scalar for all the lines
+            barDist-bar distance, a list for each line or a scalar for all the lines
+            tol-coincident bars (corner bars shared by two lines) closer than tol are kept once, None keeps all
+        output：
+            barFiberList:bar fiber element FiberSet [(xb1,yb1,A1),(xb2,yb2,A2),...,(xbn,ybn,An)]
+            xRetrunList:bar fiber horizontal coordinates array [xb1,xb2,...,xbn]
+            yReturnList:bar fiber vertical coordinates array [yb1,yb2,...,ybn]
+        """
+        xReturnList, yReturnList, area = barLineFibers(starts, ends, barD, barDist, tol)
+        return FiberSet(xReturnList, yReturnList, area, BAR), xReturnList, yReturnList
     ###################################################
-    def barMesh(self, outBarD, outBarDist,coverThick, inBarD=None, inBarDist=None):
+    def barMesh(self, outBarD, outBarDist,coverThick, inBarD=None, inBarDist=None, tol=None):
         """
         bar fiber mesh
         Input:
@@ -777,47 +701,70 @@ class PolygonSection():
             outBarDist: bar space in outside zone
             inBarD: bar diameter in inner zone
             inBarDist: bar space in inner zone
+            tol: coincident bars closer than tol are kept once, None keeps all
         Output:
-            barFiberInfo: bar fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
+            barFiberInfo: bar fiber infomation, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
-        barFiberInfo = None
         #calculate the outside bar interline node coordinates
         outBarLineDict=self._outBarLineNode(coverThick+outBarD/2.0)
-        outBarListEle=self.outEle
-        #outside bar fiber divide
-        outBarFiber, outXList, outYList = self._barDivide(outBarD, outBarDist, outBarLineDict, outBarListEle)
-        barFiberInfo = outBarFiber
-        #inside bar fiber divide
+        starts, ends = self._barLines(outBarLineDict, self.outEle)
+        barDList = [outBarD] * len(starts)
+        barDistList = [outBarDist] * len(starts)
+        #inside bar lines
         if self.inNode != None:
             #calculate the inside bar interline node coordinates
             inBarLineDict = self._innerBarLineNode(coverThick+inBarD/2.0)
-            inBarLineEle = self.inEle
-            nEle = len(inBarLineEle)
-            for i1 in range(nEle):
-                inBarFiber, inXList, inYList = self._barDivide(inBarD, inBarDist, inBarLineDict[i1], inBarLineEle[i1])
-                barFiberInfo = barFiberInfo + inBarFiber
-                outXList = outXList + inXList
-                outYList = outYList + inYList
+            for eachNodeDict, eachEleDict in zip(inBarLineDict, self.inEle):
+                inStarts, inEnds = self._barLines(eachNodeDict, eachEleDict)
+                starts += inStarts
+                ends += inEnds
+                barDList += [inBarD] * len(inStarts)
+                barDistList += [inBarDist] * len(inStarts)
+        barFiberInfo, outXList, outYList = self._barDivide(starts, ends, barDList, barDistList, tol)
         return barFiberInfo,outXList,outYList
     ###################################################
-    def userBarMesh(self, barControlNodeDict,barEleDict):
+    def userBarMesh(self, barControlNodeDict,barEleDict, tol=None):
         """
         manually set the start and end nodes coordinates of each line, bar diameter and distance
         input：barControlNodeDDict:{1:(y1,z1),2:(y2,z2),...}
               barEleDict:each barline info dict{1:(nodeI,nodeJ,barD,barDist)},
               barD-bar diameter dict，barDist-bar distance
-        output：barFiberInfo: bar fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        barFiberInfo =[]
-        XListInfo=[]
-        YListInfo=[]
-        for each in barEleDict.values():
-            BarFiber, XList, YList = self._barDivide(each[2], each[3], barControlNodeDict, {1:(each[0],each[1])})
-            barFiberInfo+=BarFiber
-            XListInfo+=XList
-            YListInfo+=YList
+              tol-coincident bars of different lines closer than tol are kept once, None keeps all
+        output：barFiberInfo: bar fiber infomation, FiberSet [(xc1,yc1,area1),(xc2,yc2,area2)]
+        """
+        barLineInfo = list(barEleDict.values())
+        starts = [barControlNodeDict[each[0]][:2] for each in barLineInfo]
+        ends = [barControlNodeDict[each[1]][:2] for each in barLineInfo]
+        barDList = [each[2] for each in barLineInfo]
+        barDistList = [each[3] for each in barLineInfo]
+        barFiberInfo, XListInfo, YListInfo = self._barDivide(starts, ends, barDList, barDistList, tol)
         return barFiberInfo, XListInfo,YListInfo
 ########################################################################################################################
+def _meshInfo(mesher, area, grading):
+    """
+    Core mesh summary: mesher, fiber count, grading sizes and fiber area range
+    """
+    return {"mesher": mesher, "fiberCount": len(area), "graded": grading is not None,
+            "minSize": None if grading is None else grading.minSize,
+            "maxSize": None if grading is None else grading.maxSize,
+            "minArea": float(np.min(area)) if len(area) > 0 else 0.0,
+            "maxArea": float(np.max(area)) if len(area) > 0 else 0.0}
+######################################################################################
+def _generateTriangles(geom, meshBackend=None):
+    """
+    Mesh the pygmsh geometry with gmsh
+    meshBackend-object with mesh(geoCode)->(points,triangles), for example a GmshPool (see gmshPool.py),
+                None to run gmsh through pygmsh.generate_mesh
+    Output: points,triangles-mesh node coordinates and triangle element arrays
+    """
+    if meshBackend is not None:
+        return meshBackend.mesh(geom.get_code())
+    import pygmsh
+    mesh = pygmsh.generate_mesh(geom)
+    points = mesh.points
+    triangles = [each[1] for each in mesh.cells if each.type=='triangle'][0]
+    return points, triangles
+########################################################################################################################
 def figureSize(outSideNode):
     """
     calculate the window width and height
@@ -0,0 +1,120 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+######################################################################################
+def triEleInfo(points, triangles):
+    """
+    Calculate the area and the centroid coordinates of all the triangle elements at once
+    Input：points-vertex of triangel element, array [[x1,y1,Z1],[x2,y2,Z2]]
+         triangles-triangle element array [[I1,J1,K1],[I2,J2,K2]]
+    Output：
+        xc,yc,area:centroid coordinates and signed area arrays of the fiber elements
+    """
+    vertex = np.asarray(points, dtype=float)[np.asarray(triangles, dtype=np.intp)]
+    x, y = vertex[:, :, 0], vertex[:, :, 1]
+    area = 0.5 * ((x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0]))
+    xc = x.mean(axis=1)
+    yc = y.mean(axis=1)
+    return xc, yc, area
+######################################################################################
+def annularSectorFibers(innerRadius, outRadius, startAngle, endAngle):
+    """
+    Exact area and centroid coordinates of annular sector fibers
+    Input：innerRadius,outRadius-sector radius arrays (innerRadius may be zero)
+         startAngle,endAngle-sector angle arrays (rad)
+    Output：
+        xc,yc,area:centroid coordinates and area arrays of the fiber elements
+    """
+    r1 = np.asarray(innerRadius, dtype=float)
+    r2 = np.asarray(outRadius, dtype=float)
+    halfAngle = 0.5 * (np.asarray(endAngle, dtype=float) - np.asarray(startAngle, dtype=float))
+    midAngle = np.asarray(startAngle, dtype=float) + halfAngle
+    area = halfAngle * (r2 ** 2 - r1 ** 2)
+    centroidRadius = (2.0 / 3.0) * (r2 ** 3 - r1 ** 3) / (r2 ** 2 - r1 ** 2) * np.sin(halfAngle) / halfAngle
+    xc = centroidRadius * np.cos(midAngle)
+    yc = centroidRadius * np.sin(midAngle)
+    return xc, yc, area
+######################################################################################
+def coverQuadFibers(outStart, outEnd, inStart, inEnd, eleSize):
+    """
+    Cover concrete fibers of all the cover edges in one pass
+    Each edge is divided into int(edge length/eleSize) (at least one) fibers by linear interpolation
+    between the matched section edge nodes and core edge nodes
+    Input：outStart,outEnd-start and end nodes of the edges on the section boundary, shape (nEdge,2)
+         inStart,inEnd-matched start and end nodes on the core boundary, shape (nEdge,2)
+         eleSize-cover fiber element size
+    Output：
+        xc,yc,area:centroid coordinates and exact quadrilateral area arrays of the fiber elements
+        edgeIndex:edge number of each fiber
+        outNode,inNode:start node of each fiber on the section boundary and on the core boundary, shape (n,2)
+    """
+    outStart = np.asarray(outStart, dtype=float).reshape(-1, 2)
+    inStart = np.asarray(inStart, dtype=float).reshape(-1, 2)
+    outVector = np.asarray(outEnd, dtype=float).reshape(-1, 2) - outStart
+    inVector = np.asarray(inEnd, dtype=float).reshape(-1, 2) - inStart
+    length = np.hypot(outVector[:, 0], outVector[:, 1])
+    nDivide = np.maximum(1, (length / float(eleSize)).astype(int))
+    edgeIndex = np.repeat(np.arange(len(length)), nDivide)
+    segmentIndex = np.arange(len(edgeIndex)) - np.repeat(np.cumsum(nDivide) - nDivide, nDivide)
+    t1 = (segmentIndex / nDivide[edgeIndex])[:, None]
+    t2 = ((segmentIndex + 1) / nDivide[edgeIndex])[:, None]
+    outOrigin, outDirection = outStart[edgeIndex], outVector[edgeIndex]
+    inOrigin, inDirection = inStart[edgeIndex], inVector[edgeIndex]
+    quad = np.stack((outOrigin + t1 * outDirection, outOrigin + t2 * outDirection,
+                     inOrigin + t2 * inDirection, inOrigin + t1 * inDirection), axis=1)
+    #polygon area and centroid of each quadrilateral, relative to its first node
+    local = quad - quad[:, :1, :]
+    nextLocal = np.roll(local, -1, axis=1)
+    cross = local[:, :, 0] * nextLocal[:, :, 1] - nextLocal[:, :, 0] * local[:, :, 1]
+    signedArea = 0.5 * cross.sum(axis=1)
+    centroid = ((local + nextLocal) * cross[:, :, None]).sum(axis=1) / (6.0 * signedArea[:, None]) + quad[:, 0, :]
+    return centroid[:, 0], centroid[:, 1], np.abs(signedArea), edgeIndex, quad[:, 0, :], quad[:, 3, :]
+######################################################################################
+def _mergeCoincident(coord, tol):
+    """
+    Index of the points kept when the points within tol of an earlier kept point are merged into it
+    """
+    from scipy.spatial import cKDTree
+    pairs = cKDTree(coord).query_pairs(tol, output_type="ndarray")
+    keep = np.ones(len(coord), dtype=bool)
+    #pairs (i<j) in the order of j, so keep[i] is final when the pair is reached
+    for i1, j1 in pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]:
+        if keep[i1]:
+            keep[j1] = False
+    return np.flatnonzero(keep)
+######################################################################################
+def barLineFibers(starts, ends, barD, barDist, tol=None):
+    """
+    Bar fibers of all the bar lines in one pass
+    Each line gets int(line length/barDist) (at least one) equally spaced bars, the first one on the start
+    node and none on the end node (it is the start node of the next line of a closed bar ring)
+    Input：starts,ends-start and end nodes of the bar lines, shape (nLine,2)
+         barD-bar diameter of each line, array or a scalar for all the lines
+         barDist-bar distance of each line, array or a scalar for all the lines
+         tol-bars within the distance tol of an earlier bar are merged into it (the first one wins, needs scipy),
+             None keeps all the bars
+    Output：
+        xb,yb,area:bar fiber coordinates and area arrays
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    vector = np.asarray(ends, dtype=float).reshape(-1, 2) - starts
+    nLine = len(starts)
+    barD = np.broadcast_to(np.asarray(barD, dtype=float), (nLine,))
+    barDist = np.broadcast_to(np.asarray(barDist, dtype=float), (nLine,))
+    length = np.hypot(vector[:, 0], vector[:, 1])
+    nBar = np.maximum(1, (length / barDist).astype(int))
+    lineIndex = np.repeat(np.arange(nLine), nBar)
+    barIndex = np.arange(len(lineIndex)) - np.repeat(np.cumsum(nBar) - nBar, nBar)
+    t = (barIndex / nBar[lineIndex])[:, None]
+    coord = starts[lineIndex] + t * vector[lineIndex]
+    area = np.pi * barD[lineIndex] ** 2 / 4.0
+    if tol is not None and len(coord) > 1:
+        keptIndex = _mergeCoincident(coord, tol)
+        coord, area = coord[keptIndex], area[keptIndex]
+    return coord[:, 0], coord[:, 1], area
+######################################################################################
@@ -0,0 +1,135 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+######################################################################################
+#fiber region (material) tags
+CORE = 0
+COVER = 1
+BAR = 2
+regionNames = {CORE: "core", COVER: "cover", BAR: "bar"}
+######################################################################################
+class FiberSet():
+    """
+    Fiber container backed by contiguous float64 arrays
+    Columns: y,z-fiber coordinates in local y-z plane
+             area-fiber area
+             tag-fiber region (material) tag, CORE, COVER or BAR
+    The set behaves like the legacy fiber list [(y1,z1,area1),(y2,z2,area2),...]:
+    len(fibers), fibers[i], iteration and "+" with another FiberSet or list still work
+    #######################---example---#########################
+    from fiberSet import FiberSet, CORE, COVER, BAR
+    core = FiberSet([0.0, 0.1], [0.0, 0.1], [0.01, 0.01], CORE)
+    cover = FiberSet([0.5], [0.5], [0.02], COVER)
+    fibers = FiberSet.concatenate([core, cover])
+    fibers.region(COVER)  # zero-copy view of the cover fibers
+    np.asarray(fibers)  # (n,3) array [[y1,z1,area1],...]
+    fibers.properties({BAR: 6.0})  # area, centroid, moments of inertia of each region and the transformed section
+    """
+    __slots__ = ("y", "z", "area", "tag")
+    ####################################################
+    def __init__(self, y=(), z=(), area=(), tag=CORE):
+        """
+        Initialize the set
+        Input: y,z,area-fiber coordinates and area arrays, area may be a scalar for equal fibers
+               tag-region tag array, or a scalar for all the fibers
+        """
+        self.y = np.asarray(y, dtype=np.float64).reshape(-1)
+        self.z = np.asarray(z, dtype=np.float64).reshape(-1)
+        nFiber = len(self.y)
+        area = np.asarray(area, dtype=np.float64)
+        self.area = np.full(nFiber, float(area)) if area.ndim == 0 else area.reshape(-1)
+        tag = np.asarray(tag, dtype=np.int16)
+        self.tag = np.full(nFiber, int(tag), dtype=np.int16) if tag.ndim == 0 else tag.reshape(-1)
+        if not (len(self.z) == len(self.area) == len(self.tag) == nFiber):
+            raise ValueError("y, z, area and tag must have the same length")
+    ####################################################
+    @classmethod
+    def fromTuples(cls, fiberList, tag=CORE):
+        """
+        Build the set from the legacy fiber list
+        Input: fiberList-[(y1,z1,area1),(y2,z2,area2),...]
+               tag-region tag of the fibers
+        """
+        data = np.asarray(fiberList, dtype=np.float64).reshape(-1, 3)
+        return cls(data[:, 0].copy(), data[:, 1].copy(), data[:, 2].copy(), tag)
+    ####################################################
+    @classmethod
+    def concatenate(cls, fiberSets):
+        """
+        Join several sets with a single copy of each column
+        Input: fiberSets-FiberSet list
+        """
+        fiberSets = list(fiberSets)
+        if not fiberSets:
+            return cls()
+        return cls(np.concatenate([each.y for each in fiberSets]),
+                   np.concatenate([each.z for each in fiberSets]),
+                   np.concatenate([each.area for each in fiberSets]),
+                   np.concatenate([each.tag for each in fiberSets]))
+    ####################################################
+    def region(self, tag):
+        """
+        Return the fibers with the given region tag
+        The result is a view of this set when the region is stored contiguously (the usual case),
+        otherwise it is a copy
+        """
+        index = np.flatnonzero(self.tag == tag)
+        if len(index) == 0:
+            return FiberSet()
+        if index[-1] - index[0] + 1 == len(index):
+            return self[index[0]:index[-1] + 1]
+        return self[index]
+    ####################################################
+    def properties(self, modularRatio=None):
+        """
+        Section properties of each region and of the transformed section, see sectionProperty.sectionProperties
+        Input: modularRatio-weight of each region {tag:ratio}, for example {BAR:Es/Ec}
+        """
+        from sectionProperty import sectionProperties
+        return sectionProperties(self, modularRatio)
+    ####################################################
+    def toArray(self):
+        """
+        Return the (n,3) array [[y1,z1,area1],[y2,z2,area2],...]
+        """
+        return np.column_stack((self.y, self.z, self.area))
+    ####################################################
+    def toList(self):
+        """
+        Return the legacy fiber list [(y1,z1,area1),(y2,z2,area2),...]
+        """
+        return list(self)
+    ####################################################
+    def __array__(self, dtype=None, copy=None):
+        array = self.toArray()
+        return array if dtype is None else array.astype(dtype)
+    ####################################################
+    def __len__(self):
+        return len(self.y)
+    ####################################################
+    def __iter__(self):
+        return zip(self.y.tolist(), self.z.tolist(), self.area.tolist())
+    ####################################################
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return (float(self.y[index]), float(self.z[index]), float(self.area[index]))
+        return FiberSet(self.y[index], self.z[index], self.area[index], self.tag[index])
+    ####################################################
+    def __add__(self, other):
+        if isinstance(other, FiberSet):
+            return FiberSet.concatenate([self, other])
+        return list(self) + list(other)
+    ####################################################
+    def __radd__(self, other):
+        return list(other) + list(self)
+    ####################################################
+    def __repr__(self):
+        counts = ", ".join("%s=%d" % (regionNames.get(int(eachTag), eachTag), eachCount)
+                           for eachTag, eachCount in zip(*np.unique(self.tag, return_counts=True)))
+        return "FiberSet(n=%d%s)" % (len(self), (", " + counts) if counts else "")
+######################################################################################
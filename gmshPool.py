@@ -0,0 +1,326 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Warm gmsh worker pool, a core mesh backend without the gmsh start and finalize of each mesh
+#  each worker process initializes gmsh once (gmsh Python API) and meshes the .geo code of the jobs,
+#  the jobs are sent over a queue of each worker, the node and triangle arrays come back in shared memory blocks
+#  a dispatcher thread sends the submitted jobs to the idle workers and collects the results as they come back,
+#  so the jobs of a batch (meshMany) or of several threads (mesh) are meshed at the same time
+#  a worker that exits (crash, checked on every poll) or exceeds the job timeout is restarted and its job is sent
+#  again
+#  the pool holds processes and queues, it is used in the process that created it and cannot be pickled
+######################################################################################
+import os
+import time
+import queue
+import shutil
+import tempfile
+import threading
+import traceback
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+######################################################################################
+def _startGmsh():
+    """
+    Initialize the gmsh session of a worker process
+    """
+    import gmsh
+    gmsh.initialize()
+    gmsh.option.setNumber("General.Terminal", 0)
+    return gmsh
+######################################################################################
+def _meshGeoCode(gmsh, geoCode, workDir):
+    """
+    Mesh the .geo code in the gmsh session
+    Output: points,triangles-mesh node coordinates (n,3) and triangle element (m,3) arrays, only the triangle nodes
+    """
+    gmsh.clear()
+    geoPath = os.path.join(workDir, "core.geo")
+    with open(geoPath, "w") as geoFile:
+        geoFile.write(geoCode)
+    gmsh.open(geoPath)
+    gmsh.model.mesh.generate(2)
+    nodeTags, coords, parametric = gmsh.model.mesh.getNodes()
+    elementTags, elementNodes = gmsh.model.mesh.getElementsByType(2)
+    nodeTags = np.asarray(nodeTags, dtype=np.int64)
+    tagIndex = np.zeros(nodeTags.max() + 1, dtype=np.int64)
+    tagIndex[nodeTags] = np.arange(len(nodeTags))
+    triangles = tagIndex[np.asarray(elementNodes, dtype=np.int64)].reshape(-1, 3)
+    #only the nodes of the triangles are kept, as pygmsh.generate_mesh
+    usedNodes, triangles = np.unique(triangles, return_inverse=True)
+    points = np.asarray(coords, dtype=np.float64).reshape(-1, 3)[usedNodes]
+    return points, triangles.reshape(-1, 3)
+######################################################################################
+def _shareArrays(arrays):
+    """
+    Copy the arrays into a new shared memory block
+    Output: blockName,layout-[(shape,dtype,offset),...]
+    """
+    from multiprocessing import shared_memory
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(each.nbytes for each in arrays)))
+    layout = []
+    offset = 0
+    for eachArray in arrays:
+        np.ndarray(eachArray.shape, eachArray.dtype, buffer=block.buf, offset=offset)[...] = eachArray
+        layout.append((eachArray.shape, eachArray.dtype.str, offset))
+        offset += eachArray.nbytes
+    blockName = block.name
+    block.close()
+    return blockName, layout
+######################################################################################
+def _readShared(blockName, layout):
+    """
+    Copy the arrays out of the shared memory block and release the block
+    """
+    from multiprocessing import shared_memory
+    block = shared_memory.SharedMemory(name=blockName)
+    try:
+        return [np.ndarray(shape, dtype, buffer=block.buf, offset=offset).copy() for shape, dtype, offset in layout]
+    finally:
+        block.close()
+        block.unlink()
+######################################################################################
+def _gmshWorker(workerIndex, jobQueue, resultQueue):
+    """
+    Worker process loop, one gmsh session for all the jobs, None job to stop
+    result message: (workerIndex, jobId, blockName, layout, error message or None)
+    """
+    gmsh = _startGmsh()
+    workDir = tempfile.mkdtemp(prefix="gmshPool")
+    try:
+        while True:
+            job = jobQueue.get()
+            if job is None:
+                break
+            jobId, geoCode = job
+            try:
+                blockName, layout = _shareArrays(_meshGeoCode(gmsh, geoCode, workDir))
+                resultQueue.put((workerIndex, jobId, blockName, layout, None))
+            except Exception:
+                resultQueue.put((workerIndex, jobId, None, None, traceback.format_exc()))
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+        gmsh.finalize()
+######################################################################################
+class GmshPool():
+    """
+    Pool of long-lived gmsh worker processes, the meshBackend of coreMesh
+    #######################---example---#########################
+    from gmshPool import GmshPool
+    from sectionFiberMain import polygonSection, sectionBatch
+    if __name__ == "__main__":
+        with GmshPool(nWorker=4) as pool:
+            coreFiber, coverFiber, barFiber = polygonSection(*sectionArgs, meshBackend=pool)
+            #the sections are generated in threads of this process, their core meshes on the 4 workers at once
+            results, errors = sectionBatch(sectionSpecs, maxWorkers=4, meshBackend=pool)
+            results, errors = pool.meshMany(geoCodeList)
+    """
+    #seconds between the checks of the workers while jobs are running
+    pollTime = 0.02
+    ####################################################
+    def __init__(self, nWorker=2, maxRetry=1, jobTimeout=None, startMethod=None):
+        """
+        Input: nWorker-number of worker processes
+               maxRetry-number of times the job of a crashed (or timed out) worker is sent again
+               jobTimeout-seconds a worker may spend on one job before it is restarted, None for no limit
+               startMethod-multiprocessing start method ("fork", "spawn", ...), None for the platform default
+        """
+        from multiprocessing import resource_tracker
+        #the workers share the resource tracker of this process, so the result blocks outlive the workers
+        resource_tracker.ensure_running()
+        self._context = multiprocessing.get_context(startMethod)
+        self._resultQueue = self._context.Queue()
+        self.nWorker = max(1, nWorker)
+        self._workers = [None] * self.nWorker
+        #pending job ids in send order, busy workers {workerIndex: (jobId, start time)},
+        #jobs {jobId: [future, geoCode, attempts]}
+        self._pending = deque()
+        self._busy = {}
+        self._jobs = {}
+        self._jobCount = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.maxRetry = maxRetry
+        self.jobTimeout = jobTimeout
+        self.restartCount = 0
+        for i1 in range(len(self._workers)):
+            self._startWorker(i1)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="gmshPoolDispatcher", daemon=True)
+        self._dispatcher.start()
+    ####################################################
+    def __reduce__(self):
+        raise TypeError("GmshPool holds worker processes and cannot be pickled, use it in the process that created "
+                        "it (for a batch: sectionBatch(sectionSpecs, meshBackend=pool))")
+    ####################################################
+    def _startWorker(self, workerIndex):
+        jobQueue = self._context.Queue()
+        process = self._context.Process(target=_gmshWorker, args=(workerIndex, jobQueue, self._resultQueue),
+                                        daemon=True)
+        process.start()
+        self._workers[workerIndex] = (process, jobQueue)
+    ####################################################
+    def _finishJob(self, jobId, result=None, error=None):
+        future = self._jobs.pop(jobId)[0]
+        if future.cancelled():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(RuntimeError(error))
+    ####################################################
+    def _checkWorkers(self):
+        """
+        Restart the workers that exited or timed out, send their jobs again or fail them
+        """
+        for workerIndex, (process, jobQueue) in enumerate(self._workers):
+            job = self._busy.get(workerIndex)
+            timedOut = job is not None and self.jobTimeout is not None and \
+                       time.perf_counter() - job[1] > self.jobTimeout
+            if process.is_alive() and not timedOut:
+                continue
+            if timedOut:
+                process.kill()
+            process.join()
+            self._startWorker(workerIndex)
+            self.restartCount += 1
+            if job is None:
+                continue
+            del self._busy[workerIndex]
+            jobId = job[0]
+            if self._jobs[jobId][2] <= self.maxRetry:
+                self._pending.appendleft(jobId)
+            else:
+                reason = "timed out" if timedOut else "exited with code %s" % process.exitcode
+                self._finishJob(jobId, error="gmsh worker %s after %d attempts" % (reason, self._jobs[jobId][2]))
+    ####################################################
+    def _sendJobs(self):
+        for workerIndex, (process, jobQueue) in enumerate(self._workers):
+            if not self._pending:
+                break
+            if workerIndex not in self._busy:
+                jobId = self._pending.popleft()
+                job = self._jobs[jobId]
+                #a job cancelled before it was sent is dropped, a running job cannot be cancelled
+                if job[2] == 0 and not job[0].set_running_or_notify_cancel():
+                    del self._jobs[jobId]
+                    continue
+                job[2] += 1
+                jobQueue.put((jobId, job[1]))
+                self._busy[workerIndex] = (jobId, time.perf_counter())
+    ####################################################
+    def _receive(self, message):
+        workerIndex, jobId, blockName, layout, error = message
+        if self._busy.get(workerIndex, (None,))[0] != jobId:
+            #result of a job that was already sent again (or failed)
+            if blockName is not None:
+                _readShared(blockName, layout)
+            return
+        del self._busy[workerIndex]
+        if error is not None:
+            self._finishJob(jobId, error=error)
+        else:
+            self._finishJob(jobId, tuple(_readShared(blockName, layout)))
+    ####################################################
+    def _dispatch(self):
+        """
+        Dispatcher thread loop: check the workers, send the pending jobs, collect one result
+        """
+        while True:
+            with self._condition:
+                while not self._closed and not self._pending and not self._busy:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                self._checkWorkers()
+                self._sendJobs()
+            try:
+                message = self._resultQueue.get(timeout=self.pollTime)
+            except queue.Empty:
+                continue
+            with self._condition:
+                self._receive(message)
+    ####################################################
+    def submit(self, geoCode):
+        """
+        Queue one .geo code, return a concurrent.futures.Future of (points,triangles)
+        the future raises RuntimeError with the worker error message when the job fails
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("the gmsh pool is closed")
+            self._jobCount += 1
+            self._jobs[self._jobCount] = [future, geoCode, 0]
+            self._pending.append(self._jobCount)
+            self._condition.notify()
+        return future
+    ####################################################
+    def meshMany(self, geoCodes):
+        """
+        Mesh many .geo codes on the workers, all the jobs are queued at once
+        Input: geoCodes-.geo code string list, for example [geom.get_code(),...] of pygmsh geometries
+        Output: results-[(points,triangles),...] in input order, None for a failed job
+                errors-failed jobs {index: error message}, the other jobs are still meshed
+        """
+        futures = [self.submit(eachCode) for eachCode in geoCodes]
+        results = [None] * len(futures)
+        errors = {}
+        for i1, eachFuture in enumerate(futures):
+            try:
+                results[i1] = eachFuture.result()
+            except RuntimeError as error:
+                errors[i1] = str(error)
+        return results, errors
+    ####################################################
+    def mesh(self, geoCode):
+        """
+        Mesh one .geo code, several threads may call it at the same time
+        Output: points,triangles-mesh node coordinates and triangle element arrays
+        """
+        try:
+            return self.submit(geoCode).result()
+        except RuntimeError as error:
+            raise RuntimeError("gmsh worker failed:\n%s" % error) from None
+    ####################################################
+    def close(self, timeout=5.0):
+        """
+        Stop the dispatcher thread and the worker processes, the unfinished jobs fail
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join()
+        for jobId in list(self._jobs):
+            self._finishJob(jobId, error="the gmsh pool was closed")
+        self._pending.clear()
+        self._busy.clear()
+        for process, jobQueue in self._workers:
+            if process.is_alive():
+                jobQueue.put(None)
+        for process, jobQueue in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        #release the shared memory blocks of the results that were not collected
+        while True:
+            try:
+                workerIndex, jobId, blockName, layout, error = self._resultQueue.get(timeout=0.01)
+            except queue.Empty:
+                break
+            if blockName is not None:
+                _readShared(blockName, layout)
+    ####################################################
+    def __enter__(self):
+        return self
+    ####################################################
+    def __exit__(self, excType, excValue, excTraceback):
+        self.close()
+######################################################################################
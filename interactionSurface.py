@@ -0,0 +1,194 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Biaxial P-M-M interaction surface of the fiber sections
+#  neutral axis angle theta: the compression side is in the direction (cos(theta),sin(theta)) of the y-z plane
+#  ultimate strain states of each angle (pivot method), s=y*cos(theta)+z*sin(theta):
+#      the extreme compression fiber at ultimateStrain, the extreme tension fiber strain from ultimateStrain
+#      (pure compression) to tensionStrain, then the extreme tension fiber at tensionStrain and the extreme
+#      compression fiber strain from ultimateStrain to tensionStrain (pure tension),
+#      the neutral axis depth goes from infinity to zero and back along the sweep
+#  surface points (N,My,Mz) are the section forces of these states, moments about center
+#  scipy (ConvexHull) is imported on the first surface lookup
+######################################################################################
+import os
+import hashlib
+import traceback
+import numpy as np
+from fiberSet import FiberSet, CORE
+from strainPlane import sectionResponse
+######################################################################################
+def ultimatePlanes(fibers, angles, nDepth=40, ultimateStrain=-0.003, tensionStrain=0.05):
+    """
+    Ultimate strain planes of the neutral axis angles
+    Input: fibers-FiberSet
+           angles-neutral axis angle array (rad)
+           nDepth-number of states of each pivot range, 2*nDepth states for each angle
+           ultimateStrain-compression strain limit of the extreme compression fiber (negative)
+           tensionStrain-tension strain limit of the extreme tension fiber (positive)
+    Output: planes-(nAngle*2*nDepth,3) strain plane array [[eps0,kappaY,kappaZ],...], angle by angle
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1)
+    cosValue, sinValue = np.cos(angles), np.sin(angles)
+    #(nAngle,nFiber) coordinate of the fibers along the compression direction
+    s = cosValue[:, None] * fibers.y + sinValue[:, None] * fibers.z
+    sTop, sBottom = s.max(axis=1), s.min(axis=1)
+    #strain pairs (top,bottom) along the two pivot ranges, cosine spacing: denser at both ends of each range
+    #(pure compression, the pivot switch with the extreme fibers at both limits, pure tension)
+    ratio = 0.5 - 0.5 * np.cos(np.linspace(0.0, np.pi, nDepth, endpoint=False))
+    bottomStrain = np.concatenate((ultimateStrain + ratio * (tensionStrain - ultimateStrain),
+                                   np.full(nDepth, tensionStrain)))
+    topStrain = np.concatenate((np.full(nDepth, ultimateStrain),
+                                ultimateStrain + np.append(ratio[1:], 1.0) * (tensionStrain - ultimateStrain)))
+    #eps(s)=a+b*s through (sTop,topStrain) and (sBottom,bottomStrain)
+    depth = np.where(sTop - sBottom > 0.0, sTop - sBottom, 1.0)
+    b = (topStrain[None, :] - bottomStrain[None, :]) / depth[:, None]
+    a = topStrain[None, :] - b * sTop[:, None]
+    #eps=eps0+kappaY*z-kappaZ*y, so kappaY=b*sin(theta), kappaZ=-b*cos(theta)
+    planes = np.stack((a, b * sinValue[:, None], -b * cosValue[:, None]), axis=2)
+    return planes.reshape(-1, 3)
+######################################################################################
+def surfacePoints(fibers, materials, angles, nDepth=40, ultimateStrain=-0.003, tensionStrain=0.05,
+                  center=(0.0, 0.0), chunkSize=None):
+    """
+    Interaction surface points (N,My,Mz) of the neutral axis angles, one vectorized batch
+    Input: fibers,materials-see strainPlane.sectionResponse
+           angles,nDepth,ultimateStrain,tensionStrain-see ultimatePlanes
+           center-(y,z) point the moments are taken about
+    Output: points-(nAngle*2*nDepth,3) array [[N,My,Mz],...]
+    """
+    if not isinstance(fibers, FiberSet):
+        fibers = FiberSet.fromTuples(fibers, CORE)
+    planes = ultimatePlanes(fibers, angles, nDepth, ultimateStrain, tensionStrain)
+    forces = sectionResponse(fibers, materials, planes, chunkSize, tangent=False)
+    #moments about center: My-N*zc, Mz+N*yc
+    forces[:, 1] -= forces[:, 0] * center[1]
+    forces[:, 2] += forces[:, 0] * center[0]
+    return forces
+######################################################################################
+def surfaceKey(fibers, materials, options):
+    """
+    Content hash of the fibers, the material laws and the sweep options
+    """
+    digest = hashlib.sha256()
+    for eachArray in (fibers.y, fibers.z, fibers.area, fibers.tag):
+        digest.update(np.ascontiguousarray(eachArray).tobytes())
+    for eachTag in sorted(materials):
+        material = materials[eachTag]
+        digest.update(repr((eachTag, type(material).__name__, sorted(vars(material).items()))).encode())
+    digest.update(repr(sorted(options.items())).encode())
+    return "interaction-" + digest.hexdigest()
+######################################################################################
+def _angleWorker(args):
+    """
+    Surface points of a group of angles, return (points, None) or (None, error message)
+    """
+    try:
+        fibers, materials, angles, options = args
+        return surfacePoints(fibers, materials, angles, **options), None
+    except Exception:
+        return None, traceback.format_exc()
+######################################################################################
+class InteractionSurface():
+    """
+    Biaxial P-M-M interaction surface and demand/capacity lookup
+    #######################---example---#########################
+    from fiberSet import FiberSet, CORE, COVER, BAR
+    from uniaxialMaterial import KentParkConcrete, BilinearSteel
+    from interactionSurface import InteractionSurface
+    fibers = FiberSet.concatenate([coreFiber, coverFiber, barFiber])
+    materials = {CORE: KentParkConcrete(-34.5e3, -0.004, -24.0e3, -0.014),
+                 COVER: KentParkConcrete(-27.6e3, -0.002, 0.0, -0.006), BAR: BilinearSteel(400.0e3, 2.0e8, 0.01)}
+    surface = InteractionSurface.generate(fibers, materials, nAngle=72, nDepth=40, maxWorkers=4)
+    ratio = surface.demandCapacityRatio([[-5000.0, 3000.0, 1000.0], [-20000.0, 0.0, 8000.0]])
+    """
+    ####################################################
+    def __init__(self, points):
+        """
+        Input: points-surface point array [[N,My,Mz],...]
+        """
+        self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self._hull = None
+        self._scale = None
+    ####################################################
+    @classmethod
+    def generate(cls, fibers, materials, nAngle=36, nDepth=40, ultimateStrain=-0.003, tensionStrain=0.05,
+                 center=(0.0, 0.0), maxWorkers=1, cache=None, chunkSize=None):
+        """
+        Sweep the neutral axis angle and depth of the fiber section
+        Input: fibers,materials-see strainPlane.sectionResponse
+               nAngle-number of neutral axis angles in [0,2*pi)
+               nDepth,ultimateStrain,tensionStrain-see ultimatePlanes
+               center-(y,z) point the moments are taken about
+               maxWorkers-1 sweeps in this process, otherwise the angles are split among the worker processes
+                          (None for the number of processors)
+               cache-MeshCache instance (see meshCache.py), the surface of the same section, materials and
+                     options is reused, None for no cache
+               chunkSize-see strainPlane.sectionResponse
+        Output: surface-InteractionSurface
+        """
+        if not isinstance(fibers, FiberSet):
+            fibers = FiberSet.fromTuples(fibers, CORE)
+        options = {"nDepth": nDepth, "ultimateStrain": ultimateStrain, "tensionStrain": tensionStrain,
+                   "center": tuple(center), "chunkSize": chunkSize}
+        key = None
+        if cache is not None:
+            key = surfaceKey(fibers, materials, dict(options, nAngle=nAngle))
+            arrays = cache.get(key)
+            if arrays is not None:
+                return cls(arrays["points"])
+        angles = np.linspace(0.0, 2.0 * np.pi, nAngle, endpoint=False)
+        if maxWorkers == 1:
+            points = surfacePoints(fibers, materials, angles, **options)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            nGroup = maxWorkers or os.cpu_count() or 1
+            taskList = [(fibers, materials, eachGroup, options) for eachGroup in np.array_split(angles, nGroup)
+                        if len(eachGroup) > 0]
+            with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+                pointList = []
+                for eachPoints, error in executor.map(_angleWorker, taskList):
+                    if error is not None:
+                        raise RuntimeError("interaction surface worker failed:\n" + error)
+                    pointList.append(eachPoints)
+            points = np.concatenate(pointList)
+        if cache is not None:
+            cache.put(key, points=points)
+        return cls(points)
+    ####################################################
+    def _buildHull(self):
+        from scipy.spatial import ConvexHull
+        #N and M have different units, the hull is built on the points scaled to the unit box
+        self._scale = np.maximum(np.abs(self.points).max(axis=0), 1.0e-300)
+        self._hull = ConvexHull(self.points / self._scale)
+        if np.any(self._hull.equations[:, 3] >= 0.0):
+            raise ValueError("the zero force state is not inside the interaction surface")
+    ####################################################
+    def demandCapacityRatio(self, demands, chunkSize=4096):
+        """
+        Demand/capacity ratio of the demand points, the capacity point is where the ray from the origin
+        (zero forces) through the demand point leaves the convex hull of the surface points
+        Input: demands-demand point array [[N,My,Mz],...]
+               chunkSize-number of demand points tested at the same time
+        Output: ratio-array, <=1.0 inside the surface
+        """
+        if self._hull is None:
+            self._buildHull()
+        demand = np.asarray(demands, dtype=float).reshape(-1, 3) / self._scale
+        normal, offset = self._hull.equations[:, :3], self._hull.equations[:, 3]
+        ratio = np.empty(len(demand))
+        for i1 in range(0, len(demand), chunkSize):
+            #facet i: normal.x+offset=0, offset<0 for the origin inside, the ray t*d meets it at t=-offset/(normal.d)
+            projection = demand[i1:i1 + chunkSize] @ normal.T
+            ratio[i1:i1 + chunkSize] = np.max(projection / -offset, axis=1).clip(min=0.0)
+        return ratio
+    ####################################################
+    def contains(self, demands):
+        """
+        Return a boolean array, True for the demand points inside the surface
+        """
+        return self.demandCapacityRatio(demands) <= 1.0
+######################################################################################
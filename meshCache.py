@@ -0,0 +1,242 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import os
+import hashlib
+import tempfile
+from collections import OrderedDict
+import numpy as np
+######################################################################################
+def _canonicalRing(ring, decimals=12):
+    """
+    ring vertex array rounded, counter-clockwise and rotated to start at the lexicographically smallest vertex
+    """
+    ringArray = np.round(np.asarray(ring, dtype=np.float64)[:, :2], decimals) + 0.0
+    #a clockwise ring is the same geometry as the counter-clockwise one
+    if _signedArea(ringArray) < 0.0:
+        ringArray = ringArray[::-1]
+    startIndex = np.lexsort((ringArray[:, 1], ringArray[:, 0]))[0]
+    return np.ascontiguousarray(np.roll(ringArray, -startIndex, axis=0))
+######################################################################################
+def _signedArea(ring):
+    ringArray = np.asarray(ring, dtype=np.float64)[:, :2]
+    nextRing = np.roll(ringArray, -1, axis=0)
+    return 0.5 * (ringArray[:, 0] * nextRing[:, 1] - nextRing[:, 0] * ringArray[:, 1]).sum()
+######################################################################################
+def _orientTriangles(points, triangles, ring):
+    """
+    triangles with the winding of the ring, the keys of both ring orientations are the same but the gmsh triangles
+    (and the signed fiber areas) follow the orientation of the meshed ring
+    """
+    vertex = points[triangles[:, :3], :2]
+    edge1, edge2 = vertex[:, 1] - vertex[:, 0], vertex[:, 2] - vertex[:, 0]
+    meshArea = 0.5 * (edge1[:, 0] * edge2[:, 1] - edge1[:, 1] * edge2[:, 0]).sum()
+    if meshArea * _signedArea(ring) < 0.0:
+        return triangles[:, ::-1]
+    return triangles
+######################################################################################
+def similarityFrame(rings):
+    """
+    translation, rotation and uniform scale that take the rings to their canonical position
+    input: rings-boundary rings [outRing,holeRing1,...], each [(x1,y1),...,(xn,yn)]
+    output: center-area centroid of the region bounded by the rings
+            rotation-(2,2) array, its columns are the canonical x and y axes in the section plane
+            scale-square root of the region area
+    canonical coordinates: (point-center)@rotation/scale
+    """
+    ringArrays = [np.asarray(eachRing, dtype=np.float64)[:, :2] for eachRing in rings]
+    totalArea = 0.0
+    firstMoment = np.zeros(2)
+    for i1, ring in enumerate(ringArrays):
+        nextRing = np.roll(ring, -1, axis=0)
+        cross = ring[:, 0] * nextRing[:, 1] - nextRing[:, 0] * ring[:, 1]
+        ringArea = 0.5 * cross.sum()
+        ringMoment = ((ring + nextRing) * cross[:, None]).sum(axis=0) / 6.0
+        #the outside ring adds and the holes subtract, whatever the vertex order
+        sign = (1.0 if i1 == 0 else -1.0) * (1.0 if ringArea >= 0.0 else -1.0)
+        totalArea += sign * ringArea
+        firstMoment += sign * ringMoment
+    center = firstMoment / totalArea
+    scale = np.sqrt(totalArea)
+    #the canonical x axis points to the outside ring vertex farthest from the centroid
+    offset = ringArrays[0] - center
+    distance = np.hypot(offset[:, 0], offset[:, 1])
+    farIndex = int(np.flatnonzero(distance >= distance.max() * (1.0 - 1.0e-9))[0])
+    cosValue, sinValue = offset[farIndex] / distance[farIndex]
+    rotation = np.array([[cosValue, -sinValue], [sinValue, cosValue]])
+    return center, rotation, scale
+######################################################################################
+class MeshCache():
+    """
+    Opt-in content-addressed cache of core meshes (points and triangles arrays)
+    Two tiers: an in-memory LRU tier and an optional on-disk tier of .npz files with
+    size-bounded least recently used eviction
+    #######################---example---#########################
+    from meshCache import MeshCache
+    from sectionFiberMain import circleSection
+    cache = MeshCache(maxMemoryItems=64, cacheDir="meshCache", maxDiskBytes=512 * 1024 ** 2)
+    corFiber, coverFiber, barFiber = circleSection("circle", 2, 0.05, 0.03, 0.15, 0.1, 0.1, meshCache=cache)
+    #######################---similarity example---#########################
+    #with similarity=True the cores are meshed in their canonical (translated, rotated and scaled) position,
+    #so geometrically similar sections with the same size/eleSize ratio share one mesh
+    cache = MeshCache(similarity=True)
+    for outD in [1.0, 1.5, 2.0, 2.5]:
+        corFiber, coverFiber, barFiber = circleSection("circle", outD, 0.025*outD, 0.03, 0.15, 0.05*outD, 0.1,
+                                                       meshCache=cache)
+    """
+    ####################################################
+    def __init__(self, maxMemoryItems=64, cacheDir=None, maxDiskBytes=512 * 1024 ** 2, similarity=False):
+        """
+        Initialize the cache
+        Input: maxMemoryItems-number of meshes kept in memory
+               cacheDir-directory of the on-disk tier, None for memory only
+               maxDiskBytes-size bound of the on-disk tier (bytes)
+               similarity-reuse the meshes of sections that only differ by translation, rotation and uniform scaling
+        """
+        self.similarity = similarity
+        self.maxMemoryItems = maxMemoryItems
+        self.cacheDir = cacheDir
+        self.maxDiskBytes = maxDiskBytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        if cacheDir is not None:
+            os.makedirs(cacheDir, exist_ok=True)
+    ####################################################
+    @staticmethod
+    def meshKey(kind, rings, eleSize, extra=(), decimals=12):
+        """
+        Canonical hash of a core geometry
+        Input: kind-mesher name, for example "disk" or "polygon"
+               rings-boundary rings [outRing,holeRing1,...], each [(x1,y1),...,(xn,yn)]
+               eleSize-fiber element size
+               extra-other parameters that change the mesh
+               decimals-coordinates and float parameters are rounded to decimals before hashing
+        Output: key-hex digest string
+        """
+        extra = tuple(round(each, decimals) if isinstance(each, float) else each for each in extra)
+        digest = hashlib.sha256()
+        digest.update(repr((kind, round(float(eleSize), decimals), extra, len(rings))).encode())
+        canonicalRings = [_canonicalRing(eachRing, decimals) for eachRing in rings]
+        #the hole order does not change the geometry
+        holeRings = sorted(canonicalRings[1:], key=lambda each: each.tobytes())
+        for eachRing in canonicalRings[:1] + holeRings:
+            digest.update(repr(eachRing.shape).encode())
+            digest.update(eachRing.astype("<f8").tobytes())
+        return digest.hexdigest()
+    ####################################################
+    def get(self, key):
+        """
+        Return the stored arrays dict of the key, or None
+        The arrays are shared by all the hits and read-only, copy them before changing them
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        if self.cacheDir is not None:
+            filePath = self._filePath(key)
+            try:
+                with np.load(filePath, allow_pickle=False) as npzFile:
+                    arrays = {eachName: npzFile[eachName] for eachName in npzFile.files}
+                os.utime(filePath)
+            except (OSError, ValueError):
+                arrays = None
+            if arrays is not None:
+                self.hits += 1
+                self._memoryPut(key, arrays)
+                return arrays
+        self.misses += 1
+        return None
+    ####################################################
+    def put(self, key, **arrays):
+        """
+        Store read-only copies of the arrays, for example put(key, points=points, triangles=triangles)
+        """
+        arrays = {eachName: np.array(eachArray, copy=True) for eachName, eachArray in arrays.items()}
+        self._memoryPut(key, arrays)
+        if self.cacheDir is not None:
+            fileHandle, tempPath = tempfile.mkstemp(suffix=".tmp", dir=self.cacheDir)
+            with os.fdopen(fileHandle, "wb") as tempFile:
+                np.savez(tempFile, **arrays)
+            os.replace(tempPath, self._filePath(key))
+            self._evictDisk()
+        return arrays
+    ####################################################
+    def fetch(self, key, meshFunction, *args, ring=None):
+        """
+        Return (points, triangles) of the key, call meshFunction(*args) and store its result on a miss
+        The returned arrays belong to the caller (the cached arrays are copied on a hit)
+        ring-outside ring of the geometry, the triangles of a hit get its winding, None to keep the stored winding
+        """
+        arrays = self.get(key)
+        if arrays is None:
+            points, triangles = meshFunction(*args)
+            self.put(key, points=points, triangles=triangles)
+            return points, triangles
+        triangles = arrays["triangles"]
+        if ring is not None:
+            triangles = _orientTriangles(arrays["points"], triangles, ring)
+        return arrays["points"].copy(), np.array(triangles, copy=True)
+    ####################################################
+    def fetchSimilar(self, kind, rings, eleSize, meshFunction, extra=()):
+        """
+        Return (points, triangles) of the rings, reusing the mesh of any similar geometry
+        Input: kind,rings,eleSize,extra-see meshKey
+               meshFunction-meshFunction(canonicalRings, canonicalEleSize) returns (points, triangles)
+        """
+        center, rotation, scale = similarityFrame(rings)
+        canonicalRings = [(np.asarray(eachRing, dtype=np.float64)[:, :2] - center) @ rotation / scale
+                          for eachRing in rings]
+        key = self.meshKey(kind + "-similar", canonicalRings, eleSize / scale, extra, decimals=9)
+        points, triangles = self.fetch(key, meshFunction, canonicalRings, eleSize / scale, ring=canonicalRings[0])
+        sectionPoints = np.array(points, dtype=np.float64)
+        sectionPoints[:, :2] = center + scale * points[:, :2] @ rotation.T
+        return sectionPoints, triangles
+    ####################################################
+    def clear(self):
+        """
+        Remove all the meshes of both tiers
+        """
+        self._memory.clear()
+        if self.cacheDir is not None:
+            for eachPath in self._diskFiles():
+                os.remove(eachPath)
+    ####################################################
+    def _filePath(self, key):
+        return os.path.join(self.cacheDir, key + ".npz")
+    ####################################################
+    def _diskFiles(self):
+        return [os.path.join(self.cacheDir, eachName) for eachName in os.listdir(self.cacheDir)
+                if eachName.endswith(".npz")]
+    ####################################################
+    def _memoryPut(self, key, arrays):
+        for eachArray in arrays.values():
+            eachArray.setflags(write=False)
+        self._memory[key] = arrays
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxMemoryItems:
+            self._memory.popitem(last=False)
+    ####################################################
+    def _evictDisk(self):
+        fileInfo = []
+        for eachPath in self._diskFiles():
+            try:
+                fileStat = os.stat(eachPath)
+            except OSError:
+                continue
+            fileInfo.append((fileStat.st_mtime, fileStat.st_size, eachPath))
+        totalBytes = sum(each[1] for each in fileInfo)
+        for mtime, size, eachPath in sorted(fileInfo):
+            if totalBytes <= self.maxDiskBytes:
+                break
+            try:
+                os.remove(eachPath)
+            except OSError:
+                pass
+            totalBytes -= size
+######################################################################################
@@ -0,0 +1,144 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Graded core mesh density with gmsh size fields
+#  the fiber size grows linearly from minSize at the reference to maxSize, the size gradient is
+#  growthRate-1 (neighbouring fibers differ by about the factor growthRate)
+#  reference="boundary": distance from the core boundary curves (gmsh Distance and Threshold fields)
+#  reference="axes": distance from the extreme fiber lines parallel to each principal axis of the core,
+#                    fine far from the principal axes (gmsh MathEval, Threshold and Min fields)
+######################################################################################
+import numpy as np
+######################################################################################
+def ringPrincipalAxes(rings):
+    """
+    area centroid, principal axis angle and extreme distances of the region bounded by the rings
+    input: rings-boundary rings [outRing,holeRing1,...], each [(x1,y1),...,(xn,yn)]
+    output: center-(xc,yc), angle-principal axis angle (rad), extremes-(uMax,vMax) largest distances of the ring
+            vertices from the principal v and u axes
+    """
+    ringArrays = [np.asarray(eachRing, dtype=float)[:, :2] for eachRing in rings]
+    sums = np.zeros(6)
+    for i1, ring in enumerate(ringArrays):
+        nextRing = np.roll(ring, -1, axis=0)
+        x1, y1, x2, y2 = ring[:, 0], ring[:, 1], nextRing[:, 0], nextRing[:, 1]
+        cross = x1 * y2 - x2 * y1
+        ringSums = np.array([cross.sum() / 2.0, ((x1 + x2) * cross).sum() / 6.0, ((y1 + y2) * cross).sum() / 6.0,
+                             ((x1 * x1 + x1 * x2 + x2 * x2) * cross).sum() / 12.0,
+                             ((y1 * y1 + y1 * y2 + y2 * y2) * cross).sum() / 12.0,
+                             ((x1 * y2 + 2 * x1 * y1 + 2 * x2 * y2 + x2 * y1) * cross).sum() / 24.0])
+        #the outside ring adds and the holes subtract, whatever the vertex order
+        sums += (1.0 if i1 == 0 else -1.0) * np.sign(ringSums[0]) * ringSums
+    area, sumX, sumY, sumXX, sumYY, sumXY = sums
+    center = np.array([sumX / area, sumY / area])
+    Ixx = sumYY - area * center[1] ** 2
+    Iyy = sumXX - area * center[0] ** 2
+    Ixy = sumXY - area * center[0] * center[1]
+    angle = 0.5 * np.arctan2(-2.0 * Ixy, Ixx - Iyy)
+    allVertex = np.concatenate(ringArrays) - center
+    u = allVertex[:, 0] * np.cos(angle) + allVertex[:, 1] * np.sin(angle)
+    v = -allVertex[:, 0] * np.sin(angle) + allVertex[:, 1] * np.cos(angle)
+    return center, angle, (float(np.abs(u).max()), float(np.abs(v).max()))
+######################################################################################
+class MeshGrading():
+    """
+    Graded core mesh density for the gmsh core meshers
+    #######################---example---#########################
+    from meshGrading import MeshGrading
+    from sectionFiberMain import circleSection
+    grading = MeshGrading(minSize=0.03, maxSize=0.2, growthRate=1.2, reference="boundary")
+    corFiber, coverFiber, barFiber = circleSection("circle", 2, 0.05, 0.03, 0.15, 0.1, 0.1, coreGrading=grading)
+    """
+    ####################################################
+    def __init__(self, minSize, maxSize, growthRate=1.2, reference="boundary"):
+        """
+        Input: minSize-fiber size at the reference (boundary or extreme fiber lines)
+               maxSize-largest fiber size
+               growthRate-size ratio of neighbouring fibers (>1.0)
+               reference-"boundary" or "axes", see the notes above
+        """
+        if reference not in ("boundary", "axes"):
+            raise ValueError("Error!Please select boundary or axes reference!")
+        if not (0.0 < minSize <= maxSize) or growthRate <= 1.0:
+            raise ValueError("0<minSize<=maxSize and growthRate>1.0 are required")
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.growthRate = growthRate
+        self.reference = reference
+    ####################################################
+    def rampLength(self):
+        """
+        distance over which the size grows from minSize to maxSize
+        """
+        return (self.maxSize - self.minSize) / (self.growthRate - 1.0)
+    ####################################################
+    def scaled(self, factor):
+        """
+        Return the grading of the section scaled by factor
+        """
+        return MeshGrading(self.minSize * factor, self.maxSize * factor, self.growthRate, self.reference)
+    ####################################################
+    def key(self):
+        """
+        hashable parameters, for the mesh cache keys
+        """
+        return ("grading", float(self.minSize), float(self.maxSize), float(self.growthRate), self.reference)
+    ####################################################
+    def addFields(self, geom, surfaceId, rings, curveLength=None):
+        """
+        Add the size fields to the pygmsh geometry and set them as the background field
+        Input: geom-pygmsh geometry
+               surfaceId-gmsh id of the core surface, its boundary curves are the "boundary" reference
+               rings-core boundary rings [outRing,holeRing1,...], vertex coordinates for the "axes" reference
+               curveLength-longest boundary curve, for the sampling density of the distance field,
+                           None for the longest ring edge
+        """
+        ringArrays = [np.asarray(eachRing, dtype=float)[:, :2] for eachRing in rings]
+        #the numbers are written with %.17g, repr of a numpy scalar is not .geo code (np.float64(...) with numpy>=2)
+        code = ["Mesh.CharacteristicLengthExtendFromBoundary = 0;",
+                "Mesh.CharacteristicLengthFromPoints = 0;",
+                "Mesh.CharacteristicLengthMax = %.17g;" % self.maxSize]
+        thresholdList = []
+        if self.reference == "boundary":
+            if curveLength is None:
+                curveLength = max(float(np.hypot(*(np.roll(ring, -1, axis=0) - ring).T).max()) for ring in ringArrays)
+            nSample = int(min(10000, max(20, np.ceil(2.0 * curveLength / self.minSize))))
+            code += ["gradingCurves[] = Boundary{ Surface{%s}; };" % surfaceId,
+                     "gradingDistance = newf;",
+                     "Field[gradingDistance] = Distance;",
+                     "Field[gradingDistance].EdgesList = {gradingCurves[]};",
+                     "Field[gradingDistance].NNodesByEdge = %d;" % nSample]
+            thresholdList.append(("gradingBoundary", "gradingDistance"))
+        else:
+            center, angle, extremes = ringPrincipalAxes(ringArrays)
+            cosValue, sinValue = np.cos(angle), np.sin(angle)
+            for axisName, expression, extreme in (
+                    ("U", "(x-(%.17g))*(%.17g)+(y-(%.17g))*(%.17g)" % (center[0], cosValue, center[1], sinValue),
+                     extremes[0]),
+                    ("V", "-(x-(%.17g))*(%.17g)+(y-(%.17g))*(%.17g)" % (center[0], sinValue, center[1], cosValue),
+                     extremes[1])):
+                code += ["gradingAxis%s = newf;" % axisName,
+                         "Field[gradingAxis%s] = MathEval;" % axisName,
+                         "Field[gradingAxis%s].F = \"%.17g-fabs(%s)\";" % (axisName, extreme, expression)]
+                thresholdList.append(("gradingExtreme%s" % axisName, "gradingAxis%s" % axisName))
+        for thresholdName, inFieldName in thresholdList:
+            code += ["%s = newf;" % thresholdName,
+                     "Field[%s] = Threshold;" % thresholdName,
+                     "Field[%s].IField = %s;" % (thresholdName, inFieldName),
+                     "Field[%s].LcMin = %.17g;" % (thresholdName, self.minSize),
+                     "Field[%s].LcMax = %.17g;" % (thresholdName, self.maxSize),
+                     "Field[%s].DistMin = 0.0;" % thresholdName,
+                     "Field[%s].DistMax = %.17g;" % (thresholdName, self.rampLength())]
+        if len(thresholdList) == 1:
+            code.append("Background Field = %s;" % thresholdList[0][0])
+        else:
+            code += ["gradingMin = newf;",
+                     "Field[gradingMin] = Min;",
+                     "Field[gradingMin].FieldsList = {%s};" % ",".join(each[0] for each in thresholdList),
+                     "Background Field = gradingMin;"]
+        for eachLine in code:
+            geom.add_raw_code(eachLine)
+######################################################################################
@@ -0,0 +1,235 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Moment-curvature analysis of the fiber sections
+#  bending direction angle (rad): curvature vector (kappaY,kappaZ)=phi*(cos(angle),sin(angle)),
+#  angle=0 bends about the local y axis (tension at +z for phi>0)
+#  moment about the bending axis: M=My*cos(angle)+Mz*sin(angle)
+#  the axial strain eps0 (the neutral axis depth) of every curvature step is solved so that N=axialLoad
+######################################################################################
+import traceback
+import numpy as np
+from fiberSet import FiberSet, CORE
+from strainPlane import sectionResponse
+######################################################################################
+def _materialStrength(material, strainBound):
+    """
+    Strength of the material: |fpc| of the concrete, fy of the steel, |stress| at strainBound of the other laws
+    """
+    if hasattr(material, "fpc"):
+        return abs(material.fpc)
+    if hasattr(material, "fy"):
+        return abs(material.fy)
+    stress = material.stressTangent(np.array([-abs(strainBound), abs(strainBound)]))[0]
+    return float(np.abs(stress).max())
+######################################################################################
+def axialCapacity(fibers, materials, strainBound=0.01):
+    """
+    Fixed axial force scale of the section, sum of the fiber area times the strength of its material
+    Input: fibers,materials-see strainPlane.sectionResponse
+           strainBound-strain of the strength of the materials without fpc or fy
+    Output: capacity-sum(|fpc|*A_concrete)+sum(fy*A_steel)+...
+    """
+    if not isinstance(fibers, FiberSet):
+        fibers = FiberSet.fromTuples(fibers, CORE)
+    capacity = 0.0
+    for eachTag in np.unique(fibers.tag):
+        area = fibers.area[fibers.tag == eachTag].sum()
+        capacity += _materialStrength(materials[int(eachTag)], strainBound) * area
+    return capacity
+######################################################################################
+def solveAxialStrain(fibers, materials, axialLoad, kappaY, kappaZ, tol=1.0e-6, maxIter=50, strainBound=0.01,
+                     chunkSize=None):
+    """
+    Axial strain of each curvature pair that gives the axial load, all the pairs solved together
+    Newton steps on eps0, safeguarded by a bracket [lower,upper] with N(lower)<=axialLoad<=N(upper),
+    a bisection step is taken when the Newton step leaves the bracket or the axial tangent is not positive
+    Input: fibers,materials-see strainPlane.sectionResponse
+           axialLoad-axial load (compression negative), scalar or array
+           kappaY,kappaZ-curvature arrays
+           tol-convergence tolerance of |N-axialLoad| relative to the axial capacity of the section (see
+               axialCapacity), or to |axialLoad| when larger
+           maxIter-maximum number of iterations
+           strainBound-initial bracket [-strainBound,strainBound] of eps0, widened when needed
+           chunkSize-see strainPlane.sectionResponse
+    Output: eps0-axial strain array, NaN where the section cannot carry the axial load
+            forces-(n,3) section force array [[N,My,Mz],...]
+            converged-boolean array
+    """
+    kappaY, kappaZ, axialLoad = np.broadcast_arrays(np.atleast_1d(np.asarray(kappaY, dtype=float)),
+                                                    np.atleast_1d(np.asarray(kappaZ, dtype=float)),
+                                                    np.atleast_1d(np.asarray(axialLoad, dtype=float)))
+    nCase = len(kappaY)
+    ########################
+    def axialForce(eps0, index, tangent=True):
+        planes = np.column_stack((eps0, kappaY[index], kappaZ[index]))
+        if tangent:
+            forces, tangents = sectionResponse(fibers, materials, planes, chunkSize)
+            return forces[:, 0], tangents[:, 0, 0]
+        return sectionResponse(fibers, materials, planes, chunkSize, tangent=False)[:, 0]
+    ########################
+    allIndex = np.arange(nCase)
+    lower = np.full(nCase, -abs(strainBound))
+    upper = np.full(nCase, abs(strainBound))
+    lowerForce = axialForce(lower, allIndex, tangent=False)
+    upperForce = axialForce(upper, allIndex, tangent=False)
+    #widen the bracket of the cases whose axial load is outside
+    for i1 in range(8):
+        widen = np.flatnonzero(lowerForce > axialLoad)
+        if len(widen) > 0:
+            lower[widen] *= 4.0
+            lowerForce[widen] = axialForce(lower[widen], widen, tangent=False)
+        widen = np.flatnonzero(upperForce < axialLoad)
+        if len(widen) > 0:
+            upper[widen] *= 4.0
+            upperForce[widen] = axialForce(upper[widen], widen, tangent=False)
+    bracketed = (lowerForce <= axialLoad) & (upperForce >= axialLoad)
+    #a fixed force scale, the bracket forces grow without bound with the hardening of the widened bracket strains
+    forceTol = tol * np.maximum(np.abs(axialLoad), axialCapacity(fibers, materials, strainBound))
+    #regula falsi start inside the bracket
+    span = np.where(upperForce > lowerForce, upperForce - lowerForce, 1.0)
+    eps0 = lower + (axialLoad - lowerForce) / span * (upper - lower)
+    converged = np.zeros(nCase, dtype=bool)
+    active = bracketed.copy()
+    for iteration in range(maxIter):
+        index = np.flatnonzero(active)
+        if len(index) == 0:
+            break
+        force, axialTangent = axialForce(eps0[index], index)
+        residual = force - axialLoad[index]
+        done = np.abs(residual) <= forceTol[index]
+        converged[index[done]] = True
+        below = residual < 0.0
+        lower[index[below]] = eps0[index[below]]
+        upper[index[~below]] = eps0[index[~below]]
+        safeTangent = np.where(axialTangent > 0.0, axialTangent, 1.0)
+        newtonStrain = eps0[index] - residual / safeTangent
+        inside = (axialTangent > 0.0) & (newtonStrain > lower[index]) & (newtonStrain < upper[index])
+        newStrain = np.where(inside, newtonStrain, 0.5 * (lower[index] + upper[index]))
+        eps0[index] = np.where(done, eps0[index], newStrain)
+        collapsed = upper[index] - lower[index] <= 1.0e-15 * np.maximum(1.0, np.abs(eps0[index]))
+        converged[index[collapsed]] = True
+        active[index[done | collapsed]] = False
+    eps0[~bracketed] = np.nan
+    forces = np.full((nCase, 3), np.nan)
+    solved = np.flatnonzero(bracketed)
+    if len(solved) > 0:
+        forces[solved] = sectionResponse(fibers, materials, np.column_stack((eps0[solved], kappaY[solved],
+                                                                            kappaZ[solved])), chunkSize, tangent=False)
+    return eps0, forces, converged
+######################################################################################
+def momentCurvature(fibers, materials, axialLoad, angle=0.0, curvatures=None, maxCurvature=None, nStep=100,
+                    tol=1.0e-6, maxIter=50, chunkSize=None):
+    """
+    Moment-curvature curve of the fiber section under a constant axial load
+    All the curvature steps are solved together (the material laws are monotonic envelopes)
+    Input: fibers-FiberSet, for example FiberSet.concatenate([coreFiber,coverFiber,barFiber])
+           materials-uniaxial material of each fiber tag {CORE:...,COVER:...,BAR:...}, see uniaxialMaterial.py
+           axialLoad-axial load (compression negative)
+           angle-bending direction angle (rad), see the notes above
+           curvatures-curvature array, or None for nStep equal steps from 0 to maxCurvature
+           tol,maxIter,chunkSize-see solveAxialStrain
+    Output: result-{"curvature","moment","My","Mz","axialStrain","axialForce","converged"} dict of arrays
+    #######################---example---#########################
+    from fiberSet import FiberSet, CORE, COVER, BAR
+    from uniaxialMaterial import KentParkConcrete, BilinearSteel
+    from momentCurvature import momentCurvature
+    fibers = FiberSet.concatenate([coreFiber, coverFiber, barFiber])
+    materials = {CORE: KentParkConcrete(-34.5e3, -0.004, -24.0e3, -0.014),
+                 COVER: KentParkConcrete(-27.6e3, -0.002, 0.0, -0.006), BAR: BilinearSteel(400.0e3, 2.0e8, 0.01)}
+    result = momentCurvature(fibers, materials, -5000.0, angle=0.0, maxCurvature=0.02, nStep=200)
+    """
+    if curvatures is None:
+        if maxCurvature is None:
+            raise ValueError("Please provide curvatures or maxCurvature!")
+        curvatures = np.linspace(0.0, maxCurvature, nStep + 1)
+    curvature = np.asarray(curvatures, dtype=float).reshape(-1)
+    cosValue, sinValue = np.cos(angle), np.sin(angle)
+    eps0, forces, converged = solveAxialStrain(fibers, materials, axialLoad, curvature * cosValue,
+                                               curvature * sinValue, tol, maxIter, chunkSize=chunkSize)
+    return {"curvature": curvature, "moment": forces[:, 1] * cosValue + forces[:, 2] * sinValue,
+            "My": forces[:, 1], "Mz": forces[:, 2], "axialStrain": eps0, "axialForce": forces[:, 0],
+            "converged": converged}
+######################################################################################
+#fibers, materials and options of the moment-curvature worker process, sent once for each process
+_workerData = {}
+######################################################################################
+def _initCurvatureWorker(fibers, materials, options):
+    _workerData.update(fibers=fibers, materials=materials, options=options)
+######################################################################################
+def _curvatureWorker(case):
+    """
+    One moment-curvature curve of the batch, return (result, None) or (None, error message)
+    """
+    try:
+        axialLoad, angle = case[0], case[1]
+        fibers = case[2] if len(case) > 2 else _workerData["fibers"]
+        return momentCurvature(fibers, _workerData["materials"], axialLoad, angle, **_workerData["options"]), None
+    except Exception:
+        return None, traceback.format_exc()
+######################################################################################
+def _curvatureChunkWorker(caseChunk):
+    """
+    The curves of one chunk of the batch, [(result, error message),...]
+    """
+    return [_curvatureWorker(eachCase) for eachCase in caseChunk]
+######################################################################################
+def momentCurvatureBatch(fibers, materials, cases, maxWorkers=None, chunkSize=1, **options):
+    """
+    Moment-curvature curves of many axial loads and bending directions in parallel worker processes
+    Input: fibers,materials-see momentCurvature, sent once to each worker process
+           cases-[(axialLoad1,angle1),(axialLoad2,angle2),...], a case (axialLoad,angle,fibers) uses its own fibers
+                 (for example the sections of a convergence study), fibers may be None when every case has its own
+           maxWorkers-number of worker processes, None for the number of processors
+           chunkSize-number of cases sent to a worker process at a time
+           options-other keyword arguments of momentCurvature (curvatures, maxCurvature, nStep, tol, ...)
+    Output: results-result dict list in input order, None for a failed case
+            errors-failed cases {index: error message}, the other cases are still analyzed
+                   a case that cannot be sent to a worker (not picklable) or whose worker process dies fails alone,
+                   the cases of a broken pool are analyzed again, each in a new worker process
+    #######################---example---#########################
+    cases = [(axialLoad, angle) for axialLoad in [-2000.0, -5000.0, -10000.0] for angle in np.linspace(0, np.pi, 7)]
+    if __name__ == "__main__":
+        results, errors = momentCurvatureBatch(fibers, materials, cases, maxWorkers=8, maxCurvature=0.02)
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+    results = [None] * len(cases)
+    errors = {}
+    chunkSize = max(1, int(chunkSize))
+    chunkList = [list(range(i1, min(i1 + chunkSize, len(cases)))) for i1 in range(0, len(cases), chunkSize)]
+    ########################
+    def runChunks(chunks, workers):
+        """
+        Run the chunks in one pool, return the case indexes that were lost with a broken pool
+        """
+        brokenCases = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initCurvatureWorker,
+                                 initargs=(fibers, materials, options)) as executor:
+            futures = {executor.submit(_curvatureChunkWorker, [cases[each] for each in eachChunk]): eachChunk
+                       for eachChunk in chunks}
+            for eachFuture in as_completed(futures):
+                eachChunk = futures[eachFuture]
+                try:
+                    chunkResults = eachFuture.result()
+                except BrokenProcessPool:
+                    brokenCases += eachChunk
+                    continue
+                except Exception:
+                    #for example a case that cannot be pickled
+                    chunkResults = [(None, traceback.format_exc())] * len(eachChunk)
+                for index, (result, error) in zip(eachChunk, chunkResults):
+                    results[index] = result
+                    if error is not None:
+                        errors[index] = error
+        return brokenCases
+    ########################
+    #a worker that dies breaks the pool and all its pending cases, each of them is analyzed again in its own pool
+    for index in sorted(runChunks(chunkList, maxWorkers)):
+        if runChunks([[index]], 1):
+            errors[index] = "the worker process analyzing the case terminated abruptly (crash)"
+    return results, errors
+######################################################################################
@@ -6,44 +6,61 @@
 ######################################################################################
 ######################################################################################
 import numpy as np
-import math
+######################################################################################
+def _ringEdges(rings):
+    """
+    stack the edges of all the closed rings
+    input: rings-a single ring [(x1,y1),...,(xn,yn)] or a ring list [[(x1,y1),...],[(x1,y1),...]]
+           the closing vertex may or may not be repeated
+    output: starts,ends-edge start and end coordinates arrays, shape (nEdge,2)
+    """
+    ringList = [rings] if np.asarray(rings[0], dtype=float).ndim == 1 else rings
+    startList = []
+    endList = []
+    for eachRing in ringList:
+        ring = np.asarray(eachRing, dtype=float)[:, :2]
+        if len(ring) < 3:
+            raise ValueError("len of vertices < 3")
+        startList.append(ring)
+        endList.append(np.roll(ring, -1, axis=0))
+    return np.concatenate(startList), np.concatenate(endList)
+######################################################################################
+def points_in_2d_polygon(points, rings, tol=1.0e-6, chunkSize=4096):
+    """
+    determine whether each point is in the region bounded by the closed rings (outside boundary and holes)
+    input: points-point coordinates array, shape (N,2)
+           rings-a single ring [(x1,y1),...,(xn,yn)] or a ring list [outRing,holeRing1,holeRing2,...]
+           tol-the point is regarded in the region when its distance to any edge is not larger than tol
+           chunkSize-number of points tested at the same time, bounds the (chunkSize,nEdge) work arrays
+    output: mask-boolean array, shape (N,), True for the points in the region or on its boundary
+    """
+    pts = np.asarray(points, dtype=float).reshape(-1, 2)
+    starts, ends = _ringEdges(rings)
+    x1, y1 = starts[:, 0], starts[:, 1]
+    dx, dy = ends[:, 0] - x1, ends[:, 1] - y1
+    lengthSquare = dx * dx + dy * dy
+    #zero length edges (repeated closing vertex) never cross and only count for the on-edge test
+    safeDy = np.where(dy == 0.0, 1.0, dy)
+    safeLength = np.where(lengthSquare == 0.0, 1.0, lengthSquare)
+    mask = np.empty(len(pts), dtype=bool)
+    for i1 in range(0, len(pts), chunkSize):
+        px = pts[i1:i1 + chunkSize, 0:1]
+        py = pts[i1:i1 + chunkSize, 1:2]
+        #crossing number, even-odd rule over all the rings, so the points in the holes are outside
+        straddle = (y1 > py) != (y1 + dy > py)
+        crossX = x1 + (py - y1) * dx / safeDy
+        inside = np.count_nonzero(straddle & (px < crossX), axis=1) % 2 == 1
+        #distance from the point to each edge segment
+        t = np.clip(((px - x1) * dx + (py - y1) * dy) / safeLength, 0.0, 1.0)
+        distSquare = (x1 + t * dx - px) ** 2 + (y1 + t * dy - py) ** 2
+        onEdge = np.any(distSquare <= tol * tol, axis=1)
+        mask[i1:i1 + chunkSize] = inside | onEdge
+    return mask
 ######################################################################################
 def is_in_2d_polygon(point, vertices):
     """determine whether the point in the closed curved lines composed of vertices"""
-    px = point[0]
-    py = point[1]
-    angle_sum = 0
-
-    size = len(vertices)
-    if size < 3:
-        raise ValueError("len of vertices < 3")
-    j = size - 1
-    for i in range(0, size):
-        sx = vertices[i][0]
-        sy = vertices[i][1]
-        tx = vertices[j][0]
-        ty = vertices[j][1]
-        #determine whether the node in a line based on the distance from the node to the line
-        # y = kx + b, -y + kx + b = 0
-        k = (sy - ty) / (sx - tx + 0.000000000001)  # avoid divide zero
-        b = sy - k * sx
-        dis = np.abs(k * px - 1 * py + b) / np.sqrt(k * k + 1)
-        if dis < 0.000001:  #the node in the line
-            if sx <= px <= tx or tx <= px <= sx:  #the node in the line
-                return True
-        #calculate the angle
-        angle = math.atan2(sy - py, sx - px) - math.atan2(ty - py, tx - px)
-        #the angle shoule with [-pi,pi]
-        if angle >= math.pi:
-            angle = angle - math.pi * 2
-        elif angle <= -math.pi:
-            angle = angle + math.pi * 2
-        #cumulation
-        angle_sum += angle
-        j = i
-    #calculate the diffrence between the sum angles and 2pi with a small threshold
-    return np.abs(angle_sum - math.pi * 2) < 0.00000000001
+    return bool(points_in_2d_polygon([point], vertices)[0])
 ########################################################################################
 #
 # closedNodeValues=[[0,0],[2,0],[2,1],[1,1],[1,2],[2,2],[2,3],[0,3],[0,0]]
-# print(is_in_2d_polygon([1.01,1.01], closedNodeValues))
\ No newline at end of file
+# print(is_in_2d_polygon([1.01,1.01], closedNodeValues))
@@ -0,0 +1,55 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+######################################################################################
+def signedArea(vertices):
+    """
+    signed area of the closed ring, positive for anticlockwise vertices
+    input: vertices-ring vertex coordinates [(x1,y1),(x2,y2),...,(xn,yn)]
+    """
+    ring = np.asarray(vertices, dtype=float)[:, :2]
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+######################################################################################
+def offsetPolygon(vertices, distance, pos="outLine"):
+    """
+    offset each edge of the closed ring by distance and intersect the adjacent offset edges
+    input: vertices-ring vertex coordinates [(x1,y1),(x2,y2),...,(xn,yn)]
+           distance-offset distance
+           pos-offset towards the inside of the ring ("outLine", outside boundary of a section),
+               or towards the outside of the ring ("innerLine", boundary of a hole)
+    output: newNodes-offset vertex coordinates array, shape (n,2), newNodes[i] belongs to vertices[i]
+    """
+    ring = np.asarray(vertices, dtype=float)[:, :2]
+    if pos == "outLine":
+        side = 1.0
+    elif pos == "innerLine":
+        side = -1.0
+    else:
+        raise ValueError("Error!Please select outLine or innerLine mode!")
+    #the left normal of an anticlockwise ring points inside
+    if signedArea(ring) < 0.0:
+        side = -side
+    edge = np.roll(ring, -1, axis=0) - ring
+    length = np.hypot(edge[:, 0], edge[:, 1])
+    normal = np.column_stack((-edge[:, 1], edge[:, 0])) / length[:, None]
+    #offset edge i: normal[i].(x,y)=h[i]
+    h = np.einsum("ij,ij->i", normal, ring) + side * distance
+    #vertex i is the intersection of the offset edges i-1 and i
+    n1, h1 = np.roll(normal, 1, axis=0), np.roll(h, 1)
+    n2, h2 = normal, h
+    det = n1[:, 0] * n2[:, 1] - n1[:, 1] * n2[:, 0]
+    parallel = np.abs(det) < 1.0e-12
+    safeDet = np.where(parallel, 1.0, det)
+    newX = (h1 * n2[:, 1] - h2 * n1[:, 1]) / safeDet
+    newY = (n1[:, 0] * h2 - n2[:, 0] * h1) / safeDet
+    newNodes = np.column_stack((newX, newY))
+    #collinear adjacent edges, move the vertex along the common normal
+    newNodes[parallel] = ring[parallel] + side * distance * normal[parallel]
+    return newNodes
+######################################################################################
@@ -4,10 +4,13 @@
 #    Date: 05/02/2020
 #  Environemet: Successfully excucted in python 3.8
 ######################################################################################
-import matplotlib.pyplot as plt
-from fiberGenerate import CircleSection,PolygonSection,figureSize
+#matplotlib is imported only when a section is plotted, the process pool only in sectionBatch
+import traceback
+from sectionModel import CircleSectionModel, PolygonSectionModel
 ######################################################################################
-def circleSection(sectionName,outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None):
+def circleSection(sectionName,outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None,\
+                  meshCache=None,coreMesher="gmsh",plotFormats=("eps","jpg"),plotMode="show",coreGrading=None,\
+                  meshBackend=None,profiler=None):
     """
     #####################################################################
     def circleSection(outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None)
@@ -22,10 +25,20 @@ def circleSection(sectionName,outD,coverThick,outbarD,outbarDist,coreSize,coverS
     ---inD # the diameter of the inner circle,if not inD=None
     ---inBarD # inside bar diameter, if not inBarD=None
     ---inBarDist # inside bar space,if not inBarDist=None
+    ---meshCache # MeshCache instance (see meshCache.py) to reuse identical (similar with similarity=True) core meshes, None for no cache
+    ---coreMesher # "gmsh" triangular core fibers, "analytic" concentric ring and sector core fibers with exact areas (no gmsh)
+    ---coreGrading # MeshGrading instance (see meshGrading.py) for a graded gmsh core mesh, None for the uniform coreSize
+    ---meshBackend # GmshPool instance (see gmshPool.py) to mesh the core on warm gmsh workers, None for pygmsh
+    ---profiler # StageProfiler instance (see stageProfiler.py) to record the time, memory and counts of each stage,
+                # None for no instrumentation
+    ---plotFormats # output file formats of the plot, for example ("png",), None for no file
+    ---plotMode # "show" save and show the figure (blocking), "agg" save only, "background" save in a separate process
     Output:
     ---coreFiber,coverFiber,barFiber #core concrete, cover concrete anb bar fibers information
        for eaxample coreFiber=[(y1,z1,area1),(y2,y2,area2),...], y1,z1 is the fiber coordinate values in loacal y-z plane
        area1 is the fiber area
+       each fiber information is a FiberSet (see fiberSet.py), it iterates as the list above and
+       np.asarray(coreFiber) gives the (n,3) array [[y1,z1,area1],...]
     #####################################################################
     #######################---solid circle example---#####################
     outD=2  # the diameter of the outside circle
@@ -52,34 +65,11 @@ def circleSection(sectionName,outD,coverThick,outbarD,outbarDist,coreSize,coverS
                                                    plotState,inD,inBarD,inBarDist)
     ######################################################################
     """
-    circleInstance = CircleSection(coverThick, outD, inD)  # call the circle section generate class
-    xListPlot, yListPlot = circleInstance.initSectionPlot()  # plot profile of the circle
-    # generate core concrete fiber elements
-    coreFiber, pointsPlot, trianglesPlot = circleInstance.coreMesh(coreSize)
-    # generate cover concrete fiber elements
-    coverFiber, coverXListPlot, coverYListPlot, xBorderPlot, yBorderPlot = circleInstance.coverMesh(coverSize)
-    # generate the bar fiber elements
-    barFiber, barXListPlot, barYListPlot = circleInstance.barMesh(outbarD, outbarDist, inBarD, inBarDist)
+    section = CircleSectionModel(sectionName, outD, coverThick, outbarD, outbarDist, coreSize, coverSize, inD, inBarD,
+                                 inBarDist, meshCache, coreMesher, coreGrading, meshBackend)
+    coreFiber, coverFiber, barFiber = section.fibers(profiler)
     if plot==True:
-        outSideNode = {1: (-outD,-outD), 2: (outD,outD)}
-        w, h = figureSize(outSideNode)
-        fig = plt.figure(figsize=(w, h))
-        ax = fig.add_subplot(111)
-        for eachx, eachy in zip(xListPlot, yListPlot):
-            ax.plot(eachx, eachy, "r", linewidth=1, zorder=2)
-
-        ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot)
-
-        for coverx, covery in zip(coverXListPlot, coverYListPlot):
-            ax.plot(coverx, covery, "r", linewidth=1, zorder=2)
-        for borderx, bordery in zip(xBorderPlot, yBorderPlot):
-            ax.plot(borderx, bordery, "r", linewidth=1, zorder=2)
-
-        for barx, bary in zip(barXListPlot, barYListPlot):
-            ax.scatter(barx, bary, s=10, c="k", zorder=3)
-        plt.savefig(sectionName+".eps")
-        plt.savefig(sectionName+".jpg")
-        plt.show()
+        section.plot(plotFormats, plotMode, profiler)
     else:
         pass
     return coreFiber,coverFiber,barFiber
@@ -88,7 +78,9 @@ def circleSection(sectionName,outD,coverThick,outbarD,outbarDist,coreSize,coverS
 ######################################################################################
 def polygonSection(sectionName,outSideNode,outSideEle,coverThick,coreSize,coverSize,outBarD,outBarDist,\
                    plot=False,autoBarMesh=True,userBarNodeDict=None,userBarEleDict=None,inSideNode=None,\
-                   inSideEle=None,inBarD=None,inBarDist=None):
+                   inSideEle=None,inBarD=None,inBarDist=None,meshCache=None,coreMesher="gmsh",\
+                   plotFormats=("eps","jpg"),plotMode="show",coreGrading=None,meshBackend=None,\
+                   profiler=None):
     """
     Input:
     ---outSideNode # the outside vertexes consecutively numbering and coordinate values in local y-z plane in dict container
@@ -106,10 +98,21 @@ def polygonSection(sectionName,outSideNode,outSideEle,coverThick,coreSize,coverS
     ---inSideEle # the inside vertexes loop consecutively numbering in list container
     ---inBarD #inside bar diameter
     ---inBarDist #inside bar space
+    ---meshCache # MeshCache instance (see meshCache.py) to reuse identical (similar with similarity=True) core meshes, None for no cache
+    ---coreMesher # "gmsh" triangular core fibers, "structured" rectangular core fibers with exact areas for sections with
+                  # axis-aligned edges (no gmsh), the other sections fall back to "gmsh"
+    ---coreGrading # MeshGrading instance (see meshGrading.py) for a graded gmsh core mesh, None for the uniform coreSize
+    ---meshBackend # GmshPool instance (see gmshPool.py) to mesh the core on warm gmsh workers, None for pygmsh
+    ---profiler # StageProfiler instance (see stageProfiler.py) to record the time, memory and counts of each stage,
+                # None for no instrumentation
+    ---plotFormats # output file formats of the plot, for example ("png",), None for no file
+    ---plotMode # "show" save and show the figure (blocking), "agg" save only, "background" save in a separate process
     Output:
     ---coreFiber,coverFiber,barFiber #core concrete, cover concrete anb bar fibers information
        for eaxample coreFiber=[(y1,z1,area1),(y2,y2,area2),...], y1,z1 is the fiber coordinate values in loacal y-z plane
        area1 is the fiber area
+       each fiber information is a FiberSet (see fiberSet.py), it iterates as the list above and
+       np.asarray(coreFiber) gives the (n,3) array [[y1,z1,area1],...]
 
     #####################################################################
     ################---solid polygon section example---##################
@@ -193,86 +196,133 @@ def polygonSection(sectionName,outSideNode,outSideEle,coverThick,coreSize,coverS
 			 inSideNode,inSideEle,inBarD,inBarDist)
     ######################################################################
     """
-    sectInstance = PolygonSection(outSideNode, outSideEle, inSideNode, inSideEle)
-    originalNodeListPlot = sectInstance.sectPlot()  # [([x1,x2],[y1,y2]),([].[])]
-    outLineList, coverlineListPlot = sectInstance.coverLinePlot(coverThick)
-    if inSideNode==None:
-        sectInstance = PolygonSection(outSideNode, outSideEle)
-        originalNodeListPlot = sectInstance.sectPlot()  # [([x1,x2],[y1,y2]),([].[])]
-        outLineList, coverlineListPlot = sectInstance.coverLinePlot(coverThick)
-        coreFiber, pointsPlot, trianglesPlot = sectInstance.coreMesh(coreSize, outLineList)
-        coverFiber, outNodeReturnPlot, inNodeReturnPlot = sectInstance.coverMesh(coverSize, coverThick)
-        if autoBarMesh==True:
-            barFiber, barXListPlot, barYListPlot = sectInstance.barMesh(outBarD, outBarDist, coverThick)
-        elif autoBarMesh==False:
-            barFiber, barXListPlot, barYListPlot=sectInstance.userBarMesh(userBarNodeDict,userBarEleDict)
-        else:
-            print("Please input True or False!")
-
-    else:
-        sectInstance = PolygonSection(outSideNode, outSideEle, inSideNode, inSideEle)
-        originalNodeListPlot = sectInstance.sectPlot()
-        outLineList, coverlineListPlot = sectInstance.coverLinePlot(coverThick)
-        inLineList, innerLineListPlot = sectInstance.innerLinePlot(coverThick)
-        coreFiber, pointsPlot, trianglesPlot = sectInstance.coreMesh(coreSize, outLineList, inLineList)
-        coverFiber, outNodeReturnPlot, inNodeReturnPlot = sectInstance.coverMesh(coverSize, coverThick)
-        if autoBarMesh==True:
-            barFiber, barXListPlot, barYListPlot = sectInstance.barMesh(outBarD, outBarDist, coverThick, inBarD, inBarDist)
-        elif autoBarMesh==False:
-            barFiber, barXListPlot, barYListPlot=sectInstance.userBarMesh(userBarNodeDict,userBarEleDict)
-        else:
-            print("Please input True or False!")
-    if inSideNode==None and plot==True:
-        w, h = figureSize(outSideNode)
-        fig = plt.figure(figsize=(w, h))
-        ax = fig.add_subplot(111)
-        coverColor = "r"
-        coreColor = "b"
-        lineWid = 1
-        barMarkSize = 20
-        barColor = "k"
-        for each1 in originalNodeListPlot:
-            ax.plot(each1[0], each1[1], coverColor, lineWid, zorder=0)
-        for each2 in coverlineListPlot:
-            ax.plot(each2[0], each2[1], coverColor, lineWid, zorder=1)
-        ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot, c=coreColor, lw=lineWid)
-        for i1 in range(len(outNodeReturnPlot) - 1):
-            ax.plot([inNodeReturnPlot[i1][0], outNodeReturnPlot[i1][0]],
-                    [inNodeReturnPlot[i1][1], outNodeReturnPlot[i1][1]],
-                    coverColor, linewidth=lineWid, zorder=0)
-        ax.scatter(barXListPlot, barYListPlot, s=barMarkSize, c=barColor, linewidth=lineWid, zorder=2)
-        plt.savefig(sectionName+".eps")
-        plt.savefig(sectionName+".jpg")
-        plt.show()
-    elif inSideNode!=None and plot==True:
-        w, h = figureSize(outSideNode)
-        fig = plt.figure(figsize=(w, h))
-        ax = fig.add_subplot(111)
-        coverColor = "r"
-        coreColor = "b"
-        lineWid = 1
-        barMarkSize = 20
-        barColor = "k"
-        for each1 in originalNodeListPlot:
-            ax.plot(each1[0], each1[1], coverColor, lineWid, zorder=0)
-        for each2 in coverlineListPlot:
-            ax.plot(each2[0], each2[1], coverColor, lineWid, zorder=1)
-        for each3 in innerLineListPlot:
-            ax.plot(each3[0], each3[1], coverColor, lineWid, zorder=1)
-        ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot, c=coreColor, lw=lineWid)
-        for i1 in range(len(outNodeReturnPlot) - 1):
-            ax.plot([inNodeReturnPlot[i1][0], outNodeReturnPlot[i1][0]],
-                    [inNodeReturnPlot[i1][1], outNodeReturnPlot[i1][1]],
-                    coverColor, linewidth=lineWid, zorder=0)
-        ax.scatter(barXListPlot, barYListPlot, s=barMarkSize, c=barColor, linewidth=lineWid, zorder=2)
-        plt.savefig(sectionName+".eps")
-        plt.savefig(sectionName+".jpg")
-        plt.show()
-
+    section = PolygonSectionModel(sectionName, outSideNode, outSideEle, coverThick, coreSize, coverSize, outBarD,
+                                  outBarDist, autoBarMesh, userBarNodeDict, userBarEleDict, inSideNode, inSideEle,
+                                  inBarD, inBarDist, meshCache, coreMesher, coreGrading, meshBackend)
+    coreFiber, coverFiber, barFiber = section.fibers(profiler)
+    if plot==True:
+        section.plot(plotFormats, plotMode, profiler)
     else:
         pass
     return coreFiber,coverFiber,barFiber
 ######################################################################################
+def _sectionWorker(sectionSpec, traceMemory=None):
+    """
+    Generate one section of the batch, return (fibers, None, records) or (None, error message, records)
+    traceMemory-None for no instrumentation, otherwise the stage records of a StageProfiler(traceMemory=traceMemory)
+    """
+    profiler = None
+    if traceMemory is not None:
+        from stageProfiler import StageProfiler
+        profiler = StageProfiler(traceMemory=traceMemory)
+    try:
+        kwargs = dict(sectionSpec)
+        sectionType = kwargs.pop("section")
+        if profiler is not None:
+            kwargs["profiler"] = profiler
+        #a worker process cannot show a window, the plot files are saved with the Agg canvas
+        if kwargs.get("plotMode", "show") == "show":
+            kwargs["plotMode"] = "agg"
+        if sectionType == "circle":
+            fibers = circleSection(**kwargs)
+        elif sectionType == "polygon":
+            fibers = polygonSection(**kwargs)
+        else:
+            raise ValueError("Please select section=circle or section=polygon!")
+        return fibers, None, None if profiler is None else profiler.records
+    except Exception:
+        return None, traceback.format_exc(), None if profiler is None else profiler.records
+######################################################################################
+def _chunkWorker(specChunk, traceMemory=None):
+    """
+    Generate the sections of one chunk of the batch, [(fibers, error message, records),...]
+    """
+    return [_sectionWorker(eachSpec, traceMemory) for eachSpec in specChunk]
+######################################################################################
+def sectionBatch(sectionSpecs, maxWorkers=None, chunkSize=1, profiler=None, meshBackend=None):
+    """
+    Generate many sections in parallel worker processes (gmsh is not thread-safe)
+    Input:
+    ---sectionSpecs # section specification list, each is a dict with the key "section" ("circle" or "polygon")
+                    # and the keyword arguments of circleSection or polygonSection, plotMode="show" is replaced by
+                    # "agg" (the plot files are saved, no window)
+    ---maxWorkers # number of worker processes, None for the number of processors
+    ---chunkSize # number of section specifications sent to a worker process at a time
+    ---profiler # StageProfiler instance (see stageProfiler.py), the stage records of the worker processes are added
+                # to it (and passed to its callback) as the sections finish, None for no instrumentation
+    ---meshBackend # GmshPool instance (see gmshPool.py), the sections are generated in maxWorkers threads of this
+                   # process (None for the number of pool workers) and their core meshes on the pool workers at
+                   # the same time, the pool cannot be sent to worker processes; the stage peak memory is not
+                   # recorded in the threads; None for worker processes
+    Output:
+    ---results # fibers list in input order, (coreFiber,coverFiber,barFiber) for each section, None for a failed one
+    ---errors # failed sections {index: error message}, the other sections are still generated
+              # a section that cannot be sent to a worker (not picklable) or whose worker process dies (gmsh
+              # crash) fails alone, the chunks of a broken pool are generated again in new worker processes
+    #####################################################################
+    sectionSpecs = [{"section": "circle", "sectionName": "pier%d" % i1, "outD": outD, "coverThick": 0.05,
+                     "outbarD": 0.03, "outbarDist": 0.15, "coreSize": 0.1, "coverSize": 0.1}
+                    for i1, outD in enumerate([1.5, 2.0, 2.5])]
+    results, errors = sectionBatch(sectionSpecs, maxWorkers=8, chunkSize=4)
+    #####################################################################
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+    results = [None] * len(sectionSpecs)
+    errors = {}
+    traceMemory = None if profiler is None else profiler.traceMemory
+    if meshBackend is not None:
+        from concurrent.futures import ThreadPoolExecutor
+        #tracemalloc is shared by the threads, the stage memory of one section cannot be separated
+        traceMemory = None if profiler is None else False
+        with ThreadPoolExecutor(max_workers=maxWorkers or getattr(meshBackend, "nWorker", None)) as executor:
+            futures = [executor.submit(_sectionWorker, dict(eachSpec, meshBackend=meshBackend), traceMemory)
+                       for eachSpec in sectionSpecs]
+            for index, eachFuture in enumerate(futures):
+                fibers, error, records = eachFuture.result()
+                results[index] = fibers
+                if error is not None:
+                    errors[index] = error
+                if records is not None:
+                    profiler.extend(records)
+        return results, errors
+    chunkSize = max(1, int(chunkSize))
+    chunkList = [list(range(i1, min(i1 + chunkSize, len(sectionSpecs))))
+                 for i1 in range(0, len(sectionSpecs), chunkSize)]
+    ########################
+    def runChunks(chunks, workers):
+        """
+        Run the chunks in one pool, return the chunks that were lost with a broken pool
+        """
+        brokenChunks = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_chunkWorker, [sectionSpecs[each] for each in eachChunk], traceMemory):
+                       eachChunk for eachChunk in chunks}
+            for eachFuture in as_completed(futures):
+                eachChunk = futures[eachFuture]
+                try:
+                    chunkResults = eachFuture.result()
+                except BrokenProcessPool:
+                    brokenChunks.append(eachChunk)
+                    continue
+                except Exception:
+                    #for example a section specification that cannot be pickled
+                    chunkResults = [(None, traceback.format_exc(), None)] * len(eachChunk)
+                for index, (fibers, error, records) in zip(eachChunk, chunkResults):
+                    results[index] = fibers
+                    if error is not None:
+                        errors[index] = error
+                    if records is not None:
+                        profiler.extend(records)
+        return brokenChunks
+    ########################
+    #a worker that dies breaks the pool and all its pending chunks, each of them is run again in its own pool
+    for eachChunk in runChunks(chunkList, maxWorkers):
+        if runChunks([eachChunk], 1):
+            for index in eachChunk:
+                errors[index] = "the worker process generating the section terminated abruptly (crash)"
+    return results, errors
+######################################################################################
 # if __name__ == "__main__":
     ###################---solid circle---################
     ####################################################
@@ -0,0 +1,301 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Stateful sections with stage memoization, for design iterations that change one parameter at a time
+#  each stage lists the parameters and the upstream stages it depends on, update() changes parameters and
+#  fibers() reruns only the stages whose parameters or upstream stages changed since their last run
+#  circle:  geometry(outD,coverThick,inD) -> coreMesh, coverMesh, barMesh
+#  polygon: geometry(section nodes and elements) -> offsetLines(coverThick) -> coreMesh, coverMesh
+#           geometry -> barMesh(coverThick and bar parameters)
+######################################################################################
+import copy
+import logging
+import numpy as np
+from fiberGenerate import CircleSection, PolygonSection, figureSize
+from sectionRender import renderSection, polylineSegments, meshEdgeSegments
+from structuredMesh import cellOutlines
+from stageProfiler import NULL_PROFILER
+######################################################################################
+def _sameValue(value1, value2):
+    """
+    True if the parameter values are the same, objects without a boolean == are compared by identity
+    """
+    if value1 is value2:
+        return True
+    try:
+        return bool(value1 == value2)
+    except Exception:
+        return False
+######################################################################################
+_logger = logging.getLogger(__name__)
+######################################################################################
+def _gradingReport(sectionName, meshInfo):
+    """
+    Log (INFO) the fiber count and the fiber area range of a graded core mesh
+    """
+    _logger.info("%s graded core mesh: %d fibers, fiber size %g-%g, fiber area %.4g-%.4g", sectionName,
+                 meshInfo["fiberCount"], meshInfo["minSize"], meshInfo["maxSize"], meshInfo["minArea"],
+                 meshInfo["maxArea"])
+######################################################################################
+class _StagedSection():
+    """
+    Stage memoization of the section models
+    parameterNames-names of the section parameters
+    stages-[(stageName, parameterNames, upstreamStageNames),...] in run order, method "_" + stageName runs the stage
+    """
+    parameterNames = ()
+    stages = ()
+    ####################################################
+    def __init__(self, sectionName, parameters):
+        self.sectionName = sectionName
+        self._parameters = {}
+        self._parameterVersions = {}
+        self._stageKeys = {}
+        self._stageResults = {}
+        self._stageVersions = {}
+        self.stageRuns = {stageName: 0 for stageName, parameterNames, upstreamNames in self.stages}
+        self.recomputed = []
+        #fiber count and fiber size range of the last core mesh, see fiberGenerate._meshInfo
+        self.coreMeshInfo = None
+        self.update(**parameters)
+    ####################################################
+    def update(self, **changes):
+        """
+        Change section parameters (keyword arguments with the names of the constructor parameters)
+        """
+        for name, value in changes.items():
+            if name not in self.parameterNames:
+                raise ValueError("Error!Unknown section parameter %s!" % name)
+            if name in self._parameters and _sameValue(self._parameters[name], value):
+                continue
+            #plain data is copied, a later in-place change of the caller's dict is not seen as the same value
+            self._parameters[name] = copy.deepcopy(value) if isinstance(value, (dict, list, tuple)) else value
+            self._parameterVersions[name] = self._parameterVersions.get(name, 0) + 1
+    ####################################################
+    def parameters(self):
+        """
+        Return a copy of the current parameter dict
+        """
+        return copy.copy(self._parameters)
+    ####################################################
+    def _stage(self, stageName, profiler):
+        """
+        Return the result of the stage, run it if its parameters or upstream stages changed
+        """
+        parameterNames, upstreamNames = [(each[1], each[2]) for each in self.stages if each[0] == stageName][0]
+        for eachUpstream in upstreamNames:
+            self._stage(eachUpstream, profiler)
+        key = (tuple(self._parameterVersions[each] for each in parameterNames),
+               tuple(self._stageVersions[each] for each in upstreamNames))
+        if self._stageKeys.get(stageName) != key:
+            self._stageResults[stageName] = getattr(self, "_" + stageName)(self._parameters, profiler)
+            self._stageKeys[stageName] = key
+            self._stageVersions[stageName] = self._stageVersions.get(stageName, 0) + 1
+            self.stageRuns[stageName] += 1
+            self.recomputed.append(stageName)
+        return self._stageResults[stageName]
+    ####################################################
+    def fibers(self, profiler=None):
+        """
+        Core, cover and bar fibers of the current parameters, only the changed stages are run
+        Input: profiler-StageProfiler instance (see stageProfiler.py), None for no instrumentation
+        Output: coreFiber,coverFiber,barFiber-FiberSet (see fiberSet.py)
+                the names of the stages that were run are in self.recomputed
+        """
+        profiler = NULL_PROFILER if profiler is None else profiler
+        self.recomputed = []
+        coreFiber = self._stage("coreMesh", profiler)[0]
+        coverFiber = self._stage("coverMesh", profiler)[0]
+        barFiber = self._stage("barMesh", profiler)[0]
+        return coreFiber, coverFiber, barFiber
+    ####################################################
+    def plot(self, plotFormats=("eps", "jpg"), plotMode="show", profiler=None):
+        """
+        Plot the fibers of the current parameters, see sectionRender.renderSection
+        """
+        self.fibers(profiler)
+        profiler = NULL_PROFILER if profiler is None else profiler
+        with profiler.stage(self.sectionName, "plot"):
+            layers, figSize = self._plotLayers()
+            renderSection(self.sectionName, layers, figSize, plotFormats, plotMode)
+######################################################################################
+class CircleSectionModel(_StagedSection):
+    """
+    Stateful circle section, see sectionFiberMain.circleSection for the parameters
+    #######################---example---#########################
+    from sectionModel import CircleSectionModel
+    section = CircleSectionModel("pier", outD=2.0, coverThick=0.06, outbarD=0.03, outbarDist=0.15, coreSize=0.1,
+                                 coverSize=0.1)
+    coreFiber, coverFiber, barFiber = section.fibers()
+    section.update(outbarDist=0.12)
+    coreFiber, coverFiber, barFiber = section.fibers()  # only the bars are generated again
+    print(section.recomputed)  # ['barMesh']
+    """
+    parameterNames = ("outD", "coverThick", "outbarD", "outbarDist", "coreSize", "coverSize", "inD", "inBarD",
+                      "inBarDist", "meshCache", "coreMesher", "coreGrading", "meshBackend")
+    stages = (("geometry", ("outD", "coverThick", "inD"), ()),
+              ("coreMesh", ("coreSize", "meshCache", "coreMesher", "coreGrading", "meshBackend"), ("geometry",)),
+              ("coverMesh", ("coverSize",), ("geometry",)),
+              ("barMesh", ("outbarD", "outbarDist", "inBarD", "inBarDist"), ("geometry",)))
+    ####################################################
+    def __init__(self, sectionName, outD, coverThick, outbarD, outbarDist, coreSize, coverSize, inD=None, inBarD=None,
+                 inBarDist=None, meshCache=None, coreMesher="gmsh", coreGrading=None, meshBackend=None):
+        parameters = dict(locals())
+        del parameters["self"], parameters["sectionName"]
+        _StagedSection.__init__(self, sectionName, parameters)
+    ####################################################
+    def _geometry(self, p, profiler):
+        circleInstance = CircleSection(p["coverThick"], p["outD"], p["inD"])  # call the circle section generate class
+        with profiler.stage(self.sectionName, "initSectionPlot"):
+            xListPlot, yListPlot = circleInstance.initSectionPlot()  # plot profile of the circle
+        return circleInstance, xListPlot, yListPlot
+    ####################################################
+    def _coreMesh(self, p, profiler):
+        circleInstance = self._stageResults["geometry"][0]
+        with profiler.stage(self.sectionName, "coreMesh"):
+            coreFiber, pointsPlot, trianglesPlot = circleInstance.coreMesh(p["coreSize"], p["meshCache"],
+                                                                           p["coreMesher"], p["coreGrading"],
+                                                                           p["meshBackend"])
+            profiler.count(fiberCount=len(coreFiber), vertexCount=len(pointsPlot), elementCount=len(trianglesPlot))
+        self.coreMeshInfo = circleInstance.coreMeshInfo
+        if p["coreGrading"] is not None:
+            _gradingReport(self.sectionName, self.coreMeshInfo)
+        return coreFiber, pointsPlot, trianglesPlot
+    ####################################################
+    def _coverMesh(self, p, profiler):
+        circleInstance = self._stageResults["geometry"][0]
+        with profiler.stage(self.sectionName, "coverMesh"):
+            coverResult = circleInstance.coverMesh(p["coverSize"])
+            profiler.count(fiberCount=len(coverResult[0]))
+        return coverResult
+    ####################################################
+    def _barMesh(self, p, profiler):
+        circleInstance = self._stageResults["geometry"][0]
+        with profiler.stage(self.sectionName, "barMesh"):
+            barResult = circleInstance.barMesh(p["outbarD"], p["outbarDist"], p["inBarD"], p["inBarDist"])
+            profiler.count(fiberCount=len(barResult[0]))
+        return barResult
+    ####################################################
+    def _plotLayers(self):
+        circleInstance, xListPlot, yListPlot = self._stageResults["geometry"]
+        coreFiber, pointsPlot, trianglesPlot = self._stageResults["coreMesh"]
+        coverFiber, coverXListPlot, coverYListPlot, xBorderPlot, yBorderPlot = self._stageResults["coverMesh"]
+        barFiber, barXListPlot, barYListPlot = self._stageResults["barMesh"]
+        outD = self._parameters["outD"]
+        outSideNode = {1: (-outD,-outD), 2: (outD,outD)}
+        layers = {"coreLines": meshEdgeSegments(pointsPlot, trianglesPlot),
+                  "sectionLines": np.concatenate((polylineSegments(xListPlot, yListPlot),
+                                                  polylineSegments(xBorderPlot, yBorderPlot))),
+                  "coverLines": polylineSegments(coverXListPlot, coverYListPlot),
+                  "barPoints": np.column_stack((np.concatenate(barXListPlot), np.concatenate(barYListPlot))),
+                  "barSize": 10}
+        return layers, figureSize(outSideNode)
+######################################################################################
+class PolygonSectionModel(_StagedSection):
+    """
+    Stateful polygon section, see sectionFiberMain.polygonSection for the parameters
+    #######################---example---#########################
+    from sectionModel import PolygonSectionModel
+    section = PolygonSectionModel("box", outSideNode, outSideEle, coverThick=0.06, coreSize=0.2, coverSize=0.3,
+                                  outBarD=0.032, outBarDist=0.2, inSideNode=inSideNode, inSideEle=inSideEle,
+                                  inBarD=0.032, inBarDist=0.2)
+    coreFiber, coverFiber, barFiber = section.fibers()
+    section.update(outBarDist=0.15, inBarDist=0.15)
+    coreFiber, coverFiber, barFiber = section.fibers()  # no core mesh, only the bars
+    section.update(coverSize=0.2)
+    coreFiber, coverFiber, barFiber = section.fibers()  # only the cover fibers
+    """
+    parameterNames = ("outSideNode", "outSideEle", "coverThick", "coreSize", "coverSize", "outBarD", "outBarDist",
+                      "autoBarMesh", "userBarNodeDict", "userBarEleDict", "inSideNode", "inSideEle", "inBarD",
+                      "inBarDist", "meshCache", "coreMesher", "coreGrading", "meshBackend")
+    stages = (("geometry", ("outSideNode", "outSideEle", "inSideNode", "inSideEle"), ()),
+              ("offsetLines", ("coverThick",), ("geometry",)),
+              ("coreMesh", ("coreSize", "meshCache", "coreMesher", "coreGrading", "meshBackend"), ("offsetLines",)),
+              ("coverMesh", ("coverSize",), ("offsetLines",)),
+              ("barMesh", ("coverThick", "outBarD", "outBarDist", "inBarD", "inBarDist", "autoBarMesh",
+                           "userBarNodeDict", "userBarEleDict"), ("geometry",)))
+    ####################################################
+    def __init__(self, sectionName, outSideNode, outSideEle, coverThick, coreSize, coverSize, outBarD, outBarDist,
+                 autoBarMesh=True, userBarNodeDict=None, userBarEleDict=None, inSideNode=None, inSideEle=None,
+                 inBarD=None, inBarDist=None, meshCache=None, coreMesher="gmsh", coreGrading=None, meshBackend=None):
+        parameters = dict(locals())
+        del parameters["self"], parameters["sectionName"]
+        _StagedSection.__init__(self, sectionName, parameters)
+    ####################################################
+    def _geometry(self, p, profiler):
+        sectInstance = PolygonSection(p["outSideNode"], p["outSideEle"], p["inSideNode"], p["inSideEle"])
+        with profiler.stage(self.sectionName, "sectPlot"):
+            originalNodeListPlot = sectInstance.sectPlot()  # [([x1,x2],[y1,y2]),([].[])]
+        return sectInstance, originalNodeListPlot
+    ####################################################
+    def _offsetLines(self, p, profiler):
+        sectInstance = self._stageResults["geometry"][0]
+        with profiler.stage(self.sectionName, "coverLinePlot"):
+            outLineList, coverlineListPlot = sectInstance.coverLinePlot(p["coverThick"])
+            profiler.count(vertexCount=len(outLineList))
+        inLineList, innerLineListPlot = None, []
+        if p["inSideNode"]!=None:
+            with profiler.stage(self.sectionName, "innerLinePlot"):
+                inLineList, innerLineListPlot = sectInstance.innerLinePlot(p["coverThick"])
+                profiler.count(vertexCount=sum(len(each) for each in inLineList))
+        return outLineList, coverlineListPlot, inLineList, innerLineListPlot
+    ####################################################
+    def _coreMesh(self, p, profiler):
+        sectInstance = self._stageResults["geometry"][0]
+        outLineList, coverlineListPlot, inLineList, innerLineListPlot = self._stageResults["offsetLines"]
+        with profiler.stage(self.sectionName, "coreMesh"):
+            coreFiber, pointsPlot, trianglesPlot = sectInstance.coreMesh(p["coreSize"], outLineList, inLineList,
+                                                                         p["meshCache"], p["coreMesher"],
+                                                                         p["coreGrading"], p["meshBackend"])
+            profiler.count(fiberCount=len(coreFiber), vertexCount=len(pointsPlot), elementCount=len(trianglesPlot))
+        self.coreMeshInfo = sectInstance.coreMeshInfo
+        if p["coreGrading"] is not None:
+            _gradingReport(self.sectionName, self.coreMeshInfo)
+        return coreFiber, pointsPlot, trianglesPlot
+    ####################################################
+    def _coverMesh(self, p, profiler):
+        sectInstance = self._stageResults["geometry"][0]
+        outLineList, coverlineListPlot, inLineList, innerLineListPlot = self._stageResults["offsetLines"]
+        with profiler.stage(self.sectionName, "coverMesh"):
+            coverResult = sectInstance.coverMesh(p["coverSize"], p["coverThick"], outLineList, inLineList)
+            profiler.count(fiberCount=len(coverResult[0]))
+        return coverResult
+    ####################################################
+    def _barMesh(self, p, profiler):
+        sectInstance = self._stageResults["geometry"][0]
+        if p["autoBarMesh"]==True:
+            with profiler.stage(self.sectionName, "barMesh"):
+                barResult = sectInstance.barMesh(p["outBarD"], p["outBarDist"], p["coverThick"], p["inBarD"],
+                                                 p["inBarDist"])
+                profiler.count(fiberCount=len(barResult[0]))
+        elif p["autoBarMesh"]==False:
+            with profiler.stage(self.sectionName, "userBarMesh"):
+                barResult = sectInstance.userBarMesh(p["userBarNodeDict"], p["userBarEleDict"])
+                profiler.count(fiberCount=len(barResult[0]))
+        else:
+            raise ValueError("Please input True or False!")
+        return barResult
+    ####################################################
+    def _plotLayers(self):
+        originalNodeListPlot = self._stageResults["geometry"][1]
+        outLineList, coverlineListPlot, inLineList, innerLineListPlot = self._stageResults["offsetLines"]
+        coreFiber, pointsPlot, trianglesPlot = self._stageResults["coreMesh"]
+        coverFiber, outNodeReturnPlot, inNodeReturnPlot = self._stageResults["coverMesh"]
+        barFiber, barXListPlot, barYListPlot = self._stageResults["barMesh"]
+        boundaryLineList = originalNodeListPlot + coverlineListPlot + innerLineListPlot
+        if self.coreMeshInfo is not None and self.coreMeshInfo["mesher"] == "structured":
+            #rectangular fibers, the outline of each cell without the diagonal of its two triangles
+            coreLines = polylineSegments(*cellOutlines(pointsPlot))
+        else:
+            coreLines = meshEdgeSegments(pointsPlot, trianglesPlot)
+        layers = {"coreLines": coreLines,
+                  "sectionLines": polylineSegments([each[0] for each in boundaryLineList],
+                                                   [each[1] for each in boundaryLineList]),
+                  "coverLines": np.stack((inNodeReturnPlot[:-1], outNodeReturnPlot[:-1]), axis=1),
+                  "barPoints": np.column_stack((barXListPlot, barYListPlot)),
+                  "barSize": 20}
+        return layers, figureSize(self._parameters["outSideNode"])
+######################################################################################
@@ -0,0 +1,91 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+from fiberSet import FiberSet, CORE, regionNames
+######################################################################################
+#  Section properties in the local y-z plane, about the centroidal axes
+#  area-section area, yc,zc-centroid coordinates
+#  Iy-moment of inertia about the y axis (sum of z^2*dA), Iz-about the z axis (sum of y^2*dA)
+#  Iyz-product of inertia (sum of y*z*dA)
+#  I1,I2-major and minor principal moments of inertia
+#  theta-angle (rad, anticlockwise from the y axis) of the principal axis with I1
+######################################################################################
+def _propertiesFromSums(sums):
+    """
+    section properties from the area sums [A, Sy, Sz, Syy, Szz, Syz] (arrays, last axis the groups)
+    Sy=sum(y*dA), Sz=sum(z*dA), Syy=sum(y^2*dA), Szz=sum(z^2*dA), Syz=sum(y*z*dA)
+    """
+    area, sumY, sumZ, sumYY, sumZZ, sumYZ = sums
+    safeArea = np.where(area == 0.0, 1.0, area)
+    yc = sumY / safeArea
+    zc = sumZ / safeArea
+    Iy = sumZZ - area * zc ** 2
+    Iz = sumYY - area * yc ** 2
+    Iyz = sumYZ - area * yc * zc
+    meanI = 0.5 * (Iy + Iz)
+    radius = np.hypot(0.5 * (Iy - Iz), Iyz)
+    theta = 0.5 * np.arctan2(-2.0 * Iyz, Iy - Iz)
+    return {"area": area, "yc": yc, "zc": zc, "Iy": Iy, "Iz": Iz, "Iyz": Iyz,
+            "I1": meanI + radius, "I2": meanI - radius, "theta": theta}
+######################################################################################
+def sectionProperties(fibers, modularRatio=None):
+    """
+    Section properties of each fiber region and of the transformed section, in one vectorized reduction
+    Input: fibers-FiberSet, or the (n,3) fiber array [[y1,z1,area1],...] (regarded as CORE fibers)
+           modularRatio-weight of each region in the transformed section {tag:ratio},
+                        for example {CORE:1.0, COVER:1.0, BAR:Es/Ec}, the missing tags weigh 1.0
+    Output: propertyDict-{"core":{...},"cover":{...},"bar":{...},"transformed":{...}}, each
+            {"area","yc","zc","Iy","Iz","Iyz","I1","I2","theta"} (see the notes above), only the present regions
+    """
+    if not isinstance(fibers, FiberSet):
+        fibers = FiberSet.fromTuples(fibers, CORE)
+    tags = fibers.tag.astype(np.intp)
+    nGroup = int(tags.max()) + 1 if len(tags) else 1
+    #moments about a reference point near the section reduce the round-off of the parallel axis terms
+    reference = np.array([0.5 * (fibers.y.min() + fibers.y.max()), 0.5 * (fibers.z.min() + fibers.z.max())]) \
+        if len(tags) else np.zeros(2)
+    y = fibers.y - reference[0]
+    z = fibers.z - reference[1]
+    area = fibers.area
+    weights = np.stack((area, area * y, area * z, area * y * y, area * z * z, area * y * z))
+    #(6,nGroup) sums of every region, a single pass of bincount over the fibers
+    offsets = (np.arange(6) * nGroup)[:, None]
+    sums = np.bincount((offsets + tags).ravel(), weights=weights.ravel(), minlength=6 * nGroup).reshape(6, nGroup)
+    ratio = np.ones(nGroup)
+    for eachTag, eachRatio in (modularRatio or {}).items():
+        if eachTag < nGroup:
+            ratio[eachTag] = eachRatio
+    transformedSums = sums @ ratio
+    groupProperty = _propertiesFromSums(sums)
+    transformedProperty = _propertiesFromSums(transformedSums)
+    for eachDict in (groupProperty, transformedProperty):
+        eachDict["yc"] = eachDict["yc"] + reference[0]
+        eachDict["zc"] = eachDict["zc"] + reference[1]
+    presentTags = np.unique(tags)
+    propertyDict = {regionNames.get(int(eachTag), int(eachTag)):
+                    {eachName: float(eachValue[eachTag]) for eachName, eachValue in groupProperty.items()}
+                    for eachTag in presentTags}
+    propertyDict["transformed"] = {eachName: float(eachValue) for eachName, eachValue in transformedProperty.items()}
+    return propertyDict
+######################################################################################
+def discretizationError(propertyDict, analyticDict, names=("area", "Iy", "Iz")):
+    """
+    Relative error of the fiber section properties against the analytic values
+    Input: propertyDict-fiber section properties {region:{name:value}}, see sectionProperties
+           analyticDict-analytic properties {region:{name:value}}
+           names-compared property names
+    Output: errorDict-{region:{name:(fiberValue-analyticValue)/analyticValue}}, the regions in both dicts
+    """
+    errorDict = {}
+    for eachRegion, analyticValues in analyticDict.items():
+        if eachRegion not in propertyDict:
+            continue
+        errorDict[eachRegion] = {eachName: (propertyDict[eachRegion][eachName] - analyticValues[eachName]) /
+                                           analyticValues[eachName] for eachName in names}
+    return errorDict
+######################################################################################
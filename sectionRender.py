@@ -0,0 +1,119 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+#matplotlib is imported on the first render
+import numpy as np
+######################################################################################
+#background render processes started by renderSection(mode="background")
+_backgroundRenders = []
+######################################################################################
+def polylineSegments(xList, yList):
+    """
+    line segments of the polylines
+    input: xList,yList-polyline coordinates lists [[x1,x2,...],[x1,x2,...]],[[y1,y2,...],[y1,y2,...]]
+    output: segments-segment array, shape (n,2,2)
+    """
+    segmentList = [np.empty((0, 2, 2))]
+    for eachX, eachY in zip(xList, yList):
+        line = np.column_stack((np.asarray(eachX, dtype=float).reshape(-1), np.asarray(eachY, dtype=float).reshape(-1)))
+        segmentList.append(np.stack((line[:-1], line[1:]), axis=1))
+    return np.concatenate(segmentList)
+######################################################################################
+def meshEdgeSegments(points, triangles):
+    """
+    line segments of the triangle mesh, each edge shared by two triangles only once
+    input: points-mesh node coordinates [[x1,y1,z1],...], triangles-triangle element array [[I1,J1,K1],...]
+    output: segments-segment array, shape (n,2,2)
+    """
+    triangles = np.asarray(triangles, dtype=np.intp).reshape(-1, 3)
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    return np.asarray(points, dtype=float)[:, :2][edges]
+######################################################################################
+def drawLayers(ax, layers, rasterizeLimit=5000):
+    """
+    Draw the section layers, one collection for each layer
+    Input: ax-matplotlib axes
+           layers-layer dict {"coreLines":segments,"sectionLines":segments,"coverLines":segments,
+                              "barPoints":(n,2) array,"barSize":bar marker size}
+           rasterizeLimit-layers with more elements are rasterized in vector outputs (eps, pdf, svg)
+    """
+    from matplotlib.collections import LineCollection
+    for layerName, color, zorder in (("coreLines", "b", 1), ("sectionLines", "r", 2), ("coverLines", "r", 2)):
+        segments = layers.get(layerName)
+        if segments is None or len(segments) == 0:
+            continue
+        lineCollection = LineCollection(segments, colors=color, linewidths=1, zorder=zorder)
+        lineCollection.set_rasterized(len(segments) > rasterizeLimit)
+        ax.add_collection(lineCollection)
+    barPoints = layers.get("barPoints")
+    if barPoints is not None and len(barPoints) > 0:
+        barCollection = ax.scatter(barPoints[:, 0], barPoints[:, 1], s=layers.get("barSize", 20), c="k", zorder=3)
+        barCollection.set_rasterized(len(barPoints) > rasterizeLimit)
+    ax.autoscale_view()
+######################################################################################
+def _saveFigure(fig, sectionName, formats):
+    for eachFormat in formats or ():
+        fig.savefig(sectionName + "." + eachFormat, format=eachFormat)
+######################################################################################
+def _renderAgg(sectionName, layers, figSize, formats, rasterizeLimit):
+    """
+    Render with the Agg canvas only, pyplot and the GUI backends are never used
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figSize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    drawLayers(ax, layers, rasterizeLimit)
+    _saveFigure(fig, sectionName, formats)
+######################################################################################
+def renderSection(sectionName, layers, figSize, formats=("eps", "jpg"), mode="show", rasterizeLimit=5000):
+    """
+    Render the section fibers
+    Input: sectionName-output file name without extension
+           layers-layer dict, see drawLayers
+           figSize-figure size [w,h]
+           formats-output formats, for example ("png",) or ("eps","jpg"), None or () for no file
+           mode-"show": save the files and show the figure with pyplot (blocks until the window is closed)
+                "agg": save the files with the Agg canvas, never shows
+                "background": "agg" in a separate process, returns at once
+           rasterizeLimit-layers with more elements are rasterized in vector outputs
+    Output: process-the render process for mode="background" (see waitRenders), otherwise None
+    """
+    if mode == "show":
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figSize)
+        ax = fig.add_subplot(111)
+        drawLayers(ax, layers, rasterizeLimit)
+        _saveFigure(fig, sectionName, formats)
+        plt.show()
+    elif mode == "agg":
+        _renderAgg(sectionName, layers, figSize, formats, rasterizeLimit)
+    elif mode == "background":
+        import multiprocessing
+        process = multiprocessing.Process(target=_renderAgg,
+                                          args=(sectionName, layers, figSize, formats, rasterizeLimit))
+        process.start()
+        _backgroundRenders.append(process)
+        return process
+    else:
+        raise ValueError("Error!Please select show, agg or background mode!")
+    return None
+######################################################################################
+def waitRenders(timeout=None):
+    """
+    Wait for the background renders
+    Input: timeout-maximum waiting time of each render (s), None waits until they finish
+    Output: number of renders still running
+    """
+    for eachProcess in list(_backgroundRenders):
+        eachProcess.join(timeout)
+        if not eachProcess.is_alive():
+            _backgroundRenders.remove(eachProcess)
+    return len(_backgroundRenders)
+######################################################################################
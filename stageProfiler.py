@@ -0,0 +1,172 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Per-stage instrumentation of the section generation (circleSection, polygonSection, sectionBatch)
+#  one record for each stage of each section:
+#  {"section","stage","wallTime"(s),"peakMemory"(bytes, Python and NumPy allocations during the stage, None when
+#   not traced),"fiberCount","vertexCount","elementCount"(gmsh triangles)}
+#  the default NULL_PROFILER does nothing, its stage() returns a shared empty context manager
+######################################################################################
+import time
+import tracemalloc
+######################################################################################
+class _NullStage():
+    def __enter__(self):
+        return self
+    def __exit__(self, excType, excValue, excTraceback):
+        return False
+######################################################################################
+class NullProfiler():
+    """
+    Disabled instrumentation, the default profiler of the section functions
+    """
+    _stage = _NullStage()
+    ####################################################
+    def stage(self, sectionName, stageName):
+        return self._stage
+    ####################################################
+    def count(self, **counts):
+        pass
+######################################################################################
+NULL_PROFILER = NullProfiler()
+######################################################################################
+class _Stage():
+    """
+    Context manager of one stage record
+    """
+    ####################################################
+    def __init__(self, profiler, sectionName, stageName):
+        self.profiler = profiler
+        self.record = {"section": sectionName, "stage": stageName, "wallTime": None, "peakMemory": None,
+                       "fiberCount": None, "vertexCount": None, "elementCount": None}
+    ####################################################
+    def __enter__(self):
+        self.profiler._openStages.append(self)
+        if self.profiler.traceMemory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.profiler._startedTracing = True
+            self._startMemory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._startTime = time.perf_counter()
+        return self
+    ####################################################
+    def __exit__(self, excType, excValue, excTraceback):
+        self.record["wallTime"] = time.perf_counter() - self._startTime
+        if self.profiler.traceMemory:
+            self.record["peakMemory"] = max(0, tracemalloc.get_traced_memory()[1] - self._startMemory)
+        self.profiler._openStages.pop()
+        if excType is not None:
+            self.record["error"] = excType.__name__
+        self.profiler._addRecord(self.record)
+        return False
+######################################################################################
+class StageProfiler():
+    """
+    Stage timing and counter instrumentation of the section generation
+    #######################---example---#########################
+    from stageProfiler import StageProfiler
+    profiler = StageProfiler(callback=print)
+    coreFiber, coverFiber, barFiber = polygonSection(..., profiler=profiler)
+    results, errors = sectionBatch(sectionSpecs, maxWorkers=8, profiler=profiler)
+    report = profiler.report()
+    print(report.stageTotals())
+    print(report.slowestSections(10))
+    """
+    ####################################################
+    def __init__(self, callback=None, traceMemory=True):
+        """
+        Input: callback-function called with each stage record, None for no callback
+               traceMemory-record the peak memory of each stage with tracemalloc (slows down the allocations)
+        """
+        self.callback = callback
+        self.traceMemory = traceMemory
+        self.records = []
+        self._openStages = []
+        self._startedTracing = False
+    ####################################################
+    def stage(self, sectionName, stageName):
+        """
+        Context manager that records one stage
+        """
+        return _Stage(self, sectionName, stageName)
+    ####################################################
+    def count(self, **counts):
+        """
+        Set the counters (fiberCount, vertexCount, elementCount) of the innermost open stage
+        """
+        if self._openStages:
+            self._openStages[-1].record.update(counts)
+    ####################################################
+    def _addRecord(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+        if not self._openStages and self._startedTracing:
+            tracemalloc.stop()
+            self._startedTracing = False
+    ####################################################
+    def extend(self, records):
+        """
+        Add the records of another profiler (for example of a worker process)
+        """
+        for eachRecord in records:
+            self._addRecord(eachRecord)
+    ####################################################
+    def report(self):
+        """
+        Return a StageReport of the records
+        """
+        return StageReport(self.records)
+######################################################################################
+class StageReport():
+    """
+    Stage records of the profiled sections
+    """
+    ####################################################
+    def __init__(self, records):
+        self.records = list(records)
+    ####################################################
+    def sectionTotals(self):
+        """
+        Output: {sectionName:{"wallTime","peakMemory","fiberCount","stages":{stageName:wallTime}}}
+        """
+        totals = {}
+        for eachRecord in self.records:
+            sectionTotal = totals.setdefault(eachRecord["section"], {"wallTime": 0.0, "peakMemory": None,
+                                                                     "fiberCount": 0, "stages": {}})
+            sectionTotal["wallTime"] += eachRecord["wallTime"]
+            sectionTotal["fiberCount"] += eachRecord["fiberCount"] or 0
+            if eachRecord["peakMemory"] is not None:
+                sectionTotal["peakMemory"] = max(sectionTotal["peakMemory"] or 0, eachRecord["peakMemory"])
+            stages = sectionTotal["stages"]
+            stages[eachRecord["stage"]] = stages.get(eachRecord["stage"], 0.0) + eachRecord["wallTime"]
+        return totals
+    ####################################################
+    def stageTotals(self):
+        """
+        Output: {stageName:{"count","wallTime","maxWallTime","peakMemory"}} over all the sections
+        """
+        totals = {}
+        for eachRecord in self.records:
+            stageTotal = totals.setdefault(eachRecord["stage"], {"count": 0, "wallTime": 0.0, "maxWallTime": 0.0,
+                                                                 "peakMemory": None})
+            stageTotal["count"] += 1
+            stageTotal["wallTime"] += eachRecord["wallTime"]
+            stageTotal["maxWallTime"] = max(stageTotal["maxWallTime"], eachRecord["wallTime"])
+            if eachRecord["peakMemory"] is not None:
+                stageTotal["peakMemory"] = max(stageTotal["peakMemory"] or 0, eachRecord["peakMemory"])
+        return totals
+    ####################################################
+    def slowestSections(self, n=10):
+        """
+        Output: [(sectionName,wallTime,slowest stage name),...] of the n slowest sections
+        """
+        totals = self.sectionTotals()
+        ranking = sorted(totals.items(), key=lambda each: each[1]["wallTime"], reverse=True)[:n]
+        return [(name, values["wallTime"], max(values["stages"], key=values["stages"].get))
+                for name, values in ranking]
+######################################################################################
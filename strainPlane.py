@@ -0,0 +1,83 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Batched strain-plane evaluation of a fiber section
+#  strain plane (eps0,kappaY,kappaZ): fiber strain eps=eps0+kappaY*z-kappaZ*y
+#  section forces (N,My,Mz): N=sum(sigma*A), My=sum(sigma*A*z), Mz=-sum(sigma*A*y)
+#  section tangent: d(N,My,Mz)/d(eps0,kappaY,kappaZ)=sum(Et*A*a*a^T), a=(1,z,-y)
+######################################################################################
+import numpy as np
+from fiberSet import FiberSet, CORE, regionNames
+######################################################################################
+#default bound of the (planes x fibers) work arrays, number of elements of each chunk
+_chunkElements = 2 ** 22
+######################################################################################
+def _strainVector(fibers):
+    """
+    (nFiber,3) array a=(1,z,-y) of the fibers, the strain of the plane d is a@d
+    """
+    return np.column_stack((np.ones(len(fibers)), fibers.z, -fibers.y))
+######################################################################################
+def fiberStrain(fibers, planes):
+    """
+    Fiber strains of the strain planes
+    Input: fibers-FiberSet
+           planes-strain plane array [[eps0,kappaY,kappaZ],...], shape (nPlane,3)
+    Output: strain-(nPlane,nFiber) fiber strain array
+    """
+    planes = np.asarray(planes, dtype=float).reshape(-1, 3)
+    return planes @ _strainVector(fibers).T
+######################################################################################
+def sectionResponse(fibers, materials, planes, chunkSize=None, tangent=True):
+    """
+    Section forces and tangents of a batch of strain planes
+    Input: fibers-FiberSet, or the (n,3) fiber array [[y1,z1,area1],...] (regarded as CORE fibers)
+           materials-uniaxial material of each fiber tag {CORE:coreMaterial,COVER:coverMaterial,BAR:steel},
+                     each has stressTangent(strain)->(stress,tangent), see uniaxialMaterial.py
+           planes-strain plane array [[eps0,kappaY,kappaZ],...], shape (nPlane,3)
+           chunkSize-number of planes evaluated at the same time, bounds the (chunkSize,nFiber) work arrays,
+                     None for about 4 million fiber states per chunk
+           tangent-also return the section tangents
+    Output: forces-(nPlane,3) section force array [[N,My,Mz],...]
+            tangents-(nPlane,3,3) section tangent array, only with tangent=True
+    """
+    if not isinstance(fibers, FiberSet):
+        fibers = FiberSet.fromTuples(fibers, CORE)
+    planes = np.asarray(planes, dtype=float).reshape(-1, 3)
+    nPlane, nFiber = len(planes), len(fibers)
+    if chunkSize is None:
+        chunkSize = max(1, _chunkElements // max(nFiber, 1))
+    strainVector = _strainVector(fibers)
+    #a*a^T of each fiber, (nFiber,9)
+    outerVector = (strainVector[:, :, None] * strainVector[:, None, :]).reshape(nFiber, 9)
+    #fiber index of each tag, a slice when the tag is stored contiguously
+    tagGroups = []
+    for eachTag in np.unique(fibers.tag):
+        if int(eachTag) not in materials:
+            raise ValueError("no material for fiber tag %s" % regionNames.get(int(eachTag), int(eachTag)))
+        index = np.flatnonzero(fibers.tag == eachTag)
+        if index[-1] - index[0] + 1 == len(index):
+            index = slice(index[0], index[-1] + 1)
+        tagGroups.append((materials[int(eachTag)], index))
+    forces = np.empty((nPlane, 3))
+    tangents = np.empty((nPlane, 3, 3)) if tangent else None
+    for i1 in range(0, nPlane, chunkSize):
+        planeChunk = planes[i1:i1 + chunkSize]
+        strain = planeChunk @ strainVector.T
+        stressArea = np.empty_like(strain)
+        tangentArea = np.empty_like(strain) if tangent else None
+        for material, index in tagGroups:
+            stress, modulus = material.stressTangent(strain[:, index])
+            stressArea[:, index] = stress * fibers.area[index]
+            if tangent:
+                tangentArea[:, index] = modulus * fibers.area[index]
+        forces[i1:i1 + chunkSize] = stressArea @ strainVector
+        if tangent:
+            tangents[i1:i1 + chunkSize] = (tangentArea @ outerVector).reshape(-1, 3, 3)
+    if tangent:
+        return forces, tangents
+    return forces
+######################################################################################
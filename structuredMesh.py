@@ -0,0 +1,100 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+from fiberKernel import annularSectorFibers
+from pointInPolygon import points_in_2d_polygon
+######################################################################################
+def polarMesh(outRadius, innerRadius, eleSize):
+    """
+    Concentric ring and sector fibers of a disk (annulus if innerRadius is not None), no gmsh
+    The radial size and the sector count of each ring are chosen to respect eleSize, the fiber areas are exact
+    Input: outRadius-outside radius
+           innerRadius-inner radius, None for solid disk
+           eleSize-fiber element size
+    Output: xc,yc,area-fiber centroid coordinates and area arrays
+            points,triangles-node coordinates (n,3) and triangle elements (m,3) for plotting the sectors
+    """
+    startRadius = 0.0 if innerRadius == None else float(innerRadius)
+    nRing = max(1, int(np.ceil((outRadius - startRadius) / eleSize - 1.0e-9)))
+    ringRadius = np.linspace(startRadius, outRadius, nRing + 1)
+    midRadius = 0.5 * (ringRadius[:-1] + ringRadius[1:])
+    nSector = np.maximum(3, np.ceil(2.0 * np.pi * midRadius / eleSize - 1.0e-9).astype(int))
+    ringIndex = np.repeat(np.arange(nRing), nSector)
+    sectorIndex = np.arange(len(ringIndex)) - np.repeat(np.cumsum(nSector) - nSector, nSector)
+    sectorAngle = 2.0 * np.pi / nSector[ringIndex]
+    r1, r2 = ringRadius[ringIndex], ringRadius[ringIndex + 1]
+    theta1 = sectorIndex * sectorAngle
+    theta2 = theta1 + sectorAngle
+    xc, yc, area = annularSectorFibers(r1, r2, theta1, theta2)
+    #four corners of each sector and two triangles, the sectors touching the center have one triangle
+    cornerRadius = np.column_stack((r1, r1, r2, r2)).ravel()
+    cornerAngle = np.column_stack((theta1, theta2, theta1, theta2)).ravel()
+    points = np.column_stack((cornerRadius * np.cos(cornerAngle), cornerRadius * np.sin(cornerAngle),
+                              np.zeros(len(cornerAngle))))
+    first = 4 * np.arange(len(r1))[:, None]
+    triangles = np.concatenate((first + [0, 2, 3], (first + [0, 3, 1])[r1 > 0.0]))
+    return xc, yc, area, points, triangles
+######################################################################################
+def _gridLines(coordinates, eleSize, tol):
+    """
+    grid line coordinates through every vertex coordinate, no grid interval is larger than eleSize
+    """
+    breakPoints = np.unique(coordinates)
+    breakPoints = breakPoints[np.concatenate(([True], np.diff(breakPoints) > tol))]
+    gap = np.diff(breakPoints)
+    nDivide = np.maximum(1, np.ceil(gap / eleSize - 1.0e-9).astype(int))
+    fraction = np.arange(nDivide.sum()) - np.repeat(np.cumsum(nDivide) - nDivide, nDivide)
+    lines = np.repeat(breakPoints[:-1], nDivide) + np.repeat(gap / nDivide, nDivide) * fraction
+    return np.append(lines, breakPoints[-1])
+######################################################################################
+def rectilinearMesh(rings, eleSize, tol=1.0e-9):
+    """
+    Rectangular fibers of a polygon with axis-aligned edges (rectangle, T, I, multi-cell box), no gmsh
+    The structured grid runs through every vertex, so each cell is either inside or outside the core
+    and the fiber areas are exact
+    Input: rings-core boundary rings [outRing,holeRing1,...], each [(x1,y1),...,(xn,yn)]
+           eleSize-fiber element size
+           tol-relative tolerance of the axis-aligned edge test
+    Output: xc,yc,area-fiber centroid coordinates and area arrays
+            points,triangles-node coordinates (n,3), four corners of each cell, and triangle elements (m,3)
+            None if any edge is not axis-aligned
+    the cells are plotted with their outlines (see cellOutlines), not with the two triangles of each cell
+    """
+    ringArrays = [np.asarray(eachRing, dtype=float)[:, :2] for eachRing in rings]
+    allNodes = np.concatenate(ringArrays)
+    absTol = tol * max(np.ptp(allNodes[:, 0]), np.ptp(allNodes[:, 1]))
+    for ring in ringArrays:
+        edge = np.roll(ring, -1, axis=0) - ring
+        if np.any((np.abs(edge[:, 0]) > absTol) & (np.abs(edge[:, 1]) > absTol)):
+            return None
+    xLines = _gridLines(allNodes[:, 0], eleSize, absTol)
+    yLines = _gridLines(allNodes[:, 1], eleSize, absTol)
+    x1, y1 = np.meshgrid(xLines[:-1], yLines[:-1], indexing="ij")
+    x2, y2 = np.meshgrid(xLines[1:], yLines[1:], indexing="ij")
+    x1, y1, x2, y2 = x1.ravel(), y1.ravel(), x2.ravel(), y2.ravel()
+    xc, yc = 0.5 * (x1 + x2), 0.5 * (y1 + y2)
+    #the cell centers are never on a boundary edge
+    inside = points_in_2d_polygon(np.column_stack((xc, yc)), ringArrays, tol=0.0)
+    x1, y1, x2, y2, xc, yc = x1[inside], y1[inside], x2[inside], y2[inside], xc[inside], yc[inside]
+    area = (x2 - x1) * (y2 - y1)
+    points = np.column_stack((np.column_stack((x1, x2, x2, x1)).ravel(), np.column_stack((y1, y1, y2, y2)).ravel(),
+                              np.zeros(4 * len(xc))))
+    first = 4 * np.arange(len(xc))[:, None]
+    triangles = np.concatenate((first + [0, 1, 2], first + [0, 2, 3]))
+    return xc, yc, area, points, triangles
+######################################################################################
+def cellOutlines(points):
+    """
+    Closed outline of each rectangular cell of rectilinearMesh
+    Input: points-node coordinates of rectilinearMesh, four corners of each cell
+    Output: xList,yList-outline coordinates arrays [[x1,x2,x3,x4,x1],...], one row for each cell
+    """
+    corners = np.asarray(points, dtype=float)[:, :2].reshape(-1, 4, 2)
+    closed = np.concatenate((corners, corners[:, :1]), axis=1)
+    return closed[:, :, 0], closed[:, :, 1]
+######################################################################################
@@ -0,0 +1,64 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from fiberSet import CORE, COVER, BAR
+from uniaxialMaterial import KentParkConcrete, BilinearSteel
+from convergenceStudy import convergenceStudy
+######################################################################################
+#the analytic circle mesher needs no gmsh
+SPEC = {"section": "circle", "sectionName": "pier", "outD": 2.0, "coverThick": 0.06, "outbarD": 0.03,
+        "outbarDist": 0.15, "coreMesher": "analytic"}
+MATERIALS = {CORE: KentParkConcrete(-34.5e3, -0.002, -24.0e3, -0.014),
+             COVER: KentParkConcrete(-30.0e3, -0.002, 0.0, -0.005), BAR: BilinearSteel(400.0e3, 2.0e8, 0.01)}
+######################################################################################
+def coarsestMeeting(errorList, tolerance):
+    """
+    index of the coarsest level from which all the finer levels meet the tolerance
+    """
+    selected = len(errorList) - 1
+    while selected > 0 and errorList[selected - 1] is not None and errorList[selected - 1] <= tolerance:
+        selected -= 1
+    return selected
+######################################################################################
+@pytest.mark.parametrize("tolerance", [0.05, 0.03, 0.01, 0.002])
+def test_errorsShrinkAndSelection(tolerance):
+    #the ladder is sorted from coarse to fine
+    study = convergenceStudy(SPEC, [0.1, 0.4, 0.025, 0.3, 0.05, 0.2], tolerance=tolerance, maxWorkers=2)
+    levels = study["levels"]
+    assert [each["coreSize"] for each in levels] == [0.4, 0.3, 0.2, 0.1, 0.05, 0.025]
+    assert all(each["error"] is None for each in levels)
+    errorList = [each["propertyError"] for each in levels]
+    assert np.all(np.diff(errorList) < 0.0) and errorList[-1] == 0.0
+    assert np.all(np.diff([each["fiberCount"] for each in levels]) > 0)
+    selected = study["selected"]
+    assert selected == coarsestMeeting(errorList, tolerance)
+    assert errorList[selected] <= tolerance and (selected == 0 or errorList[selected - 1] > tolerance)
+    assert study["coreSize"] == levels[selected]["coreSize"] and len(study["fibers"]) == levels[selected]["fiberCount"]
+    assert study["curves"] == [None] * len(levels)
+######################################################################################
+def test_momentCurvatureAndFailedLevel():
+    #the second level cannot be generated (negative cover size), it is reported and the other levels are compared
+    study = convergenceStudy(SPEC, [0.4, (0.3, -0.3), 0.2, 0.1, 0.05], tolerance=0.05, materials=MATERIALS,
+                             axialLoad=-5000.0, maxCurvature=0.005, nStep=20, maxWorkers=2)
+    levels = study["levels"]
+    assert "ValueError" in levels[1]["error"]
+    assert levels[1]["fiberCount"] is None and study["curves"][1] is None and study["properties"][1] is None
+    valid = [0, 2, 3, 4]
+    assert all(levels[i1]["error"] is None for i1 in valid)
+    momentList = [levels[i1]["momentError"] for i1 in valid]
+    assert np.all(np.diff(momentList) < 0.0) and momentList[-1] == 0.0
+    assert all(len(study["curves"][i1]["moment"]) == 21 for i1 in valid)
+    #the coarsest level meets the tolerance, but the failed level stops the selection before it
+    assert levels[0]["propertyError"] <= 0.05 and levels[0]["momentError"] <= 0.05
+    assert study["selected"] == 2 and study["coreSize"] == 0.2
+######################################################################################
+def test_missingMaxCurvature():
+    with pytest.raises(ValueError):
+        convergenceStudy(SPEC, [0.4, 0.2], materials=MATERIALS)
+######################################################################################
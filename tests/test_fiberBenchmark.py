@@ -0,0 +1,46 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import os
+import json
+import importlib.util
+######################################################################################
+BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks",
+                              "fiberBenchmark.py")
+spec = importlib.util.spec_from_file_location("fiberBenchmark", BENCHMARK_PATH)
+fiberBenchmark = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fiberBenchmark)
+######################################################################################
+def test_runWritesEveryStage(tmp_path):
+    outputPath = str(tmp_path / "results.json")
+    results = fiberBenchmark.runBenchmark(outputPath, quick=True, axisList=["plot"], repeat=1,
+                                          circleMesher="analytic", polygonMesher="structured")
+    with open(outputPath) as outputFile:
+        assert json.load(outputFile) == json.loads(json.dumps(results))
+    #the plot files are written to a temporary directory, not to the working directory
+    assert os.listdir(str(tmp_path)) == ["results.json"]
+    plotOff, plotOn = results["cases"]
+    assert plotOff["error"] is None and plotOn["error"] is None
+    assert "plot" in plotOn["stages"] and "plot" not in plotOff["stages"]
+    assert plotOn["stages"]["coreMesh"]["fiberCount"] > 0 and plotOn["peakMemory"] > 0
+    assert plotOn["wallTime"] == sum(each["wallTime"] for each in plotOn["stages"].values())
+######################################################################################
+def test_compareFindsSlowerStages(tmp_path):
+    stages = {"coreMesh": {"wallTime": 0.5}, "coverMesh": {"wallTime": 0.001}}
+    base = {"meta": {"revision": "base"}, "cases": [{"name": "case1", "error": None, "wallTime": 0.501,
+                                                     "stages": stages}]}
+    basePath, newPath = str(tmp_path / "base.json"), str(tmp_path / "new.json")
+    with open(basePath, "w") as baseFile:
+        json.dump(base, baseFile)
+    assert fiberBenchmark.compareResults(basePath, basePath) == []
+    #the core mesh is 40% slower, the cover mesh 3 times slower but shorter than minTime
+    base["cases"][0].update(wallTime=0.703, stages={"coreMesh": {"wallTime": 0.7}, "coverMesh": {"wallTime": 0.003}})
+    with open(newPath, "w") as newFile:
+        json.dump(base, newFile)
+    regressions = fiberBenchmark.compareResults(basePath, newPath, threshold=0.1, minTime=0.01)
+    assert [each[:2] for each in regressions] == [("case1", "total"), ("case1", "coreMesh")]
+    assert fiberBenchmark.compareResults(basePath, newPath, threshold=0.5) == []
+######################################################################################
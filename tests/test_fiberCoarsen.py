@@ -0,0 +1,93 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from fiberSet import FiberSet, CORE, COVER, BAR
+from sectionProperty import sectionProperties
+from structuredMesh import rectilinearMesh, polarMesh
+from fiberCoarsen import coarsenFibers, propertyError, _gridLabels, _mergeLabels
+######################################################################################
+def boxSection():
+    """
+    fine structured core of a box, an unstructured (random) cover layer on its top flange and bars
+    """
+    outRing = [(0.0, 0.0), (3.0, 0.0), (3.0, 2.0), (0.0, 2.0)]
+    holeRing = [(0.5, 0.5), (2.5, 0.5), (2.5, 1.5), (0.5, 1.5)]
+    xc, yc, area = rectilinearMesh([outRing, holeRing], 0.02)[:3]
+    generator = np.random.default_rng(5)
+    coverY, coverZ = generator.uniform(0.0, 3.0, 3000), generator.uniform(2.0, 2.05, 3000)
+    coverArea = generator.uniform(0.5, 1.5, 3000) * 0.15 / 3000.0
+    bar = FiberSet(np.linspace(0.1, 2.9, 15), np.full(15, 0.1), 0.0005, BAR)
+    return FiberSet.concatenate([FiberSet(xc, yc, area, CORE), FiberSet(coverY, coverZ, coverArea, COVER), bar])
+######################################################################################
+@pytest.mark.parametrize("method", ["grid", "kmeans"])
+def test_correctionKeepsMoments(method):
+    fibers = boxSection()
+    coarseFibers, report = coarsenFibers(fibers, 600, method=method)
+    #the area, the first moments and the second moments of every region are kept to round-off
+    assert report["maxError"] < 1.0e-10
+    errorDict = propertyError(sectionProperties(fibers), sectionProperties(coarseFibers))
+    assert max(max(each.values()) for each in errorDict.values()) == report["maxError"]
+    assert report["fiberCount"] == (len(fibers), len(coarseFibers))
+    assert len(coarseFibers.region(CORE)) + len(coarseFibers.region(COVER)) <= 600
+    #the bars are kept as they are and the regions keep their order
+    assert np.array_equal(coarseFibers.region(BAR).toArray(), fibers.region(BAR).toArray())
+    assert np.all(np.diff(coarseFibers.tag) >= 0)
+######################################################################################
+def test_mergeErrorIsWithinClusterInertia():
+    #without the correction a merge keeps the area and the first moments, and removes exactly the inertia of
+    #each cluster about its own centroid (parallel axis theorem), so the coarse Iy and Iz are never larger
+    fibers = boxSection().region(CORE)
+    labels = _gridLabels(fibers.y, fibers.z, fibers.area, 300)
+    y, z, area = _mergeLabels(fibers.y, fibers.z, fibers.area, labels)
+    inverse = np.unique(labels, return_inverse=True)[1].reshape(-1)
+    lostIy = np.sum(fibers.area * (fibers.z - z[inverse]) ** 2)
+    lostIz = np.sum(fibers.area * (fibers.y - y[inverse]) ** 2)
+    fine = sectionProperties(fibers)["core"]
+    coarse = sectionProperties(FiberSet(y, z, area, CORE))["core"]
+    assert np.isclose(coarse["area"], fine["area"], rtol=1.0e-13)
+    assert np.isclose(coarse["yc"], fine["yc"], rtol=1.0e-13) and np.isclose(coarse["zc"], fine["zc"], rtol=1.0e-13)
+    assert np.isclose(fine["Iy"] - coarse["Iy"], lostIy, rtol=1.0e-9)
+    assert np.isclose(fine["Iz"] - coarse["Iz"], lostIz, rtol=1.0e-9)
+    assert lostIy > 0.0 and lostIz > 0.0
+######################################################################################
+def test_errorBoundWithoutCorrection():
+    #the z spread of a cluster of height h about its centroid is at most h^2/4 (Popoviciu), so the lost Iy is bounded
+    #by sum(A*h^2)/4 over the clusters, about budget^-1 of the region inertia for a fixed section
+    fibers = boxSection()
+    core = fibers.region(CORE)
+    fineCore = sectionProperties(core)["core"]
+    errorList = []
+    for budget in (200, 800):
+        coarseFibers, report = coarsenFibers(fibers, budget, correction=False)
+        assert report["maxShift"] == 0.0
+        #the same clusters as coarsenFibers, the core gets its share of the budget
+        nTarget = int(round(budget * len(core) / (len(core) + 3000)))
+        labels = np.unique(_gridLabels(core.y, core.z, core.area, nTarget), return_inverse=True)[1].reshape(-1)
+        assert len(coarseFibers.region(CORE)) == labels.max() + 1
+        order = np.argsort(labels, kind="stable")
+        start = np.r_[0, np.cumsum(np.bincount(labels))[:-1]]
+        height = np.maximum.reduceat(core.z[order], start) - np.minimum.reduceat(core.z[order], start)
+        width = np.maximum.reduceat(core.y[order], start) - np.minimum.reduceat(core.y[order], start)
+        clusterArea = np.bincount(labels, weights=core.area)
+        inertia = max(fineCore["Iy"], fineCore["Iz"])
+        assert report["error"]["core"]["Iy"] <= np.sum(clusterArea * height ** 2) / 4.0 / inertia
+        assert report["error"]["core"]["Iz"] <= np.sum(clusterArea * width ** 2) / 4.0 / inertia
+        errorList.append(report["error"]["core"]["Iy"])
+    #four times the budget, about a quarter of the error
+    assert errorList[1] < 0.5 * errorList[0]
+######################################################################################
+def test_smallBudgetAndUnknownMethod():
+    fibers = FiberSet(*polarMesh(1.0, None, 0.2)[:3], CORE)
+    coarseFibers, report = coarsenFibers(fibers, 10 * len(fibers))
+    assert np.array_equal(coarseFibers.toArray(), fibers.toArray()) and report["maxError"] == 0.0
+    #at least three fibers are kept for each region
+    assert len(coarsenFibers(fibers, 1)[0]) >= 3
+    with pytest.raises(ValueError):
+        coarsenFibers(fibers, 10, method="random")
+######################################################################################
@@ -0,0 +1,197 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import math
+import numpy as np
+import pytest
+from fiberKernel import barLineFibers, triEleInfo, annularSectorFibers, coverQuadFibers
+from fiberGenerate import CircleSection, PolygonSection
+######################################################################################
+def loopTriEleInfo(points, triangles):
+    """
+    per-element loop of the previous CircleSection._triEleInfo and PolygonSection._triEleInfo
+    """
+    infoList = []
+    for I, J, K in triangles:
+        (x1, y1), (x2, y2), (x3, y3) = points[I][:2], points[J][:2], points[K][:2]
+        area = 0.5 * (x1 * y2 - x2 * y1 + x2 * y3 - x3 * y2 + x3 * y1 - x1 * y3)
+        infoList.append(((x1 + x2 + x3) / 3.0, (y1 + y2 + y3) / 3.0, area))
+    return infoList
+######################################################################################
+@pytest.mark.parametrize("nodeColumns", [2, 3])
+def test_triEleInfoMatchesLoop(nodeColumns):
+    generator = np.random.default_rng(2)
+    points = generator.uniform(-1.0, 1.0, (50, nodeColumns))
+    triangles = generator.integers(0, 50, (200, 3))
+    xc, yc, area = triEleInfo(points, triangles)
+    assert np.allclose(np.column_stack((xc, yc, area)), loopTriEleInfo(points, triangles), rtol=0.0, atol=1.0e-14)
+    #lists work as well as arrays
+    assert np.allclose(triEleInfo(points.tolist(), triangles.tolist())[2], area)
+######################################################################################
+def test_triEleInfoSignedArea():
+    points = [(0.0, 0.0, 0.0), (2.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
+    xc, yc, area = triEleInfo(points, [[0, 1, 2], [0, 2, 1]])
+    assert np.allclose(area, [1.0, -1.0])
+    assert np.allclose(xc, 2.0 / 3.0) and np.allclose(yc, 1.0 / 3.0)
+    assert [len(each) for each in triEleInfo(points, np.empty((0, 3), dtype=int))] == [0, 0, 0]
+######################################################################################
+def test_sectionsShareTriEleInfo():
+    #both sections turn their mesh into fibers with the same routine
+    points = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)])
+    triangles = np.array([[0, 1, 2], [0, 2, 3]])
+    meshFunction = lambda *args: (points, triangles)
+    circleInstance = CircleSection(0.1, 2.0)
+    circleInstance._gmshCoreMesh = meshFunction
+    polygonInstance = PolygonSection({1: (0.0, 0.0), 2: (1.0, 0.0), 3: (1.0, 1.0), 4: (0.0, 1.0)},
+                                     {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)})
+    polygonInstance._gmshCoreMesh = meshFunction
+    circleFibers = circleInstance.coreMesh(0.5)[0]
+    polygonFibers = polygonInstance.coreMesh(0.5, [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])[0]
+    for fibers in (circleFibers, polygonFibers):
+        assert np.allclose(fibers.toArray(), loopTriEleInfo(points, triangles))
+######################################################################################
+OCTAGON = {1: (3.5, 3.0), 2: (1.5, 5.0), 3: (-1.5, 5.0), 4: (-3.5, 3.0), 5: (-3.5, -3.0), 6: (-1.5, -5.0),
+           7: (1.5, -5.0), 8: (3.5, -3.0)}
+OCTAGON_ELE = {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 5), 5: (5, 6), 6: (6, 7), 7: (7, 8), 8: (8, 1)}
+#the polygon sections of the PolygonSection examples, the last one shifted so that its first moments are not zero
+EXAMPLE_SECTIONS = [
+    (OCTAGON, None),
+    (OCTAGON, [{1: (1.9, 2.4), 2: (1.1, 3.2), 3: (-1.1, 3.2), 4: (-1.9, 2.4), 5: (-1.9, -2.4), 6: (-1.1, -3.2),
+                7: (1.1, -3.2), 8: (1.9, -2.4)}]),
+    ({key: (y + 2.0, z + 1.0) for key, (y, z) in {1: (4.5, 6.655), 2: (2.5, 8.655), 3: (-2.5, 8.655),
+                                                 4: (-4.5, 6.655), 5: (-4.5, -6.655), 6: (-2.5, -8.655),
+                                                 7: (2.5, -8.655), 8: (4.5, -6.655)}.items()},
+     [{key: (y + 2.0, z + 1.0) for key, (y, z) in each.items()} for each in
+      [{1: (2.5, 5.855), 2: (1.7, 6.655), 3: (-1.7, 6.655), 4: (-2.5, 5.855), 5: (-2.5, 1.3), 6: (-1.7, 0.5),
+        7: (1.7, 0.5), 8: (2.5, 1.3)},
+       {1: (2.5, -1.3), 2: (1.7, -0.5), 3: (-1.7, -0.5), 4: (-2.5, -1.3), 5: (-2.5, -5.855), 6: (-1.7, -6.655),
+        7: (1.7, -6.655), 8: (2.5, -5.855)}]])]
+######################################################################################
+def loopCoverFibers(outNodeDict, inNodeDict, eleDict, eleSize, coverThick):
+    """
+    per-quadrilateral loop of the previous PolygonSection._coverDivide: trapezoid area of each edge, centroid at the
+    average of the four nodes; also returns the distance between the midpoints of the two parallel sides
+    """
+    infoList = []
+    for i1 in range(1, len(eleDict) + 1):
+        nodeI, nodeJ = eleDict[i1]
+        outI, outJ = np.array(outNodeDict[nodeI]), np.array(outNodeDict[nodeJ])
+        inI, inJ = np.array(inNodeDict[nodeI]), np.array(inNodeDict[nodeJ])
+        nEle = max(1, int(math.hypot(*(outJ - outI)) / float(eleSize)))
+        outNode = [((nEle - i2) * outI + i2 * outJ) / nEle for i2 in range(nEle + 1)]
+        inNode = [((nEle - i2) * inI + i2 * inJ) / nEle for i2 in range(nEle + 1)]
+        eleArea = (math.hypot(*(inNode[1] - inNode[0])) + math.hypot(*(outNode[1] - outNode[0]))) * coverThick / 2.0
+        for i3 in range(nEle):
+            outCenter, inCenter = (outNode[i3] + outNode[i3 + 1]) / 2.0, (inNode[i3] + inNode[i3 + 1]) / 2.0
+            center = (outCenter + inCenter) / 2.0
+            infoList.append((center[0], center[1], eleArea, math.hypot(*(outCenter - inCenter))))
+    return np.array(infoList)
+######################################################################################
+def ringMoments(ring):
+    """
+    area and first moments (about the z and y axes) of the region bounded by the ring, whatever its orientation
+    """
+    ring = np.asarray(ring, dtype=float)
+    nextRing = np.roll(ring, -1, axis=0)
+    cross = ring[:, 0] * nextRing[:, 1] - nextRing[:, 0] * ring[:, 1]
+    sign = np.sign(cross.sum())
+    return sign * np.array([cross.sum() / 2.0, ((ring[:, 0] + nextRing[:, 0]) * cross).sum() / 6.0,
+                            ((ring[:, 1] + nextRing[:, 1]) * cross).sum() / 6.0])
+######################################################################################
+@pytest.mark.parametrize("innerDiameter", [None, 1.0])
+def test_circleCoverAreaIsExact(innerDiameter):
+    outDiameter, coverThick, coverSize = 2.0, 0.06, 0.1
+    circleInstance = CircleSection(coverThick, outDiameter, innerDiameter)
+    coverFiber = circleInstance.coverMesh(coverSize)[0]
+    R, r = outDiameter / 2.0, outDiameter / 2.0 - coverThick
+    exactArea = np.pi * (R ** 2 - r ** 2)
+    nCoverList = [int(np.pi * outDiameter / coverSize)]
+    if innerDiameter is not None:
+        exactArea += np.pi * ((innerDiameter / 2.0 + coverThick) ** 2 - (innerDiameter / 2.0) ** 2)
+        nCoverList.append(int(np.pi * innerDiameter / coverSize))
+    assert len(coverFiber) == sum(nCoverList)
+    assert np.isclose(coverFiber.area.sum(), exactArea, rtol=1.0e-14, atol=0.0)
+    #the same fibers as the previous per-sector loop: equal areas at the mid angle of each sector, the centroid at
+    #the exact sector centroid radius instead of the mean radius
+    outFibers = coverFiber[:nCoverList[0]]
+    assert np.allclose(outFibers.area, np.pi * (R ** 2 - r ** 2) / nCoverList[0], rtol=1.0e-13)
+    angle = 2.0 * np.pi / nCoverList[0]
+    assert np.allclose(np.arctan2(outFibers.z, outFibers.y) % (2.0 * np.pi), (np.arange(nCoverList[0]) + 0.5) * angle)
+    halfAngle = angle / 2.0
+    centroidRadius = 2.0 / 3.0 * (R ** 3 - r ** 3) / (R ** 2 - r ** 2) * np.sin(halfAngle) / halfAngle
+    assert np.allclose(np.hypot(outFibers.y, outFibers.z), centroidRadius, rtol=1.0e-14)
+######################################################################################
+@pytest.mark.parametrize("outSideNode,inSideNode", EXAMPLE_SECTIONS)
+def test_polygonCoverMatchesLoop(outSideNode, inSideNode):
+    coverThick, coverSize = 0.06, 0.3
+    inSideEle = None if inSideNode is None else [OCTAGON_ELE] * len(inSideNode)
+    sectInstance = PolygonSection(outSideNode, OCTAGON_ELE, inSideNode, inSideEle)
+    outLineList = sectInstance.coverLinePlot(coverThick)[0]
+    inLineList = [] if inSideNode is None else sectInstance.innerLinePlot(coverThick)[0]
+    coverFiber = sectInstance.coverMesh(coverSize, coverThick)[0]
+    ringList = [(outSideNode, sectInstance.outNewNodeDict)]
+    if inSideNode is not None:
+        ringList += list(zip(inSideNode, sectInstance.inNewNodeDict))
+    loopInfo = np.concatenate([loopCoverFibers(eachNode, eachNewNode, OCTAGON_ELE, coverSize, coverThick)
+                               for eachNode, eachNewNode in ringList])
+    #the same fibers with the same areas (the quadrilaterals are trapezoids of height coverThick)
+    assert len(coverFiber) == len(loopInfo)
+    assert np.allclose(coverFiber.area, loopInfo[:, 2], rtol=1.0e-12, atol=0.0)
+    #the area and the first moments are those of the cover region
+    exact = ringMoments(list(outSideNode.values())) - ringMoments(outLineList)
+    for eachNode, eachLine in zip(inSideNode or [], inLineList):
+        exact += ringMoments(eachLine) - ringMoments(list(eachNode.values()))
+    moments = np.array([coverFiber.area.sum(), (coverFiber.area * coverFiber.y).sum(),
+                        (coverFiber.area * coverFiber.z).sum()])
+    assert np.allclose(moments, exact, rtol=1.0e-12, atol=1.0e-12 * exact[0])
+    #the node average of a trapezoid and its centroid lie on its median, at most 1/6 of the median length apart
+    loopMoments = np.array([loopInfo[:, 2].sum(), (loopInfo[:, 2] * loopInfo[:, 0]).sum(),
+                            (loopInfo[:, 2] * loopInfo[:, 1]).sum()])
+    shift = np.hypot(coverFiber.y - loopInfo[:, 0], coverFiber.z - loopInfo[:, 1])
+    assert np.all(shift <= loopInfo[:, 3] / 6.0 * (1.0 + 1.0e-9))
+    assert np.all(np.abs(moments - loopMoments) <= np.sum(loopInfo[:, 2] * loopInfo[:, 3]) / 6.0)
+######################################################################################
+def test_coverQuadFibersSingleEdge():
+    #an edge shorter than eleSize is one fiber, a rectangle strip has its centroid at the node average
+    xc, yc, area, edgeIndex, outNode, inNode = coverQuadFibers([(0.0, 0.0), (0.0, 0.0)], [(1.0, 0.0), (0.05, 0.0)],
+                                                               [(0.0, 0.1), (0.0, 0.1)], [(1.0, 0.1), (0.05, 0.1)],
+                                                               0.25)
+    assert edgeIndex.tolist() == [0, 0, 0, 0, 1]
+    assert np.allclose(area, [0.025] * 4 + [0.005]) and np.allclose(yc, 0.05)
+    assert np.allclose(xc, [0.125, 0.375, 0.625, 0.875, 0.025])
+    assert np.allclose(outNode[:, 0], [0.0, 0.25, 0.5, 0.75, 0.0]) and np.allclose(inNode[:, 1], 0.1)
+######################################################################################
+def test_annularSectorFibers():
+    #a full disk split in sectors, and a half annulus
+    xc, yc, area = annularSectorFibers(np.zeros(4), np.ones(4), np.arange(4) * np.pi / 2.0,
+                                       (np.arange(4) + 1) * np.pi / 2.0)
+    assert np.isclose(area.sum(), np.pi, rtol=1.0e-15)
+    assert np.allclose(np.hypot(xc, yc), 4.0 * np.sqrt(2.0) / (3.0 * np.pi))
+    xc, yc, area = annularSectorFibers([0.5], [1.0], [0.0], [np.pi])
+    assert np.isclose(area[0], 0.375 * np.pi) and np.isclose(xc[0], 0.0, atol=1.0e-15)
+    assert np.isclose(yc[0], 4.0 * (1.0 - 0.125) / (3.0 * np.pi * 0.75))
+######################################################################################
+def test_barLineSpacing():
+    xb, yb, area = barLineFibers([(0.0, 0.0)], [(1.0, 0.0)], 0.02, 0.25)
+    assert np.allclose(xb, [0.0, 0.25, 0.5, 0.75]) and np.allclose(yb, 0.0)
+    assert np.allclose(area, np.pi * 0.02 ** 2 / 4.0)
+######################################################################################
+def test_barsCloserThanTolAreMerged():
+    #the two start bars fall on both sides of a tol grid rounding boundary
+    starts = [(0.5e-6 - 1.0e-8, 0.0), (0.5e-6 + 1.0e-8, 0.0), (0.0, 1.0)]
+    ends = [(0.5e-6 - 1.0e-8, 1.0), (1.0, 1.0), (0.0, 0.0)]
+    xb, yb, area = barLineFibers(starts, ends, [0.02, 0.03, 0.02], 2.0, tol=1.0e-6)
+    assert len(xb) == 2
+    #the first bar wins
+    assert np.isclose(xb[0], 0.5e-6 - 1.0e-8) and np.isclose(area[0], np.pi * 0.02 ** 2 / 4.0)
+    assert len(barLineFibers(starts, ends, 0.02, 2.0)[0]) == 3
+######################################################################################
+def test_mergeChainKeepsBarsFartherThanTol():
+    #b is within tol of a and c, c is not within tol of a, so only b is merged
+    starts = [(0.0, 0.0), (0.6, 0.0), (1.2, 0.0)]
+    xb, yb, area = barLineFibers(starts, starts, 0.02, 1.0, tol=1.0)
+    assert np.allclose(xb, [0.0, 1.2])
+######################################################################################
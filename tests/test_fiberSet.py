@@ -0,0 +1,66 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from fiberSet import FiberSet, CORE, COVER, BAR
+######################################################################################
+def threeRegions():
+    core = FiberSet([0.0, 0.1, 0.2], [0.0, 0.1, 0.2], [0.01, 0.02, 0.03], CORE)
+    cover = FiberSet([0.5, 0.6], [0.5, 0.6], 0.04, COVER)
+    bar = FiberSet([0.3], [-0.3], [0.001], BAR)
+    return core, cover, bar
+######################################################################################
+def test_concatenate():
+    core, cover, bar = threeRegions()
+    fibers = FiberSet.concatenate([core, cover, bar])
+    assert len(fibers) == 6
+    assert fibers.tag.tolist() == [CORE] * 3 + [COVER] * 2 + [BAR]
+    assert np.allclose(fibers.toArray(), np.concatenate((core.toArray(), cover.toArray(), bar.toArray())))
+    #the columns are new arrays, not views of the inputs
+    fibers.area[0] = 1.0
+    assert core.area[0] == 0.01
+    assert len(FiberSet.concatenate([])) == 0
+    assert len(FiberSet.concatenate([core, FiberSet(), bar])) == 4
+######################################################################################
+def test_regionIsViewWhenContiguous():
+    fibers = FiberSet.concatenate(threeRegions())
+    cover = fibers.region(COVER)
+    assert cover.y.tolist() == [0.5, 0.6] and cover.tag.tolist() == [COVER, COVER]
+    assert np.shares_memory(cover.area, fibers.area)
+    cover.area[:] = 0.05
+    assert fibers.area[3:5].tolist() == [0.05, 0.05]
+######################################################################################
+def test_regionIsCopyWhenSplit():
+    core, cover, bar = threeRegions()
+    fibers = FiberSet.concatenate([core[:1], cover, core[1:], bar])
+    coreRegion = fibers.region(CORE)
+    assert np.allclose(coreRegion.toArray(), core.toArray())
+    assert not np.shares_memory(coreRegion.area, fibers.area)
+######################################################################################
+def test_missingRegion():
+    core, cover, bar = threeRegions()
+    empty = FiberSet.concatenate([core, bar]).region(COVER)
+    assert len(empty) == 0 and empty.toArray().shape == (0, 3)
+######################################################################################
+def test_legacyListBehaviour():
+    core, cover, bar = threeRegions()
+    assert core[1] == (0.1, 0.1, 0.02)
+    assert list(core) == core.toList() == [(0.0, 0.0, 0.01), (0.1, 0.1, 0.02), (0.2, 0.2, 0.03)]
+    assert np.asarray(cover).shape == (2, 3)
+    joined = core + cover
+    assert isinstance(joined, FiberSet) and joined.tag.tolist() == [CORE] * 3 + [COVER] * 2
+    assert core + [(9.0, 9.0, 9.0)] == core.toList() + [(9.0, 9.0, 9.0)]
+    assert [(9.0, 9.0, 9.0)] + bar == [(9.0, 9.0, 9.0), (0.3, -0.3, 0.001)]
+    rebuilt = FiberSet.fromTuples(core.toList(), COVER)
+    assert np.allclose(rebuilt.toArray(), core.toArray()) and np.all(rebuilt.tag == COVER)
+    assert repr(FiberSet.concatenate([core, bar])) == "FiberSet(n=4, core=3, bar=1)"
+######################################################################################
+def test_lengthMismatch():
+    with pytest.raises(ValueError):
+        FiberSet([0.0, 1.0], [0.0], [0.1, 0.1])
+######################################################################################
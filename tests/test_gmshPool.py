@@ -0,0 +1,91 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import os
+import time
+import pickle
+import importlib.util
+import numpy as np
+import pytest
+import gmshPool
+from gmshPool import GmshPool
+######################################################################################
+def fakeMesh(gmsh, geoCode, workDir):
+    """
+    geoCode "crash" kills the worker, "sleep x" sleeps x seconds, "fail" raises, otherwise a two-triangle mesh
+    """
+    if geoCode == "crash":
+        os._exit(3)
+    if geoCode.startswith("sleep"):
+        time.sleep(float(geoCode.split()[1]))
+    if geoCode == "fail":
+        raise ValueError("bad geometry")
+    points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]]) * len(geoCode)
+    return points, np.array([[0, 1, 2], [0, 2, 3]])
+######################################################################################
+@pytest.fixture
+def fakePool(monkeypatch):
+    #the forked workers inherit the patched functions
+    monkeypatch.setattr(gmshPool, "_startGmsh", lambda: type("FakeGmsh", (), {"finalize": staticmethod(lambda: None)}))
+    monkeypatch.setattr(gmshPool, "_meshGeoCode", fakeMesh)
+    pools = []
+    def makePool(**options):
+        pools.append(GmshPool(startMethod="fork", **options))
+        return pools[-1]
+    yield makePool
+    for eachPool in pools:
+        eachPool.close()
+######################################################################################
+def test_meshManyRunsTheJobsAtTheSameTime(fakePool):
+    pool = fakePool(nWorker=4)
+    startTime = time.perf_counter()
+    results, errors = pool.meshMany(["sleep 0.3"] * 4 + ["fail", "ab"])
+    assert time.perf_counter() - startTime < 1.0
+    assert list(errors) == [4] and "bad geometry" in errors[4]
+    assert results[4] is None and np.allclose(results[5][0][2], [2.0, 2.0, 0.0])
+######################################################################################
+def test_crashedWorkerIsDetectedAndTheJobRetried(fakePool):
+    pool = fakePool(nWorker=2, maxRetry=1)
+    #a long job keeps the other worker busy, the crash must not wait for it
+    slowJob = pool.submit("sleep 2")
+    startTime = time.perf_counter()
+    results, errors = pool.meshMany(["crash", "abc"])
+    assert time.perf_counter() - startTime < 1.0
+    assert "exited with code 3 after 2 attempts" in errors[0]
+    assert results[1] is not None and pool.restartCount == 2
+    assert not slowJob.done()
+######################################################################################
+def test_timedOutWorkerIsRestarted(fakePool):
+    pool = fakePool(nWorker=1, maxRetry=0, jobTimeout=0.2)
+    with pytest.raises(RuntimeError, match="timed out"):
+        pool.mesh("sleep 5")
+    assert len(pool.mesh("a")[1]) == 2
+######################################################################################
+def test_poolCannotBePickled(fakePool):
+    pool = fakePool(nWorker=1)
+    with pytest.raises(TypeError, match="cannot be pickled"):
+        pickle.dumps(pool)
+######################################################################################
+@pytest.mark.skipif(importlib.util.find_spec("gmsh") is None, reason="needs the gmsh Python API")
+def test_gmshPoolMatchesPygmsh():
+    try:
+        import gmsh
+    except OSError as error:
+        pytest.skip("gmsh cannot be loaded: %s" % error)
+    from sectionFiberMain import sectionBatch, circleSection
+    specs = [{"section": "circle", "sectionName": "pier%d" % i1, "outD": outD, "coverThick": 0.05,
+              "outbarD": 0.03, "outbarDist": 0.15, "coreSize": 0.1, "coverSize": 0.1} for i1, outD in
+             enumerate([1.0, 1.5, 2.0])]
+    with GmshPool(nWorker=2) as pool:
+        results, errors = sectionBatch(specs, meshBackend=pool)
+    assert errors == {}
+    for (coreFiber, coverFiber, barFiber), eachSpec in zip(results, specs):
+        kwargs = dict(eachSpec)
+        del kwargs["section"]
+        pygmshFiber = circleSection(**kwargs)[0]
+        assert len(coreFiber) == len(pygmshFiber)
+        assert np.isclose(coreFiber.area.sum(), pygmshFiber.area.sum(), rtol=1.0e-9)
+######################################################################################
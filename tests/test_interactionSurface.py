@@ -0,0 +1,99 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+import interactionSurface
+from fiberSet import FiberSet, CORE, BAR
+from meshCache import MeshCache
+from strainPlane import fiberStrain
+from uniaxialMaterial import KentParkConcrete, BilinearSteel
+from interactionSurface import InteractionSurface, ultimatePlanes, surfacePoints
+######################################################################################
+#the concrete reaches fpc at the ultimate strain -0.003, so the pure compression force is fpc*A
+MATERIALS = {CORE: KentParkConcrete(-30.0e3, -0.003, -20.0e3, -0.01), BAR: BilinearSteel(400.0e3, 2.0e8, 0.01)}
+######################################################################################
+def rectangleFibers(width=0.4, height=0.8, nY=8, nZ=16):
+    """
+    width*height concrete rectangle centered at the origin with four corner bars
+    """
+    y, z = np.meshgrid((np.arange(nY) + 0.5) * width / nY - width / 2.0,
+                       (np.arange(nZ) + 0.5) * height / nZ - height / 2.0)
+    core = FiberSet(y.ravel(), z.ravel(), width * height / (nY * nZ), CORE)
+    bar = FiberSet([-0.15, 0.15, -0.15, 0.15], [-0.35, -0.35, 0.35, 0.35], 0.0005, BAR)
+    return FiberSet.concatenate([core, bar])
+######################################################################################
+@pytest.mark.parametrize("angle,compressed,curvatureColumn,curvatureSign", [(0.0, "y", 2, 1.0),
+                                                                             (np.pi / 2.0, "z", 1, -1.0)])
+def test_ultimatePlanes(angle, compressed, curvatureColumn, curvatureSign):
+    fibers = rectangleFibers()
+    nDepth = 10
+    planes = ultimatePlanes(fibers, [angle], nDepth, -0.003, 0.05)
+    assert planes.shape == (2 * nDepth, 3)
+    #theta=0 compresses +y: kappaY=0, kappaZ>=0 (eps=eps0-kappaZ*y)
+    #theta=pi/2 compresses +z: kappaZ=0, kappaY<=0 (eps=eps0+kappaY*z)
+    assert np.allclose(planes[:, 3 - curvatureColumn], 0.0)
+    assert np.all(curvatureSign * planes[:, curvatureColumn] >= 0.0)
+    assert np.any(curvatureSign * planes[:, curvatureColumn] > 0.0)
+    strain = fiberStrain(fibers, planes)
+    s = fibers.y if compressed == "y" else fibers.z
+    top, bottom = strain[:, np.argmax(s)], strain[:, np.argmin(s)]
+    #pivot on the extreme compression fiber, then on the extreme tension fiber
+    assert np.allclose(top[:nDepth], -0.003) and np.allclose(bottom[nDepth:], 0.05)
+    assert np.all(np.diff(bottom[:nDepth]) > 0.0) and np.all(np.diff(top[nDepth:]) > 0.0)
+    #pure compression first, pure tension last
+    assert np.allclose(strain[0], -0.003) and np.allclose(strain[-1], 0.05)
+######################################################################################
+def test_pureCompression():
+    fibers = rectangleFibers()
+    points = surfacePoints(fibers, MATERIALS, [0.0, 1.0], nDepth=10)
+    #uniform strain -0.003: concrete at fpc, steel yielded with 0.01 hardening
+    steelStress = 400.0e3 + 0.01 * 2.0e8 * (0.003 - 400.0e3 / 2.0e8)
+    expected = -30.0e3 * 0.4 * 0.8 - steelStress * 4 * 0.0005
+    assert np.isclose(points[0, 0], expected) and np.isclose(points[20, 0], expected)
+    assert np.allclose(points[0, 1:], 0.0, atol=1.0e-9 * abs(expected))
+    assert np.isclose(points[:, 0].min(), expected)
+    #moments about a shifted center: My-N*zc, Mz+N*yc
+    shifted = surfacePoints(fibers, MATERIALS, [0.0, 1.0], nDepth=10, center=(0.1, -0.2))
+    assert np.allclose(shifted[0, 1:], [expected * 0.2, expected * 0.1])
+######################################################################################
+def test_demandCapacityRatio():
+    surface = InteractionSurface.generate(rectangleFibers(), MATERIALS, nAngle=24, nDepth=20)
+    #a vertex of the hull is on the surface
+    surface.demandCapacityRatio([[0.0, 0.0, 0.0]])
+    vertex = surface.points[surface._hull.vertices[:3]]
+    ratio = surface.demandCapacityRatio(np.concatenate(([[0.0, 0.0, 0.0]], vertex, 1.5 * vertex, 0.5 * vertex)))
+    assert ratio[0] == 0.0
+    assert np.allclose(ratio[1:4], 1.0)
+    assert np.allclose(ratio[4:7], 1.5) and np.allclose(ratio[7:], 0.5)
+    assert surface.contains(vertex * 0.9).all() and not surface.contains(vertex * 1.1).any()
+######################################################################################
+def test_parallelMatchesSerial():
+    fibers = rectangleFibers()
+    serial = InteractionSurface.generate(fibers, MATERIALS, nAngle=12, nDepth=10)
+    parallel = InteractionSurface.generate(fibers, MATERIALS, nAngle=12, nDepth=10, maxWorkers=2)
+    assert np.allclose(parallel.points, serial.points, rtol=1.0e-12, atol=0.0)
+######################################################################################
+def test_cacheReuse(monkeypatch):
+    fibers = rectangleFibers()
+    cache = MeshCache()
+    first = InteractionSurface.generate(fibers, MATERIALS, nAngle=12, nDepth=10, cache=cache)
+    #the same section, materials and options are read from the cache without a sweep
+    def noSweep(*args, **kwargs):
+        raise AssertionError("the cached surface was not reused")
+    monkeypatch.setattr(interactionSurface, "surfacePoints", noSweep)
+    second = InteractionSurface.generate(fibers, MATERIALS, nAngle=12, nDepth=10, cache=cache)
+    assert np.array_equal(second.points, first.points) and cache.hits == 1
+    #other options, material parameters or fibers are other keys
+    key = interactionSurface.surfaceKey
+    options = {"nDepth": 10, "nAngle": 12}
+    assert key(fibers, MATERIALS, options) == key(rectangleFibers(), dict(MATERIALS), dict(options))
+    assert key(fibers, MATERIALS, options) != key(fibers, MATERIALS, dict(options, nDepth=11))
+    otherMaterials = {CORE: MATERIALS[CORE], BAR: BilinearSteel(500.0e3, 2.0e8, 0.01)}
+    assert key(fibers, MATERIALS, options) != key(fibers, otherMaterials, options)
+    assert key(fibers, MATERIALS, options) != key(rectangleFibers(nY=9), MATERIALS, options)
+######################################################################################
@@ -0,0 +1,38 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import os
+import subprocess
+import sys
+import pytest
+######################################################################################
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("matplotlib", "pygmsh", "gmsh", "scipy", "concurrent.futures.process")
+######################################################################################
+def loadedModules(code):
+    """
+    heavy modules in sys.modules after running the code in a new interpreter
+    """
+    script = "import sys\n%s\nprint(' '.join(each for each in %r if each in sys.modules))" % (code, HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", script], cwd=PACKAGE_ROOT, capture_output=True, text=True,
+                            check=True).stdout
+    return output.split()
+######################################################################################
+@pytest.mark.parametrize("code", ["import sectionFiberMain",
+                                  "import fiberGenerate",
+                                  "from sectionFiberMain import circleSection\n"
+                                  "circleSection('pier', 2.0, 0.06, 0.03, 0.15, 0.1, 0.1, coreMesher='analytic')"])
+def test_importIsLight(code):
+    #matplotlib, pygmsh, scipy and the process pool are imported when a plot, a gmsh mesh, a bar merge or a batch
+    #needs them
+    assert loadedModules(code) == []
+######################################################################################
+def test_barMergeImportsScipy():
+    #the check sees a heavy module once it is needed
+    assert loadedModules("from fiberKernel import barLineFibers\n"
+                         "barLineFibers([(0.0, 0.0)], [(1.0, 0.0)], 0.02, 0.25, tol=1.0e-6)") == ["scipy"]
+######################################################################################
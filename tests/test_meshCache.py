@@ -0,0 +1,126 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import numpy as np
+from meshCache import MeshCache
+from fiberGenerate import CircleSection, PolygonSection
+######################################################################################
+RING = [(0.0, 0.0), (2.0, 0.0), (2.0, 1.0), (0.0, 1.0)]
+POINTS = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 1.0, 0.0], [0.0, 1.0, 0.0]])
+TRIANGLES = np.array([[0, 1, 2], [0, 2, 3]])
+######################################################################################
+def squareMesh(ring):
+    points, triangles = POINTS.copy(), TRIANGLES.copy()
+    return points, triangles if ring[1][1] == 0.0 else triangles[:, ::-1]
+######################################################################################
+def test_putKeepsTheCallerArraysWritable():
+    cache = MeshCache()
+    points, triangles = squareMesh(RING)
+    cache.put("key", points=points, triangles=triangles)
+    points[0, 0] = -1.0
+    assert cache.get("key")["points"][0, 0] == 0.0
+    assert not cache.get("key")["points"].flags.writeable
+######################################################################################
+def test_fetchReturnsWritableArrays():
+    cache = MeshCache()
+    for i1 in range(2):
+        points, triangles = cache.fetch("key", squareMesh, RING)
+        assert points.flags.writeable and triangles.flags.writeable
+        points[:, :2] *= 2.0
+    assert cache.hits == 1
+    assert np.array_equal(cache.get("key")["points"], POINTS)
+######################################################################################
+def test_ringOrientationSharesTheKey():
+    clockwise = RING[::-1]
+    assert MeshCache.meshKey("polygon", [RING], 0.1) == MeshCache.meshKey("polygon", [clockwise], 0.1)
+    assert MeshCache.meshKey("polygon", [RING], 0.1) != MeshCache.meshKey("polygon", [RING[:3]], 0.1)
+######################################################################################
+def test_hitFollowsTheRingWinding():
+    #the signed fiber areas follow the winding of the meshed ring, with or without the cache
+    cache = MeshCache()
+    key = MeshCache.meshKey("polygon", [RING], 0.1)
+    cache.fetch(key, squareMesh, RING, ring=RING)
+    clockwise = RING[::-1]
+    points, triangles = cache.fetch(key, squareMesh, clockwise, ring=clockwise)
+    assert cache.hits == 1
+    assert np.array_equal(triangles, squareMesh(clockwise)[1])
+######################################################################################
+def fanMesh(ring, eleSize):
+    """
+    fake core mesher: triangles from the vertex centroid of a convex ring to its edges divided by eleSize
+    """
+    ring = np.asarray(ring, dtype=np.float64)[:, :2]
+    edgePoints = []
+    for start, end in zip(ring, np.roll(ring, -1, axis=0)):
+        nDivide = int(np.ceil(np.hypot(*(end - start)) / eleSize))
+        edgePoints.append(start + np.linspace(0.0, 1.0, nDivide, endpoint=False)[:, None] * (end - start))
+    edgePoints = np.concatenate(edgePoints)
+    points = np.column_stack((np.vstack((ring.mean(axis=0), edgePoints)), np.zeros(len(edgePoints) + 1)))
+    nEdge = len(edgePoints)
+    triangles = np.column_stack((np.zeros(nEdge, dtype=int), np.arange(1, nEdge + 1),
+                                 np.roll(np.arange(1, nEdge + 1), -1)))
+    return points, triangles
+######################################################################################
+def countingMesher(callList):
+    def meshFunction(*args):
+        callList.append(args)
+        if np.ndim(args[0]) == 0:
+            #circle core (outRadius, innerRadius, eleSize, ...): a regular polygon of eleSize sides
+            nSide = int(np.ceil(2.0 * np.pi * args[0] / args[2]))
+            angle = np.linspace(0.0, 2.0 * np.pi, nSide, endpoint=False)
+            return fanMesh(args[0] * np.column_stack((np.cos(angle), np.sin(angle))), args[2])
+        return fanMesh(args[0], args[2])
+    return meshFunction
+######################################################################################
+def test_similarPolygonsShareOneMesh():
+    ring = np.array([(0.0, 0.0), (3.0, -0.5), (4.0, 1.0), (2.5, 3.0), (0.5, 2.0)])
+    ringArea = 0.5 * np.sum(ring[:, 0] * np.roll(ring[:, 1], -1) - np.roll(ring[:, 0], -1) * ring[:, 1])
+    cache = MeshCache(similarity=True)
+    callList = []
+    fiberList = []
+    angle = np.radians(35.0)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    #the same section, translated, rotated and scaled by 2.5 (with a 2.5 times larger eleSize)
+    for scale, eachRing in [(1.0, ring), (1.0, ring + (10.0, -4.0)), (1.0, ring @ rotation.T),
+                            (2.5, 2.5 * ring @ rotation.T + (-3.0, 7.0))]:
+        nodeDict = {i1 + 1: tuple(each) for i1, each in enumerate(eachRing)}
+        eleDict = {i1 + 1: (i1 + 1, (i1 + 1) % len(eachRing) + 1) for i1 in range(len(eachRing))}
+        sectInstance = PolygonSection(nodeDict, eleDict)
+        sectInstance._gmshCoreMesh = countingMesher(callList)
+        fibers = sectInstance.coreMesh(0.4 * scale, eachRing.tolist(), None, cache)[0]
+        assert np.isclose(fibers.area.sum(), ringArea * scale ** 2, rtol=1.0e-12)
+        fiberList.append((scale, fibers))
+    assert len(callList) == 1 and cache.hits == 3
+    #the canonical mesh is taken back to each section: the same fibers with s^2 areas
+    for scale, fibers in fiberList:
+        assert np.allclose(np.sort(fibers.area), scale ** 2 * np.sort(fiberList[0][1].area), rtol=1.0e-12)
+    assert np.allclose(fiberList[1][1].y - 10.0, fiberList[0][1].y) and np.allclose(fiberList[1][1].z + 4.0,
+                                                                                  fiberList[0][1].z)
+    #another size/eleSize ratio is another mesh
+    sectInstance._gmshCoreMesh = countingMesher(callList)
+    sectInstance.coreMesh(0.2, ring.tolist(), None, cache)
+    assert len(callList) == 2
+######################################################################################
+def test_similarCirclesShareOneMesh():
+    cache = MeshCache(similarity=True)
+    callList = []
+    fiberList = []
+    for scale in [1.0, 1.5, 2.5]:
+        circleInstance = CircleSection(0.05 * scale, 2.0 * scale)
+        circleInstance._gmshCoreMesh = countingMesher(callList)
+        fiberList.append((scale, circleInstance.coreMesh(0.1 * scale, cache)[0]))
+    assert len(callList) == 1 and cache.hits == 2
+    #the unit disk is meshed once, the fake mesh of the core circle (radius 0.95*scale) is a regular polygon
+    nSide = int(np.ceil(2.0 * np.pi / (0.1 / 0.95)))
+    for scale, fibers in fiberList:
+        polygonArea = 0.5 * nSide * (0.95 * scale) ** 2 * np.sin(2.0 * np.pi / nSide)
+        assert np.isclose(fibers.area.sum(), polygonArea, rtol=1.0e-12)
+        assert np.allclose(fibers.area, scale ** 2 * fiberList[0][1].area, rtol=1.0e-12)
+        assert np.allclose(fibers.y, scale * fiberList[0][1].y) and np.allclose(fibers.z, scale * fiberList[0][1].z)
+    #another outD/eleSize ratio is another mesh
+    circleInstance.coreMesh(0.05, cache)
+    assert len(callList) == 2
+######################################################################################
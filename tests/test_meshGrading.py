@@ -0,0 +1,96 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import re
+import subprocess
+import numpy as np
+import pytest
+from meshGrading import MeshGrading, ringPrincipalAxes
+######################################################################################
+def gmshAvailable():
+    try:
+        return subprocess.run(["gmsh", "--version"], capture_output=True, timeout=60).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+######################################################################################
+needsGmsh = pytest.mark.skipif(not gmshAvailable(), reason="needs a working gmsh")
+######################################################################################
+def test_principalAxesOfRotatedRectangle():
+    angle = np.radians(30.0)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    ring = np.array([(-2.0, -0.5), (2.0, -0.5), (2.0, 0.5), (-2.0, 0.5)]) @ rotation.T + (3.0, 1.0)
+    center, axisAngle, extremes = ringPrincipalAxes([ring])
+    assert np.allclose(center, (3.0, 1.0))
+    #u is one of the principal axes, the extreme distances are measured from the other one
+    assert np.isclose(np.sin(2.0 * (axisAngle - angle)), 0.0, atol=1.0e-12)
+    alongLongSide = np.isclose(np.cos(axisAngle - angle) ** 2, 1.0)
+    assert np.allclose(extremes, (2.0, 0.5) if alongLongSide else (0.5, 2.0))
+######################################################################################
+def test_invalidGrading():
+    with pytest.raises(ValueError):
+        MeshGrading(0.1, 0.05)
+    with pytest.raises(ValueError):
+        MeshGrading(0.05, 0.1, growthRate=1.0)
+    with pytest.raises(ValueError):
+        MeshGrading(0.05, 0.1, reference="centroid")
+class RecordingGeometry():
+    """
+    stands for the pygmsh geometry, keeps the raw .geo code lines
+    """
+    def __init__(self):
+        self.code = []
+    def add_raw_code(self, line):
+        self.code.append(line)
+######################################################################################
+@pytest.mark.parametrize("reference", ["boundary", "axes"])
+def test_fieldCode(reference):
+    #rings with np.float64 centroid and extreme values, written as plain .geo numbers
+    angle = np.radians(30.0)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    ring = np.array([(-2.0, -0.5), (2.0, -0.5), (2.0, 0.5), (-2.0, 0.5)]) @ rotation.T + (3.0, 1.0)
+    grading = MeshGrading(np.float64(0.02), np.float64(0.2), growthRate=1.3, reference=reference)
+    geom = RecordingGeometry()
+    grading.addFields(geom, 7, [ring])
+    code = "\n".join(geom.code)
+    assert "np." not in code and "float64" not in code
+    assert all(re.fullmatch(r"[^\n]*;", each) for each in geom.code)
+    assert re.search(r"LcMin = 0\.02(0*\d?)?;", code) and "Background Field" in code
+    fieldList = re.findall(r'\.F = "(.*)";', code)
+    if reference == "boundary":
+        assert fieldList == [] and "Surface{7}" in code
+        return
+    #the MathEval fields are the distances of a point from the extreme fiber lines of each principal axis
+    assert len(fieldList) == 2
+    center, axisAngle, extremes = ringPrincipalAxes([ring])
+    for x, y in [(3.0, 1.0), (4.0, 1.2), (2.1, 0.3)]:
+        u = (x - center[0]) * np.cos(axisAngle) + (y - center[1]) * np.sin(axisAngle)
+        v = -(x - center[0]) * np.sin(axisAngle) + (y - center[1]) * np.cos(axisAngle)
+        values = [eval(each, {"fabs": abs, "x": x, "y": y}) for each in fieldList]
+        assert np.allclose(values, [extremes[0] - abs(u), extremes[1] - abs(v)])
+######################################################################################
+@needsGmsh
+@pytest.mark.parametrize("reference", ["boundary", "axes"])
+def test_fiberSizeGrowsAwayFromTheBars(reference):
+    from sectionFiberMain import polygonSection
+    outSideNode = {1: (0.0, 0.0), 2: (3.0, 0.0), 3: (3.0, 1.5), 4: (0.0, 1.5)}
+    outSideEle = {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)}
+    grading = MeshGrading(0.02, 0.2, growthRate=1.3, reference=reference)
+    coreFiber, coverFiber, barFiber = polygonSection("graded", outSideNode, outSideEle, 0.05, 0.2, 0.1, 0.025, 0.15,
+                                                     coreGrading=grading)
+    uniformFiber = polygonSection("uniform", outSideNode, outSideEle, 0.05, 0.02, 0.1, 0.025, 0.15)[0]
+    assert np.isclose(coreFiber.area.sum(), uniformFiber.area.sum())
+    assert len(coreFiber) < len(uniformFiber) / 3
+    #distance of each core fiber from the nearest bar and its size (side of the equal-area right triangle)
+    offset = np.column_stack((coreFiber.y, coreFiber.z))[:, None, :] - \
+             np.column_stack((barFiber.y, barFiber.z))[None, :, :]
+    distance = np.hypot(offset[:, :, 0], offset[:, :, 1]).min(axis=1)
+    size = np.sqrt(2.0 * coreFiber.area)
+    bins = np.digitize(distance, [0.05, 0.15, 0.3])
+    binSize = [size[bins == each].mean() for each in range(4)]
+    assert binSize[0] < 1.5 * grading.minSize
+    assert all(np.diff(binSize) > 0.0)
+    assert binSize[-1] > 4.0 * binSize[0]
+######################################################################################
@@ -0,0 +1,72 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import os
+import threading
+import numpy as np
+import pytest
+from fiberSet import FiberSet, CORE, BAR
+from uniaxialMaterial import KentParkConcrete, BilinearSteel
+from momentCurvature import axialCapacity, solveAxialStrain, momentCurvature, momentCurvatureBatch
+######################################################################################
+def rectangleFibers(width=0.4, height=0.6, n=20, cover=0.05, barArea=5.0e-4):
+    y, z = np.meshgrid((np.arange(n) + 0.5) / n * width - width / 2, (np.arange(n) + 0.5) / n * height - height / 2)
+    core = FiberSet(y.ravel(), z.ravel(), width * height / n ** 2, CORE)
+    barY = np.array([-1.0, 1.0, -1.0, 1.0]) * (width / 2 - cover)
+    barZ = np.array([-1.0, -1.0, 1.0, 1.0]) * (height / 2 - cover)
+    return FiberSet.concatenate([core, FiberSet(barY, barZ, barArea, BAR)])
+######################################################################################
+MATERIALS = {CORE: KentParkConcrete(-30.0e3, -0.002, -6.0e3, -0.006), BAR: BilinearSteel(400.0e3, 2.0e8, 0.02)}
+######################################################################################
+def test_axialCapacity():
+    fibers = rectangleFibers()
+    assert np.isclose(axialCapacity(fibers, MATERIALS), 30.0e3 * 0.24 + 400.0e3 * 4 * 5.0e-4)
+######################################################################################
+@pytest.mark.parametrize("loadRatio,tol", [(-1.0, 1.0e-6), (-0.9, 1.0e-4), (0.1, 1.0e-6)])
+def test_axialEquilibriumAgainstCapacity(loadRatio, tol):
+    #high axial loads and curvatures widen the bracket to large strains where the hardening steel forces are huge,
+    #the equilibrium error is still bounded by the fixed section capacity
+    fibers = rectangleFibers()
+    materials = {CORE: MATERIALS[CORE], BAR: BilinearSteel(400.0e3, 2.0e8, 0.05)}
+    capacity = axialCapacity(fibers, materials)
+    axialLoad = loadRatio * capacity
+    curvature = np.logspace(-2.0, 2.0, 9)
+    eps0, forces, converged = solveAxialStrain(fibers, materials, axialLoad, curvature, np.zeros_like(curvature),
+                                               tol=tol)
+    assert converged.all()
+    assert np.all(np.abs(forces[:, 0] - axialLoad) <= tol * capacity)
+######################################################################################
+def test_momentSignConvention():
+    #angle=0 bends about y with tension at +z, the moment is positive for positive curvature
+    fibers = rectangleFibers()
+    result = momentCurvature(fibers, MATERIALS, -1000.0, angle=0.0, maxCurvature=0.02, nStep=10)
+    assert result["converged"].all()
+    assert abs(result["moment"][0]) < 1.0e-6
+    assert np.all(result["moment"][1:] > 0.0)
+    assert np.allclose(result["Mz"], 0.0, atol=1.0e-6 * np.abs(result["My"]).max())
+######################################################################################
+class WorkerExit(float):
+    """
+    Axial load that kills the worker process unpickling it, as a native crash would
+    """
+    def __reduce__(self):
+        return os._exit, (1,)
+######################################################################################
+def test_batchRecordsFailuresPerCase():
+    fibers = rectangleFibers(n=8)
+    cases = [(-1000.0, 0.0), (WorkerExit(-1000.0), 0.0), (-2000.0, 0.5), (threading.Lock(), 0.0), ("load", 0.0),
+             (-3000.0, 1.0, rectangleFibers(n=6))]
+    curvatures = np.linspace(0.0, 0.02, 5)
+    results, errors = momentCurvatureBatch(fibers, MATERIALS, cases, maxWorkers=2, curvatures=curvatures)
+    assert sorted(errors) == [1, 3, 4]
+    assert "terminated abruptly" in errors[1]
+    assert "pickle" in errors[3]
+    for index in (0, 2, 5):
+        axialLoad, angle = cases[index][:2]
+        expected = momentCurvature(cases[index][2] if index == 5 else fibers, MATERIALS, axialLoad, angle, curvatures)
+        assert np.allclose(results[index]["moment"], expected["moment"])
+    assert results[1] is None and results[3] is None and results[4] is None
+######################################################################################
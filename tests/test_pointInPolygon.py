@@ -0,0 +1,84 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import math
+import numpy as np
+import pytest
+from pointInPolygon import points_in_2d_polygon, is_in_2d_polygon
+######################################################################################
+#C-shaped ring of the module example, counter-clockwise with the closing vertex repeated
+C_RING = [[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [2, 2], [2, 3], [0, 3], [0, 0]]
+OUT_RING = [(0.0, 0.0), (4.0, 0.0), (4.0, 3.0), (0.0, 3.0)]
+HOLE_RING = [(1.0, 1.0), (3.0, 1.0), (3.0, 2.0), (1.0, 2.0)]
+######################################################################################
+def angleSumInPolygon(point, vertices):
+    """
+    winding angle test of the previous is_in_2d_polygon, for counter-clockwise rings
+    """
+    px, py = point
+    angleSum = 0.0
+    j = len(vertices) - 1
+    for i in range(len(vertices)):
+        sx, sy = vertices[i]
+        tx, ty = vertices[j]
+        angle = math.atan2(sy - py, sx - px) - math.atan2(ty - py, tx - px)
+        if angle >= math.pi:
+            angle -= 2.0 * math.pi
+        elif angle <= -math.pi:
+            angle += 2.0 * math.pi
+        angleSum += angle
+        j = i
+    return abs(angleSum - 2.0 * math.pi) < 1.0e-11
+######################################################################################
+def test_matchesAngleSum():
+    points = np.random.default_rng(0).uniform(-0.5, 3.5, (2000, 2))
+    expected = [angleSumInPolygon(each, C_RING) for each in points]
+    assert np.array_equal(points_in_2d_polygon(points, C_RING), expected)
+######################################################################################
+@pytest.mark.parametrize("point", [(1.0, 0.0), (2.0, 0.5), (1.5, 1.0), (0.0, 3.0), (1.0, 1.5), (0.0, 0.0)])
+def test_boundaryPointsAreInside(point):
+    #edge midpoints, a reflex vertex and the corners
+    assert is_in_2d_polygon(point, C_RING)
+######################################################################################
+def test_edgeTolerance():
+    points = [(2.0 + 5.0e-7, 0.5), (2.0 + 5.0e-5, 0.5), (1.5, 1.0 + 5.0e-7), (1.5, 1.0 + 5.0e-5)]
+    assert points_in_2d_polygon(points, C_RING).tolist() == [True, False, True, False]
+    assert points_in_2d_polygon(points, C_RING, tol=1.0e-4).tolist() == [True] * 4
+    #with tol=0 only the points exactly on an edge count as boundary points
+    points = [(1.5, 0.5), (2.0, 0.5), (2.0 + 1.0e-12, 0.5)]
+    assert points_in_2d_polygon(points, C_RING, tol=0.0).tolist() == [True, True, False]
+######################################################################################
+def test_horizontalEdgeRay():
+    #the crossing ray of these points runs along the horizontal edges of the notch
+    points = [(0.5, 1.0), (0.5, 2.0), (1.5, 1.0 - 1.0e-3), (1.5, 2.0 + 1.0e-3), (2.5, 1.0), (2.5, 2.0)]
+    assert points_in_2d_polygon(points, C_RING).tolist() == [True, True, True, True, False, False]
+######################################################################################
+def test_hole():
+    rings = [OUT_RING, HOLE_RING]
+    points = [(2.0, 1.5), (0.5, 1.5), (3.5, 2.5), (5.0, 1.5), (1.0, 1.5), (2.0, 2.0), (3.0, 1.0), (4.0, 1.5)]
+    #hole interior out, solid part in, the hole and outside boundaries in, outside out
+    expected = [False, True, True, False, True, True, True, True]
+    assert points_in_2d_polygon(points, rings).tolist() == expected
+    #the ring orientation does not change the even-odd result
+    assert points_in_2d_polygon(points, [OUT_RING[::-1], HOLE_RING]).tolist() == expected
+    assert points_in_2d_polygon(points, [OUT_RING, HOLE_RING[::-1]]).tolist() == expected
+######################################################################################
+def test_twoHoles():
+    secondHole = [(0.25, 0.25), (0.75, 0.25), (0.75, 0.75), (0.25, 0.75)]
+    points = [(0.5, 0.5), (2.0, 1.5), (0.5, 2.5)]
+    assert points_in_2d_polygon(points, [OUT_RING, HOLE_RING, secondHole]).tolist() == [False, False, True]
+######################################################################################
+def test_chunks():
+    points = np.random.default_rng(1).uniform(-0.5, 4.5, (1000, 2))
+    rings = [OUT_RING, HOLE_RING]
+    assert np.array_equal(points_in_2d_polygon(points, rings, chunkSize=7), points_in_2d_polygon(points, rings))
+    assert points_in_2d_polygon(np.empty((0, 2)), rings).shape == (0,)
+######################################################################################
+def test_shortRing():
+    with pytest.raises(ValueError):
+        points_in_2d_polygon([(0.0, 0.0)], [(0.0, 0.0), (1.0, 0.0)])
+######################################################################################
@@ -0,0 +1,34 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import subprocess
+import numpy as np
+import pytest
+from fiberGenerate import PolygonSection
+from fiberKernel import triEleInfo
+######################################################################################
+def gmshAvailable():
+    try:
+        return subprocess.run(["gmsh", "--version"], capture_output=True, timeout=60).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+######################################################################################
+needsGmsh = pytest.mark.skipif(not gmshAvailable(), reason="needs a working gmsh")
+######################################################################################
+@needsGmsh
+@pytest.mark.parametrize("nHole", [1, 4])
+def test_allHolesAreSubtracted(nHole):
+    #box girder with nHole cells in a row, the holes are subtracted in one boolean difference
+    outRing = [(0.0, 0.0), (nHole + 0.3 * (nHole + 1), 0.0), (nHole + 0.3 * (nHole + 1), 2.0), (0.0, 2.0)]
+    holeRings = [[(x0, 0.3), (x0 + 1.0, 0.3), (x0 + 1.0, 1.7), (x0, 1.7)]
+                 for x0 in 0.3 + 1.3 * np.arange(nHole)]
+    points, triangles = PolygonSection({}, {})._gmshCoreMesh(outRing, holeRings, 0.2)
+    xc, yc, area = triEleInfo(points, triangles)
+    assert np.isclose(np.abs(area).sum(), 2.0 * outRing[1][0] - 1.4 * nHole)
+    #no fiber inside a hole
+    for x0 in 0.3 + 1.3 * np.arange(nHole):
+        assert not np.any((xc > x0) & (xc < x0 + 1.0) & (yc > 0.3) & (yc < 1.7))
+######################################################################################
@@ -0,0 +1,79 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import math
+import numpy as np
+import pytest
+from pointInPolygon import is_in_2d_polygon
+from polygonOffset import offsetPolygon, signedArea
+######################################################################################
+#counter-clockwise rings: a hexagonal pier, an L shape (reflex vertex) and an irregular pentagon
+HEXAGON = [(3.5, 3.0), (1.5, 5.0), (-1.5, 5.0), (-3.5, 3.0), (-3.5, -3.0), (-1.5, -5.0), (1.5, -5.0), (3.5, -3.0)]
+L_SHAPE = [(0.0, 0.0), (4.0, 0.0), (4.0, 1.0), (1.0, 1.0), (1.0, 3.0), (0.0, 3.0)]
+PENTAGON = [(0.0, 0.0), (5.0, -1.0), (6.0, 2.5), (2.0, 4.5), (-1.0, 2.0)]
+######################################################################################
+def legacyOffset(vertices, coverThick, pos):
+    """
+    per-vertex offset of the previous PolygonSection._interNodeCoord: each offset line side is picked
+    with a point-in-polygon test of its foot point, then the two offset lines of the vertex are intersected
+    """
+    closedRing = list(vertices) + [vertices[0]]
+    nodeList = []
+    for i1 in range(len(vertices)):
+        (xi, yi), (xj, yj), (xk, yk) = vertices[i1 - 1], vertices[i1], vertices[(i1 + 1) % len(vertices)]
+        lineList = []
+        for (x1, y1), (x2, y2) in (((xi, yi), (xj, yj)), ((xj, yj), (xk, yk))):
+            a, b = y2 - y1, -(x2 - x1)
+            c = (x2 - x1) * y1 - (y2 - y1) * x1
+            shift = math.hypot(a, b) * coverThick
+            #foot point of the edge midpoint on the offset line c-shift
+            foot = np.linalg.solve([[a, b], [b, -a]], [-(c - shift), -(a * 0.5 * (y1 + y2) - b * 0.5 * (x1 + x2))])
+            inside = is_in_2d_polygon(foot, closedRing)
+            useMinus = inside if pos == "outLine" else not inside
+            lineList.append((a, b, c - shift if useMinus else c + shift))
+        (a1, b1, c1), (a2, b2, c2) = lineList
+        nodeList.append(np.linalg.solve([[a1, b1], [a2, b2]], [-c1, -c2]))
+    return np.array(nodeList)
+######################################################################################
+@pytest.mark.parametrize("ring", [HEXAGON, L_SHAPE, PENTAGON])
+@pytest.mark.parametrize("pos", ["outLine", "innerLine"])
+def test_matchesLegacy(ring, pos):
+    assert np.allclose(offsetPolygon(ring, 0.2, pos), legacyOffset(ring, 0.2, pos), atol=1.0e-12)
+######################################################################################
+@pytest.mark.parametrize("ring", [HEXAGON, L_SHAPE, PENTAGON])
+def test_clockwiseRing(ring):
+    #the same offset ring whatever the vertex order
+    assert np.allclose(offsetPolygon(ring[::-1], 0.2)[::-1], offsetPolygon(ring, 0.2))
+    assert np.allclose(offsetPolygon(ring[::-1], 0.2, "innerLine")[::-1], offsetPolygon(ring, 0.2, "innerLine"))
+######################################################################################
+@pytest.mark.parametrize("ring", [HEXAGON, L_SHAPE, PENTAGON])
+def test_edgeDistance(ring):
+    ring = np.asarray(ring, dtype=float)
+    newNodes = offsetPolygon(ring, 0.3)
+    edge = np.roll(ring, -1, axis=0) - ring
+    normal = np.column_stack((-edge[:, 1], edge[:, 0])) / np.hypot(edge[:, 0], edge[:, 1])[:, None]
+    #both ends of each offset edge are 0.3 inside the original edge
+    for nodes in (newNodes, np.roll(newNodes, -1, axis=0)):
+        assert np.allclose(np.einsum("ij,ij->i", nodes - ring, normal), 0.3)
+    assert abs(signedArea(newNodes)) < abs(signedArea(ring))
+    assert abs(signedArea(offsetPolygon(ring, 0.3, "innerLine"))) > abs(signedArea(ring))
+######################################################################################
+def test_rectangle():
+    newNodes = offsetPolygon([(0.0, 0.0), (4.0, 0.0), (4.0, 2.0), (0.0, 2.0)], 0.5)
+    assert np.allclose(newNodes, [(0.5, 0.5), (3.5, 0.5), (3.5, 1.5), (0.5, 1.5)])
+    assert np.isclose(signedArea(newNodes), 3.0)
+######################################################################################
+def test_collinearVertex():
+    #the middle vertex of the bottom edge joins two collinear edges
+    newNodes = offsetPolygon([(0.0, 0.0), (2.0, 0.0), (4.0, 0.0), (4.0, 2.0), (0.0, 2.0)], 0.5)
+    assert np.all(np.isfinite(newNodes))
+    assert np.allclose(newNodes[1], (2.0, 0.5))
+######################################################################################
+def test_badPosition():
+    with pytest.raises(ValueError):
+        offsetPolygon(L_SHAPE, 0.2, "middle")
+######################################################################################
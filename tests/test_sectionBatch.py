@@ -0,0 +1,46 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+import os
+import threading
+from sectionFiberMain import sectionBatch
+######################################################################################
+class WorkerExit():
+    """
+    Kills the worker process that unpickles it, as a gmsh segmentation fault would
+    """
+    def __reduce__(self):
+        return os._exit, (1,)
+######################################################################################
+def circleSpec(name, **changes):
+    spec = {"section": "circle", "sectionName": name, "outD": 1.0, "coverThick": 0.05, "outbarD": 0.03,
+            "outbarDist": 0.15, "coreSize": 0.1, "coverSize": 0.1, "coreMesher": "analytic"}
+    spec.update(changes)
+    return spec
+######################################################################################
+def test_failuresAreRecordedPerSection():
+    specs = [circleSpec("ok0"), circleSpec("crash", meshBackend=WorkerExit()), circleSpec("ok2"),
+             circleSpec("unpicklable", meshBackend=threading.Lock()), circleSpec("bad", section="square"),
+             circleSpec("ok5")]
+    results, errors = sectionBatch(specs, maxWorkers=2, chunkSize=1)
+    assert sorted(errors) == [1, 3, 4]
+    assert "terminated abruptly" in errors[1]
+    assert "pickle" in errors[3]
+    assert "section=circle" in errors[4]
+    for index in (0, 2, 5):
+        coreFiber, coverFiber, barFiber = results[index]
+        assert len(coreFiber) > 0 and len(coverFiber) > 0 and len(barFiber) > 0
+######################################################################################
+def test_showPlotDoesNotBlockTheWorker(tmp_path):
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        results, errors = sectionBatch([circleSpec("plotted", plot=True, plotFormats=("png",))], maxWorkers=1)
+    finally:
+        os.chdir(cwd)
+    assert errors == {}
+    assert (tmp_path / "plotted.png").exists()
+######################################################################################
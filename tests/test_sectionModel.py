@@ -0,0 +1,79 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from sectionModel import PolygonSectionModel
+from sectionFiberMain import polygonSection
+######################################################################################
+#box girder with one cell, the structured core mesher needs no gmsh
+BOX = {"outSideNode": {1: (0.0, 0.0), 2: (3.0, 0.0), 3: (3.0, 2.0), 4: (0.0, 2.0)},
+       "outSideEle": {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)},
+       "coverThick": 0.06, "coreSize": 0.1, "coverSize": 0.2, "outBarD": 0.032, "outBarDist": 0.2,
+       "inSideNode": [{1: (0.5, 0.5), 2: (2.5, 0.5), 3: (2.5, 1.5), 4: (0.5, 1.5)}],
+       "inSideEle": [{1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)}],
+       "inBarD": 0.025, "inBarDist": 0.2, "coreMesher": "structured"}
+######################################################################################
+def assertSameFibers(fibers, reference):
+    for eachFibers, eachReference in zip(fibers, reference):
+        assert np.array_equal(eachFibers.toArray(), eachReference.toArray())
+        assert np.array_equal(eachFibers.tag, eachReference.tag)
+######################################################################################
+def test_firstRunRunsAllStages():
+    model = PolygonSectionModel("box", **BOX)
+    assertSameFibers(model.fibers(), polygonSection("box", **BOX))
+    assert model.recomputed == ["geometry", "offsetLines", "coreMesh", "coverMesh", "barMesh"]
+    #nothing changed, nothing is run again
+    model.fibers()
+    model.update(coverSize=BOX["coverSize"])
+    model.fibers()
+    assert model.recomputed == []
+    assert set(model.stageRuns.values()) == {1}
+######################################################################################
+@pytest.mark.parametrize("changes,recomputed", [({"outBarDist": 0.15}, ["barMesh"]),
+                                                ({"coverSize": 0.1}, ["coverMesh"]),
+                                                ({"coverThick": 0.08}, ["offsetLines", "coreMesh", "coverMesh",
+                                                                        "barMesh"]),
+                                                ({"inBarD": 0.032, "inBarDist": 0.15}, ["barMesh"]),
+                                                ({"coreSize": 0.05}, ["coreMesh"])])
+def test_updateRunsChangedStages(changes, recomputed):
+    model = PolygonSectionModel("box", **BOX)
+    model.fibers()
+    model.update(**changes)
+    fibers = model.fibers()
+    assert model.recomputed == recomputed
+    assert model.stageRuns == {stageName: 1 + (stageName in recomputed) for stageName in model.stageRuns}
+    assertSameFibers(fibers, polygonSection("box", **dict(BOX, **changes)))
+######################################################################################
+def test_updateSequence():
+    #the cover fibers follow the offset lines of the current cover thickness through a sequence of updates
+    model = PolygonSectionModel("box", **BOX)
+    model.fibers()
+    parameters = dict(BOX)
+    for changes in [{"coverThick": 0.08}, {"coverSize": 0.1}, {"outBarDist": 0.15}, {"coverThick": 0.05},
+                    {"coverSize": 0.3, "outBarDist": 0.25}]:
+        model.update(**changes)
+        parameters.update(changes)
+        assertSameFibers(model.fibers(), polygonSection("box", **parameters))
+    assert model.stageRuns == {"geometry": 1, "offsetLines": 3, "coreMesh": 3, "coverMesh": 5, "barMesh": 5}
+######################################################################################
+def test_coverUsesOffsetLinesStage():
+    #another offset of the shared PolygonSection instance does not change the cover fibers of the model
+    model = PolygonSectionModel("box", **BOX)
+    model.fibers()
+    sectInstance = model._stageResults["geometry"][0]
+    sectInstance.coverLinePlot(0.2)
+    sectInstance.innerLinePlot(0.2)
+    model.update(coverSize=0.1)
+    assertSameFibers(model.fibers(), polygonSection("box", **dict(BOX, coverSize=0.1)))
+    assert model.recomputed == ["coverMesh"]
+######################################################################################
+def test_unknownParameter():
+    model = PolygonSectionModel("box", **BOX)
+    with pytest.raises(ValueError):
+        model.update(coverThickness=0.08)
+######################################################################################
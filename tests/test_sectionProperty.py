@@ -0,0 +1,104 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from fiberSet import FiberSet, CORE, COVER, BAR
+from sectionProperty import sectionProperties, discretizationError
+from structuredMesh import rectilinearMesh, polarMesh
+######################################################################################
+def rectangleFibers(width, height, nY, nZ, y0=0.0, z0=0.0):
+    """
+    nY*nZ equal fibers of the width*height rectangle with the lower left corner at (y0,z0)
+    """
+    y, z = np.meshgrid(y0 + (np.arange(nY) + 0.5) * width / nY, z0 + (np.arange(nZ) + 0.5) * height / nZ)
+    return FiberSet(y.ravel(), z.ravel(), width * height / (nY * nZ), CORE)
+######################################################################################
+def test_rectangle():
+    #point fibers miss the inertia of each fiber about its own centroid: I=bh^3/12*(1-1/n^2)
+    width, height, nY, nZ = 0.6, 1.2, 12, 30
+    core = sectionProperties(rectangleFibers(width, height, nY, nZ, 2.0, -1.0))["core"]
+    assert np.isclose(core["area"], width * height)
+    assert np.isclose(core["yc"], 2.0 + width / 2.0) and np.isclose(core["zc"], -1.0 + height / 2.0)
+    assert np.isclose(core["Iy"], width * height ** 3 / 12.0 * (1.0 - 1.0 / nZ ** 2))
+    assert np.isclose(core["Iz"], height * width ** 3 / 12.0 * (1.0 - 1.0 / nY ** 2))
+    assert abs(core["Iyz"]) < 1.0e-12
+    assert np.isclose(core["I1"], core["Iy"]) and np.isclose(core["I2"], core["Iz"])
+######################################################################################
+def test_rotatedRectangle():
+    #principal moments and axis of a rectangle rotated by 30 degrees about its centroid
+    fibers = rectangleFibers(0.6, 1.2, 12, 30, -0.3, -0.6)
+    angle = np.radians(30.0)
+    y = fibers.y * np.cos(angle) - fibers.z * np.sin(angle) + 5.0
+    z = fibers.y * np.sin(angle) + fibers.z * np.cos(angle) + 3.0
+    reference = sectionProperties(fibers)["core"]
+    rotated = sectionProperties(FiberSet(y, z, fibers.area, CORE))["core"]
+    assert np.isclose(rotated["yc"], 5.0) and np.isclose(rotated["zc"], 3.0)
+    assert np.isclose(rotated["I1"], reference["Iy"]) and np.isclose(rotated["I2"], reference["Iz"])
+    #the axis of I1 (the local y axis of the rectangle, the long side along z) is rotated by 30 degrees
+    assert np.isclose(rotated["theta"], angle)
+    #the (n,3) array input is read as core fibers
+    assert np.isclose(sectionProperties(np.column_stack((y, z, fibers.area)))["core"]["I1"], rotated["I1"])
+######################################################################################
+def test_rectilinearBoxGirder():
+    #exact area and centroid of a hollow rectangle on the structured grid, the inertia converges as 1/n^2
+    outRing = [(0.0, 0.0), (3.0, 0.0), (3.0, 2.0), (0.0, 2.0)]
+    holeRing = [(0.5, 0.5), (2.5, 0.5), (2.5, 1.5), (0.5, 1.5)]
+    exactIy = (3.0 * 2.0 ** 3 - 2.0 * 1.0 ** 3) / 12.0
+    errorList = []
+    for eleSize in (0.1, 0.05):
+        xc, yc, area = rectilinearMesh([outRing, holeRing], eleSize)[:3]
+        core = sectionProperties(FiberSet(xc, yc, area, CORE))["core"]
+        assert np.isclose(core["area"], 4.0) and np.isclose(core["yc"], 1.5) and np.isclose(core["zc"], 1.0)
+        errorList.append(abs(core["Iy"] - exactIy) / exactIy)
+    assert errorList[0] < 1.0e-2
+    assert errorList[1] == pytest.approx(errorList[0] / 4.0, rel=1.0e-6)
+######################################################################################
+@pytest.mark.parametrize("innerRadius", [None, 0.6])
+def test_circleAndAnnulus(innerRadius):
+    outRadius = 1.0
+    r0 = 0.0 if innerRadius is None else innerRadius
+    exactArea = np.pi * (outRadius ** 2 - r0 ** 2)
+    exactI = np.pi * (outRadius ** 4 - r0 ** 4) / 4.0
+    xc, yc, area = polarMesh(outRadius, innerRadius, 0.02)[:3]
+    propertyDict = sectionProperties(FiberSet(xc, yc, area, CORE))
+    core = propertyDict["core"]
+    assert np.isclose(core["area"], exactArea, rtol=1.0e-12)
+    assert abs(core["yc"]) < 1.0e-12 and abs(core["zc"]) < 1.0e-12
+    errorDict = discretizationError(propertyDict, {"core": {"area": exactArea, "Iy": exactI, "Iz": exactI}})
+    assert abs(errorDict["core"]["area"]) < 1.0e-12
+    assert abs(errorDict["core"]["Iy"]) < 1.0e-3 and abs(errorDict["core"]["Iz"]) < 1.0e-3
+    assert abs(core["Iyz"]) < 1.0e-3 * exactI
+######################################################################################
+def test_transformedSection():
+    #two bars on the faces of a concrete square, transformed with the modular ratio
+    core = rectangleFibers(1.0, 1.0, 40, 40, -0.5, -0.5)
+    bar = FiberSet([0.0, 0.0], [-0.4, 0.4], [0.01, 0.02], BAR)
+    propertyDict = sectionProperties(FiberSet.concatenate([core, bar]), {BAR: 6.0})
+    transformed = propertyDict["transformed"]
+    assert set(propertyDict) == {"core", "bar", "transformed"}
+    assert np.isclose(transformed["area"], 1.0 + 6.0 * 0.03)
+    barMoment = 6.0 * (0.01 * -0.4 + 0.02 * 0.4)
+    assert np.isclose(transformed["zc"], barMoment / transformed["area"])
+    zc = transformed["zc"]
+    expectedIy = propertyDict["core"]["Iy"] + zc ** 2 + 6.0 * (0.01 * (-0.4 - zc) ** 2 + 0.02 * (0.4 - zc) ** 2)
+    assert np.isclose(transformed["Iy"], expectedIy)
+    #without the modular ratio the bars weigh 1.0
+    assert np.isclose(sectionProperties(FiberSet.concatenate([core, bar]))["transformed"]["area"], 1.03)
+######################################################################################
+def test_regionsMatchSeparateSets():
+    core = rectangleFibers(1.0, 0.5, 10, 5)
+    cover = rectangleFibers(1.0, 0.1, 10, 1, 0.0, 0.5)
+    cover.tag[:] = COVER
+    joined = sectionProperties(FiberSet.concatenate([core, cover]))
+    separate = sectionProperties(cover)
+    #theta is the same axis modulo pi, its sign follows the round-off of an Iyz close to zero
+    joinedTheta, separateTheta = joined["cover"].pop("theta"), separate["cover"].pop("theta")
+    assert np.isclose(np.sin(2.0 * (joinedTheta - separateTheta)), 0.0)
+    assert joined["cover"] == pytest.approx(separate["cover"])
+    assert "core" not in separate
+######################################################################################
@@ -0,0 +1,85 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import os
+import numpy as np
+import pytest
+import sectionRender
+from sectionRender import polylineSegments, meshEdgeSegments, drawLayers, renderSection, waitRenders
+######################################################################################
+POINTS = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]])
+TRIANGLES = np.array([[0, 1, 2], [0, 2, 3]])
+######################################################################################
+def sectionLayers(nCore=2):
+    """
+    layer dict of a unit square, nCore*nCore cells of two triangles each in the core layer
+    """
+    y, z = np.meshgrid(np.linspace(0.0, 1.0, nCore + 1), np.linspace(0.0, 1.0, nCore + 1))
+    points = np.column_stack((y.ravel(), z.ravel()))
+    corner = (np.arange(nCore)[:, None] * (nCore + 1) + np.arange(nCore)[None, :]).ravel()
+    triangles = np.concatenate((np.column_stack((corner, corner + 1, corner + nCore + 2)),
+                                np.column_stack((corner, corner + nCore + 2, corner + nCore + 1))))
+    return {"coreLines": meshEdgeSegments(points, triangles),
+            "sectionLines": polylineSegments([[0.0, 1.0, 1.0, 0.0, 0.0]], [[0.0, 0.0, 1.0, 1.0, 0.0]]),
+            "coverLines": np.array([[[0.0, 0.1], [0.1, 0.1]]]),
+            "barPoints": np.array([[0.2, 0.2], [0.8, 0.2]]), "barSize": 10}
+######################################################################################
+def test_segments():
+    segments = polylineSegments([[0.0, 1.0, 1.0], [2.0, 3.0]], [[0.0, 0.0, 1.0], [2.0, 2.0]])
+    assert np.array_equal(segments, [[[0.0, 0.0], [1.0, 0.0]], [[1.0, 0.0], [1.0, 1.0]], [[2.0, 2.0], [3.0, 2.0]]])
+    assert polylineSegments([], []).shape == (0, 2, 2)
+    #the diagonal shared by the two triangles is drawn once
+    edges = meshEdgeSegments(POINTS, TRIANGLES)
+    assert edges.shape == (5, 2, 2)
+    assert {tuple(sorted(map(tuple, each))) for each in edges.tolist()} == \
+           {((0.0, 0.0), (1.0, 0.0)), ((1.0, 0.0), (1.0, 1.0)), ((0.0, 1.0), (1.0, 1.0)), ((0.0, 0.0), (0.0, 1.0)),
+            ((0.0, 0.0), (1.0, 1.0))}
+######################################################################################
+@pytest.mark.parametrize("rasterizeLimit", [5000, 10])
+def test_drawLayers(rasterizeLimit):
+    from matplotlib.figure import Figure
+    layers = sectionLayers(nCore=4)
+    ax = Figure().add_subplot(111)
+    drawLayers(ax, layers, rasterizeLimit)
+    #one collection for each line layer and one for the bars
+    coreLines, sectionLines, coverLines, barPoints = ax.collections
+    for collection, layerName in ((coreLines, "coreLines"), (sectionLines, "sectionLines"),
+                                  (coverLines, "coverLines")):
+        assert np.array_equal(np.array(collection.get_segments()), layers[layerName])
+        assert collection.get_rasterized() == (len(layers[layerName]) > rasterizeLimit)
+    assert len(layers["coreLines"]) == 56 and len(layers["sectionLines"]) == 4
+    assert np.array_equal(barPoints.get_offsets(), layers["barPoints"]) and not barPoints.get_rasterized()
+    #no Line2D for each segment
+    assert len(ax.lines) == 0
+######################################################################################
+def test_drawLayersSkipsEmptyLayers():
+    from matplotlib.figure import Figure
+    ax = Figure().add_subplot(111)
+    drawLayers(ax, {"coreLines": np.empty((0, 2, 2)), "sectionLines": sectionLayers()["sectionLines"]})
+    assert len(ax.collections) == 1
+######################################################################################
+@pytest.mark.parametrize("formats", [("png",), ("eps", "jpg"), ("svg", "pdf", "png"), ()])
+def test_aggWritesRequestedFormats(tmp_path, formats):
+    sectionName = str(tmp_path / "section")
+    assert renderSection(sectionName, sectionLayers(), [4, 4], formats, mode="agg") is None
+    assert sorted(os.listdir(str(tmp_path))) == sorted("section." + each for each in formats)
+    for eachFormat in formats:
+        assert os.path.getsize(sectionName + "." + eachFormat) > 0
+######################################################################################
+def test_backgroundRender(tmp_path):
+    sectionName = str(tmp_path / "section")
+    process = renderSection(sectionName, sectionLayers(), [4, 4], ("png",), mode="background")
+    assert process in sectionRender._backgroundRenders
+    assert waitRenders(timeout=60) == 0
+    assert not process.is_alive() and process.exitcode == 0
+    assert process not in sectionRender._backgroundRenders
+    assert os.listdir(str(tmp_path)) == ["section.png"]
+######################################################################################
+def test_unknownMode(tmp_path):
+    with pytest.raises(ValueError):
+        renderSection(str(tmp_path / "section"), sectionLayers(), [4, 4], ("png",), mode="window")
+######################################################################################
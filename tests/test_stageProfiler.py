@@ -0,0 +1,102 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import tracemalloc
+import numpy as np
+import pytest
+from stageProfiler import StageProfiler, StageReport, NULL_PROFILER
+from sectionFiberMain import circleSection, polygonSection, sectionBatch
+from structuredMesh import polarMesh
+######################################################################################
+#the analytic and structured core meshers need no gmsh
+CIRCLE = {"outD": 2.0, "coverThick": 0.06, "outbarD": 0.03, "outbarDist": 0.15, "coreSize": 0.1, "coverSize": 0.1,
+          "coreMesher": "analytic"}
+BOX = {"outSideNode": {1: (0.0, 0.0), 2: (3.0, 0.0), 3: (3.0, 2.0), 4: (0.0, 2.0)},
+       "outSideEle": {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)},
+       "coverThick": 0.06, "coreSize": 0.1, "coverSize": 0.2, "outBarD": 0.032, "outBarDist": 0.2,
+       "inSideNode": [{1: (0.5, 0.5), 2: (2.5, 0.5), 3: (2.5, 1.5), 4: (0.5, 1.5)}],
+       "inSideEle": [{1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)}],
+       "inBarD": 0.025, "inBarDist": 0.2, "coreMesher": "structured"}
+######################################################################################
+def test_circleRecords():
+    callbackList = []
+    profiler = StageProfiler(callback=callbackList.append)
+    coreFiber, coverFiber, barFiber = circleSection("pier", profiler=profiler, **CIRCLE)
+    records = profiler.records
+    assert callbackList == records
+    assert [each["stage"] for each in records] == ["initSectionPlot", "coreMesh", "coverMesh", "barMesh"]
+    assert all(each["section"] == "pier" and each["wallTime"] >= 0.0 and each["peakMemory"] >= 0 for each in records)
+    #the counts of the core mesh are the fibers, the nodes and the triangles of the analytic mesh
+    points, triangles = polarMesh(0.94, None, 0.1)[3:]
+    assert (records[1]["fiberCount"], records[1]["vertexCount"], records[1]["elementCount"]) == \
+           (len(coreFiber), len(points), len(triangles))
+    assert records[2]["fiberCount"] == len(coverFiber) and records[3]["fiberCount"] == len(barFiber)
+    assert records[0]["fiberCount"] is None and records[2]["elementCount"] is None
+    #the memory tracing started by the profiler is stopped after the last stage
+    assert not tracemalloc.is_tracing()
+######################################################################################
+def test_polygonRecords():
+    profiler = StageProfiler(traceMemory=False)
+    coreFiber, coverFiber, barFiber = polygonSection("box", profiler=profiler, **BOX)
+    records = {each["stage"]: each for each in profiler.records}
+    assert list(records) == ["sectPlot", "coverLinePlot", "innerLinePlot", "coreMesh", "coverMesh", "barMesh"]
+    assert records["coverLinePlot"]["vertexCount"] == 4 and records["innerLinePlot"]["vertexCount"] == 4
+    assert records["coreMesh"]["fiberCount"] == len(coreFiber)
+    assert records["coreMesh"]["elementCount"] == 2 * len(coreFiber)
+    assert records["coverMesh"]["fiberCount"] == len(coverFiber)
+    assert records["barMesh"]["fiberCount"] == len(barFiber)
+    assert all(each["peakMemory"] is None for each in profiler.records)
+######################################################################################
+def test_nullProfilerRecordsNothing():
+    #the default profiler keeps no state, its stages are one shared context manager
+    stage = NULL_PROFILER.stage("pier", "coreMesh")
+    with stage as entered:
+        NULL_PROFILER.count(fiberCount=10)
+    assert entered is stage and NULL_PROFILER.stage("box", "barMesh") is stage
+    assert vars(NULL_PROFILER) == {} and vars(stage) == {}
+    #the fibers are the same with or without instrumentation
+    fibers = circleSection("pier", **CIRCLE)
+    profiledFibers = circleSection("pier", profiler=StageProfiler(), **CIRCLE)
+    for each, profiled in zip(fibers, profiledFibers):
+        assert np.array_equal(each.toArray(), profiled.toArray())
+######################################################################################
+def test_failedStage():
+    profiler = StageProfiler(traceMemory=False)
+    with pytest.raises(ZeroDivisionError):
+        with profiler.stage("pier", "coreMesh"):
+            1.0 / 0.0
+    assert profiler.records[0]["error"] == "ZeroDivisionError" and profiler.records[0]["wallTime"] >= 0.0
+######################################################################################
+def test_reportTotals():
+    profiler = StageProfiler()
+    sectionSpecs = [dict(CIRCLE, section="circle", sectionName="pier%d" % i1, outD=outD)
+                    for i1, outD in enumerate([1.5, 2.0])] + [dict(BOX, section="polygon", sectionName="box")]
+    results, errors = sectionBatch(sectionSpecs, maxWorkers=2, profiler=profiler)
+    assert errors == {}
+    report = profiler.report()
+    sectionTotals, stageTotals = report.sectionTotals(), report.stageTotals()
+    assert set(sectionTotals) == {"pier0", "pier1", "box"}
+    totalTime = sum(each["wallTime"] for each in report.records)
+    assert np.isclose(sum(each["wallTime"] for each in sectionTotals.values()), totalTime, rtol=1.0e-12)
+    assert np.isclose(sum(each["wallTime"] for each in stageTotals.values()), totalTime, rtol=1.0e-12)
+    assert sum(each["count"] for each in stageTotals.values()) == len(report.records)
+    assert stageTotals["coreMesh"]["count"] == 3 and stageTotals["innerLinePlot"]["count"] == 1
+    for eachSpec, fibers in zip(sectionSpecs, results):
+        sectionTotal = sectionTotals[eachSpec["sectionName"]]
+        assert sectionTotal["fiberCount"] == sum(len(each) for each in fibers)
+        assert np.isclose(sum(sectionTotal["stages"].values()), sectionTotal["wallTime"], rtol=1.0e-12)
+        assert sectionTotal["peakMemory"] == max(each["peakMemory"] for each in report.records
+                                                 if each["section"] == eachSpec["sectionName"])
+    for eachStage, stageTotal in stageTotals.items():
+        stageRecords = [each for each in report.records if each["stage"] == eachStage]
+        assert stageTotal["maxWallTime"] == max(each["wallTime"] for each in stageRecords)
+    slowest = report.slowestSections(2)
+    assert len(slowest) == 2 and slowest[0][1] >= slowest[1][1]
+    assert slowest[0][1] == max(each["wallTime"] for each in sectionTotals.values())
+    assert slowest[0][2] in sectionTotals[slowest[0][0]]["stages"]
+    assert StageReport([]).stageTotals() == {} and StageReport([]).slowestSections() == []
+######################################################################################
@@ -0,0 +1,72 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from fiberSet import FiberSet, CORE, COVER, BAR
+from strainPlane import fiberStrain, sectionResponse
+from uniaxialMaterial import ElasticMaterial, KentParkConcrete, BilinearSteel
+######################################################################################
+E = 2.0e8
+######################################################################################
+def test_fiberStrainSigns():
+    #fibers at +z, -z, +y and -y
+    fibers = FiberSet([0.0, 0.0, 0.5, -0.5], [0.5, -0.5, 0.0, 0.0], 0.01, CORE)
+    strain = fiberStrain(fibers, [[0.0, 0.01, 0.0], [0.0, 0.0, 0.01], [0.002, 0.0, 0.0]])
+    #kappaY>0 stretches the +z fibers, kappaZ>0 stretches the -y fibers, eps0>0 stretches all the fibers
+    assert np.allclose(strain, [[0.005, -0.005, 0.0, 0.0], [0.0, 0.0, -0.005, 0.005], [0.002] * 4])
+######################################################################################
+def test_momentSigns():
+    #a single steel fiber: a tension fiber at +z gives My>0, a tension fiber at -y gives Mz>0
+    materials = {CORE: ElasticMaterial(E)}
+    forces = sectionResponse(FiberSet([0.0], [0.5], [0.01], CORE), materials, [[0.001, 0.0, 0.0]], tangent=False)
+    assert np.allclose(forces, [[E * 0.001 * 0.01, E * 0.001 * 0.01 * 0.5, 0.0]])
+    forces = sectionResponse(FiberSet([-0.5], [0.0], [0.01], CORE), materials, [[0.001, 0.0, 0.0]], tangent=False)
+    assert np.allclose(forces, [[E * 0.001 * 0.01, 0.0, E * 0.001 * 0.01 * 0.5]])
+######################################################################################
+def test_elasticSection():
+    #an elastic section gives N=EA*eps0, My=EIy*kappaY, Mz=EIz*kappaZ about the centroid
+    y, z = np.meshgrid(np.linspace(-0.45, 0.45, 10), np.linspace(-0.9, 0.9, 19))
+    fibers = FiberSet(y.ravel(), z.ravel(), 0.01, CORE)
+    area, Iy, Iz = fibers.area.sum(), (fibers.area * fibers.z ** 2).sum(), (fibers.area * fibers.y ** 2).sum()
+    planes = np.array([[0.001, 0.0, 0.0], [0.0, 0.002, 0.0], [0.0, 0.0, 0.003], [-0.001, 0.002, -0.003]])
+    forces, tangents = sectionResponse(fibers, {CORE: ElasticMaterial(E)}, planes)
+    assert np.allclose(forces, planes * E * np.array([area, Iy, Iz]))
+    assert np.allclose(tangents, np.diag(E * np.array([area, Iy, Iz])))
+######################################################################################
+def test_tangentMatchesForceDifference():
+    #the section tangent is the derivative of the forces of the nonlinear materials
+    generator = np.random.default_rng(3)
+    fibers = FiberSet.concatenate([FiberSet(*generator.uniform(-0.5, 0.5, (2, 200)), 0.005, CORE),
+                                   FiberSet(*generator.uniform(-0.45, 0.45, (2, 20)), 0.0005, BAR)])
+    materials = {CORE: KentParkConcrete(-34.5e3, -0.002, -24.0e3, -0.014), BAR: BilinearSteel(400.0e3, E, 0.01)}
+    plane = np.array([-0.0005, 0.003, -0.002])
+    forces, tangents = sectionResponse(fibers, materials, [plane])
+    step = 1.0e-8
+    for i1 in range(3):
+        shift = np.zeros(3)
+        shift[i1] = step
+        difference = sectionResponse(fibers, materials, [plane + shift, plane - shift], tangent=False)
+        #the kinks of the material laws are crossed by few fibers, compare with a loose tolerance
+        assert np.allclose((difference[0] - difference[1]) / (2.0 * step), tangents[0][:, i1],
+                           rtol=1.0e-2, atol=1.0e-2 * np.abs(tangents[0]).max())
+    assert np.allclose(tangents[0], tangents[0].T)
+######################################################################################
+def test_chunksAndListInput():
+    fibers = FiberSet([0.1, -0.2, 0.3], [0.2, 0.1, -0.3], [0.01, 0.02, 0.03], CORE)
+    materials = {CORE: KentParkConcrete(-34.5e3, -0.002, -24.0e3, -0.014)}
+    planes = np.random.default_rng(4).uniform(-0.004, 0.001, (50, 3))
+    forces, tangents = sectionResponse(fibers, materials, planes)
+    chunkForces, chunkTangents = sectionResponse(fibers, materials, planes, chunkSize=7)
+    assert np.allclose(forces, chunkForces) and np.allclose(tangents, chunkTangents)
+    assert np.allclose(sectionResponse(fibers.toList(), materials, planes, tangent=False), forces)
+######################################################################################
+def test_missingMaterial():
+    fibers = FiberSet.concatenate([FiberSet([0.0], [0.0], [0.01], CORE), FiberSet([0.1], [0.1], [0.01], COVER)])
+    with pytest.raises(ValueError):
+        sectionResponse(fibers, {CORE: ElasticMaterial(E)}, [[0.001, 0.0, 0.0]])
+######################################################################################
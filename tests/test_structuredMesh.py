@@ -0,0 +1,77 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+######################################################################################
+import numpy as np
+import pytest
+from fiberGenerate import CircleSection
+from structuredMesh import polarMesh, rectilinearMesh, cellOutlines
+from sectionModel import PolygonSectionModel
+######################################################################################
+@pytest.mark.parametrize("outRadius,innerRadius,eleSize", [(1.0, None, 0.1), (0.94, 0.5, 0.07), (2.0, 1.9, 0.3)])
+def test_polarMesh(outRadius, innerRadius, eleSize):
+    xc, yc, area, points, triangles = polarMesh(outRadius, innerRadius, eleSize)
+    r0 = 0.0 if innerRadius is None else innerRadius
+    assert np.isclose(area.sum(), np.pi * (outRadius ** 2 - r0 ** 2), rtol=1.0e-14, atol=0.0)
+    #inner and outer radius of each fiber from the four corners of its sector
+    cornerRadius = np.hypot(points[:, 0], points[:, 1]).reshape(-1, 4)
+    r1, r2 = cornerRadius[:, 0], cornerRadius[:, 2]
+    ringList = np.unique(np.round(r1, 12))
+    assert np.isclose(ringList[0], r0, atol=1.0e-15) and np.all(np.diff(ringList) <= eleSize * (1.0 + 1.0e-12))
+    for eachRing in ringList:
+        inRing = np.isclose(r1, eachRing, rtol=0.0, atol=1.0e-12)
+        ringR1, ringR2 = r1[inRing][0], r2[inRing][0]
+        nSector = inRing.sum()
+        #equal sectors of the ring, no arc longer than eleSize
+        assert np.allclose(area[inRing], np.pi * (ringR2 ** 2 - ringR1 ** 2) / nSector, rtol=1.0e-13, atol=0.0)
+        assert nSector >= 3 and np.pi * (ringR1 + ringR2) / nSector <= eleSize * (1.0 + 1.0e-12)
+        #centroid radius of the sector of half angle h: 2/3*(r2^3-r1^3)/(r2^2-r1^2)*sin(h)/h
+        halfAngle = np.pi / nSector
+        centroidRadius = 2.0 / 3.0 * (ringR2 ** 3 - ringR1 ** 3) / (ringR2 ** 2 - ringR1 ** 2) * np.sin(halfAngle) / \
+                         halfAngle
+        assert np.allclose(np.hypot(xc[inRing], yc[inRing]), centroidRadius, rtol=1.0e-13, atol=0.0)
+    #two plot triangles for each sector, one for the sectors touching the center
+    assert len(triangles) == 2 * len(area) - np.sum(r1 == 0.0)
+######################################################################################
+def test_analyticCircleCore():
+    circleInstance = CircleSection(0.06, 2.0, 1.0)
+    coreFiber, points, triangles = circleInstance.coreMesh(0.1, mesher="analytic")
+    xc, yc, area = polarMesh(0.94, 0.56, 0.1)[:3]
+    assert np.array_equal(coreFiber.toArray(), np.column_stack((xc, yc, area)))
+    with pytest.raises(ValueError):
+        circleInstance.coreMesh(0.1, mesher="polar")
+######################################################################################
+def test_rectilinearMeshArea():
+    outRing = [(0.0, 0.0), (3.0, 0.0), (3.0, 2.0), (0.0, 2.0)]
+    holeRing = [(1.0, 0.5), (2.0, 0.5), (2.0, 1.5), (1.0, 1.5)]
+    xc, yc, area, points, triangles = rectilinearMesh([outRing, holeRing], 0.25)
+    assert np.isclose(area.sum(), 5.0)
+    assert np.all(np.abs(area - 0.0625) < 1.0e-12)
+    assert rectilinearMesh([[(0.0, 0.0), (1.0, 0.0), (0.5, 1.0)]], 0.25) is None
+######################################################################################
+def test_cellOutlines():
+    xc, yc, area, points, triangles = rectilinearMesh([[(0.0, 0.0), (1.0, 0.0), (1.0, 0.5), (0.0, 0.5)]], 0.25)
+    xList, yList = cellOutlines(points)
+    assert xList.shape == (len(area), 5)
+    assert np.allclose(xList[:, 0], xList[:, -1]) and np.allclose(yList[:, 0], yList[:, -1])
+    #the outlines bound the cells: shoelace area of each closed outline
+    outlineArea = 0.5 * np.abs((xList[:, :-1] * yList[:, 1:] - xList[:, 1:] * yList[:, :-1]).sum(axis=1))
+    assert np.allclose(outlineArea, area)
+######################################################################################
+def test_structuredPlotHasNoDiagonals():
+    outSideNode = {1: (0.0, 0.0), 2: (2.0, 0.0), 3: (2.0, 1.0), 4: (0.0, 1.0)}
+    outSideEle = {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)}
+    model = PolygonSectionModel("structuredPlot", outSideNode, outSideEle, 0.1, 0.1, 0.1, 0.02, 0.2,
+                                coreMesher="structured")
+    model.fibers()
+    assert model.coreMeshInfo["mesher"] == "structured"
+    layers, figSize = model._plotLayers()
+    segments = layers["coreLines"]
+    direction = segments[:, 1] - segments[:, 0]
+    #every core line is horizontal or vertical
+    assert np.all(np.min(np.abs(direction), axis=1) < 1.0e-12)
+    assert len(segments) == 4 * len(model._stageResults["coreMesh"][0])
+######################################################################################
@@ -0,0 +1,101 @@
+#-*-coding: UTF-8-*-
+######################################################################################
+#  Author: Junjun Guo
+#  E-mail: guojj@tongji.edu.cn/guojj_ce@163.com
+#  Date: 05/02/2020
+######################################################################################
+#  Vectorized uniaxial material laws for the fiber section kernels (see strainPlane.py)
+#  Each law is a stateless (monotonic envelope) stress-strain relation, compression negative,
+#  stressTangent(strain) takes a strain array of any shape and returns the stress and tangent arrays
+######################################################################################
+import numpy as np
+######################################################################################
+class ElasticMaterial():
+    """
+    Linear elastic material
+    #######################---example---#########################
+    from uniaxialMaterial import ElasticMaterial
+    stress, tangent = ElasticMaterial(2.0e8).stressTangent(np.array([-0.001, 0.002]))
+    """
+    ####################################################
+    def __init__(self, E):
+        """
+        Input: E-elastic modulus
+        """
+        self.E = E
+    ####################################################
+    def stressTangent(self, strain):
+        """
+        Input: strain-strain array
+        Output: stress,tangent-stress and tangent modulus arrays of the same shape
+        """
+        strain = np.asarray(strain, dtype=float)
+        return self.E * strain, np.full(strain.shape, float(self.E))
+######################################################################################
+class KentParkConcrete():
+    """
+    Kent-Park concrete envelope (the envelope of OpenSees Concrete01), no tensile strength
+    compression: parabola up to (epsc0,fpc), straight line down to (epsU,fpcu), then constant fpcu
+    #######################---example---#########################
+    from uniaxialMaterial import KentParkConcrete
+    coreConcrete = KentParkConcrete(-34.5e3, -0.004, -24.0e3, -0.014)
+    coverConcrete = KentParkConcrete(-27.6e3, -0.002, 0.0, -0.006)
+    """
+    ####################################################
+    def __init__(self, fpc, epsc0, fpcu, epsU):
+        """
+        Input: fpc-compressive strength (negative), epsc0-strain at fpc (negative)
+               fpcu-crushing strength (negative or zero), epsU-strain at fpcu (negative)
+        """
+        self.fpc = -abs(fpc)
+        self.epsc0 = -abs(epsc0)
+        self.fpcu = -abs(fpcu)
+        self.epsU = -abs(epsU)
+    ####################################################
+    def stressTangent(self, strain):
+        """
+        Input: strain-strain array
+        Output: stress,tangent-stress and tangent modulus arrays of the same shape
+        """
+        strain = np.asarray(strain, dtype=float)
+        ratio = strain / self.epsc0
+        softening = (self.fpcu - self.fpc) / (self.epsU - self.epsc0)
+        ascending = (strain < 0.0) & (strain >= self.epsc0)
+        descending = (strain < self.epsc0) & (strain >= self.epsU)
+        crushed = strain < self.epsU
+        stress = np.where(ascending, self.fpc * (2.0 * ratio - ratio * ratio), 0.0)
+        stress = np.where(descending, self.fpc + softening * (strain - self.epsc0), stress)
+        stress = np.where(crushed, self.fpcu, stress)
+        tangent = np.where(ascending, 2.0 * self.fpc / self.epsc0 * (1.0 - ratio), 0.0)
+        tangent = np.where(descending, softening, tangent)
+        return stress, tangent
+######################################################################################
+class BilinearSteel():
+    """
+    Bilinear steel with kinematic hardening envelope (the envelope of OpenSees Steel01)
+    #######################---example---#########################
+    from uniaxialMaterial import BilinearSteel
+    steel = BilinearSteel(400.0e3, 2.0e8, 0.01)
+    """
+    ####################################################
+    def __init__(self, fy, E, b=0.0):
+        """
+        Input: fy-yield strength, E-elastic modulus, b-strain hardening ratio
+        """
+        self.fy = fy
+        self.E = E
+        self.b = b
+    ####################################################
+    def stressTangent(self, strain):
+        """
+        Input: strain-strain array
+        Output: stress,tangent-stress and tangent modulus arrays of the same shape
+        """
+        strain = np.asarray(strain, dtype=float)
+        epsY = self.fy / self.E
+        yielded = np.abs(strain) > epsY
+        stress = np.where(yielded, np.sign(strain) * (self.fy + self.b * self.E * (np.abs(strain) - epsY)),
+                          self.E * strain)
+        tangent = np.where(yielded, self.b * self.E, self.E)
+        return stress, tangent
+######################################################################################